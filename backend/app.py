@@ -1,10 +1,13 @@
 import os
-from flask import Flask, send_from_directory, jsonify, request
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from sqlalchemy import text
 from extensions import db, migrate
 from config import Config
-import razorpay
+from utils.db_pool import init_pool_metrics, pool_status
+from utils.metrics import init_metrics
+from utils.payment_gateway import init_payment_gateway
+from utils.static_assets import build_manifest, asset_response, compress_assets_command
 from models import Table
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -14,6 +17,7 @@ DIST_DIR = os.path.join(BASE_DIR, "dist")
 def create_app():
     app = Flask(__name__, static_folder=None)
     app.config.from_object(Config)
+    app.config.setdefault("DIST_DIR", DIST_DIR)
 
     # -----------------------------
     # CORS (HTTPS safe)
@@ -28,22 +32,25 @@ def create_app():
         app,
         resources={r"/api/*": {"origins": allowed_origins}},
         supports_credentials=True,
+        expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
     )
 
     # -----------------------------
     # DB
     # -----------------------------
+    init_pool_metrics(app)
     db.init_app(app)
     migrate.init_app(app, db)
 
     # -----------------------------
-    # Razorpay
+    # METRICS (latency, status codes, SQL per endpoint)
     # -----------------------------
-    key_id = app.config.get("RAZORPAY_KEY_ID")
-    key_secret = app.config.get("RAZORPAY_KEY_SECRET")
-    app.razorpay_client = None
-    if key_id and key_secret:
-        app.razorpay_client = razorpay.Client(auth=(key_id, key_secret))
+    init_metrics(app)
+
+    # -----------------------------
+    # Razorpay (shared, pooled gateway or local stub)
+    # -----------------------------
+    app.razorpay_client = init_payment_gateway(app)
 
     # -----------------------------
     # BLUEPRINTS (ALL API)
@@ -59,6 +66,8 @@ def create_app():
     from routes.restaurant import restaurant_bp
     from routes.customer_menu import customer_menu_bp
     from routes.customer_order import customer_order_bp
+    from routes.customer_bootstrap import customer_bootstrap_bp
+    from routes.qr import qr_bp
 
     api_blueprints = [
         auth_bp,
@@ -72,11 +81,22 @@ def create_app():
         restaurant_bp,
         customer_menu_bp,
         customer_order_bp,
+        customer_bootstrap_bp,
+        qr_bp,
     ]
 
     for bp in api_blueprints:
         app.register_blueprint(bp)
 
+    # -----------------------------
+    # CLI
+    # -----------------------------
+    from utils.summaries import rebuild_summaries_command
+    from utils.idempotency import prune_idempotency_keys_command
+    app.cli.add_command(rebuild_summaries_command)
+    app.cli.add_command(prune_idempotency_keys_command)
+    app.cli.add_command(compress_assets_command)
+
     # -----------------------------
     # API FALLBACK (VERY IMPORTANT)
     # -----------------------------
@@ -96,30 +116,38 @@ def create_app():
         try:
             with db.engine.connect() as conn:
                 res = conn.execute(text("SELECT 1")).scalar()
-            return jsonify({"db": True, "result": int(res)}), 200
+            return jsonify({"db": True, "result": int(res), "pool": pool_status(db.engine)}), 200
         except Exception as e:
-            return jsonify({"db": False, "error": str(e)}), 500
+            return jsonify({"db": False, "error": str(e), "pool": pool_status(db.engine)}), 500
 
     # -----------------------------
     # STATIC / SPA
     # -----------------------------
+    # Built once at startup: files, precompressed variants and ETags in memory
+    assets = build_manifest(app.config["DIST_DIR"])
+
+    def index_response():
+        index_asset = assets.get("index.html")
+        if index_asset is None:
+            return jsonify({"error": "Frontend not built"}), 404
+        return asset_response(index_asset)
+
     @app.route("/")
     def index():
-        return send_from_directory(DIST_DIR, "index.html")
+        return index_response()
 
     @app.route("/favicon.ico")
     def favicon():
-        path = os.path.join(DIST_DIR, "favicon.ico")
-        if os.path.exists(path):
-            return send_from_directory(DIST_DIR, "favicon.ico")
+        if "favicon.ico" in assets:
+            return asset_response(assets["favicon.ico"])
         return "", 204
 
     @app.route("/<path:path>")
     def spa(path):
-        file_path = os.path.join(DIST_DIR, path)
-        if os.path.exists(file_path):
-            return send_from_directory(DIST_DIR, path)
-        return send_from_directory(DIST_DIR, "index.html")
+        asset = assets.get(path)
+        if asset is not None:
+            return asset_response(asset)
+        return index_response()
 
     return app
 
@@ -0,0 +1,113 @@
+# gunicorn.conf.py
+"""
+Production gunicorn profile. gunicorn picks this file up automatically when
+started from backend/:
+
+    gunicorn app:app
+
+GUNICORN_WORKER_CLASS chooses how a worker waits on I/O (Razorpay calls,
+database round trips, open /api/orders/stream connections):
+
+- gthread (default): WEB_CONCURRENCY processes x GUNICORN_THREADS threads.
+  A slow gateway call blocks one thread, not the whole worker. No extra
+  dependencies.
+- gevent: each worker serves up to GUNICORN_WORKER_CONNECTIONS requests as
+  greenlets. Requires `pip install gevent`. The standard library is
+  monkey-patched below, before the app is imported, so requests/urllib3
+  (Razorpay) and PyMySQL yield on socket I/O. psycopg2 is a C driver and is
+  made cooperative with a wait callback.
+
+Defaults come from the dinner-rush benchmark in README.md ("Running in
+production"). Every value can be overridden with the environment variables
+read below.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value and value.strip() else default
+
+
+def _gevent_wait_callback(conn, timeout=None):
+    # psycopg2 calls this instead of blocking in libpq; wait on the socket via the gevent hub
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def _patch_for_gevent():
+    """
+    Makes blocking I/O cooperative. Must run before the app (and with it
+    ssl, requests and the DB drivers) is imported.
+    """
+    from gevent import monkey
+    monkey.patch_all()
+
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return  # PyMySQL is pure Python and already uses the patched socket
+    extensions.set_wait_callback(_gevent_wait_callback)
+
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread").strip().lower()
+if worker_class == "gevent":
+    try:
+        _patch_for_gevent()
+    except ImportError:
+        print("[WARN] gevent is not installed; falling back to the gthread worker")
+        worker_class = "gthread"
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = _env_int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2)
+threads = _env_int("GUNICORN_THREADS", 8)
+worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 100)
+
+# Import the app once in the master; workers fork from it and share its memory
+preload_app = True
+
+# Gateway calls are capped by RAZORPAY_TIMEOUT; leave room for a slow DB on top
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 0)
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def when_ready(server):
+    from app import app
+
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    if "pool_size" not in options:
+        return
+    capacity = options["pool_size"] + options.get("max_overflow", 0)
+    concurrency = worker_connections if worker_class == "gevent" else threads
+    server.log.info(f"{worker_class} x {workers} workers, {concurrency} concurrent requests and "
+                    f"up to {capacity} DB connections per worker ({workers * capacity} total)")
+    if worker_class != "gevent" and threads > capacity:
+        # Threads beyond the pool wait up to DB_POOL_TIMEOUT and then fail
+        server.log.warning(f"GUNICORN_THREADS={threads} exceeds DB_POOL_SIZE + DB_MAX_OVERFLOW={capacity}")
+
+
+def post_fork(server, worker):
+    from app import app
+    from extensions import db
+
+    # The preloaded engine was created in the master; don't reuse its connections across processes
+    with app.app_context():
+        db.engine.dispose(close=False)
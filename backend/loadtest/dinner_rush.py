@@ -0,0 +1,256 @@
+# loadtest/dinner_rush.py
+"""
+Dinner-rush load generator for a locally running TapTable backend.
+
+Customers scan a table QR, load the menu and tables, then place an order
+(cash, UPI or Razorpay). Meanwhile kitchen staff poll the order queue and
+advance each order through its statuses. At the end the script reports
+throughput and p50/p95/p99 latency per endpoint.
+
+Start the server with the payment stub so Razorpay orders never leave the box:
+
+    PAYMENT_GATEWAY=stub gunicorn app:app        # or: PAYMENT_GATEWAY=stub python app.py
+
+Then, from backend/:
+
+    python loadtest/dinner_rush.py --setup --customers 100 --duration 120
+
+--setup registers a throwaway restaurant with tables and a menu. Without it,
+pass --email/--password of an existing restaurant.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+
+NEXT_STATUS = {'pending': 'preparing', 'preparing': 'ready', 'ready': 'completed'}
+PAYMENT_MIX = (('cash', 0.5), ('upi', 0.3), ('razorpay', 0.2))
+
+
+class Recorder:
+    """
+    Thread-safe latency samples per endpoint label.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.samples[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def timed(session, recorder, label, method, url, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = session.request(method, url, timeout=30, **kwargs)
+        ok = response.status_code < 400
+    except requests.RequestException:
+        response, ok = None, False
+    recorder.record(label, time.perf_counter() - start, ok)
+    return response if ok else None
+
+
+# -------------------------
+# Setup
+# -------------------------
+def setup_restaurant(base, tables, menu_items):
+    session = requests.Session()
+    email = f"rush-{uuid.uuid4().hex[:8]}@example.com"
+    password = uuid.uuid4().hex
+    response = session.post(f"{base}/api/auth/register",
+                            json={'name': 'Rush Test Kitchen', 'email': email, 'password': password})
+    response.raise_for_status()
+    token = response.json()['token']
+    restaurant_id = response.json()['restaurant']['id']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    session.post(f"{base}/api/tables/bulk", headers=headers,
+                 json={'from': 1, 'to': tables, 'seats': 4}).raise_for_status()
+
+    dishes = ['Paneer Tikka', 'Chicken Biryani', 'Dal Makhani', 'Veg Hakka Noodles', 'Butter Naan',
+              'Masala Dosa', 'Fish Curry', 'Gulab Jamun', 'Mango Lassi', 'Vegan Buddha Bowl']
+    rows = ['name,description,price,category'] + [
+        f"{dishes[i % len(dishes)]} {i},House special,{random.randint(80, 450)},Mains" for i in range(menu_items)
+    ]
+    session.post(f"{base}/api/menu/import", data='\n'.join(rows).encode(),
+                 headers={**headers, 'Content-Type': 'text/csv'}).raise_for_status()
+
+    session.post(f"{base}/api/settings", headers=headers,
+                 json={'upi_id': 'rush@upi', 'razorpay_merchant_id': 'rush_merchant'}).raise_for_status()
+    print(f"Set up restaurant {restaurant_id} ({email}) with {tables} tables and {menu_items} menu items")
+    return restaurant_id, token
+
+
+def login(base, email, password):
+    response = requests.post(f"{base}/api/auth/login", json={'email': email, 'password': password})
+    response.raise_for_status()
+    data = response.json()
+    return data['restaurant']['id'], data['token']
+
+
+# -------------------------
+# Actors
+# -------------------------
+def customer(base, restaurant_id, table_count, recorder, stop, think_time):
+    session = requests.Session()
+    rng = random.Random()
+    while not stop.is_set():
+        table_number = rng.randint(1, table_count)
+        menu = timed(session, recorder, 'GET /api/customer/menu/<id>', 'GET',
+                     f"{base}/api/customer/menu/{restaurant_id}")
+        timed(session, recorder, 'GET /api/restaurants/<id>/tables', 'GET',
+              f"{base}/api/restaurants/{restaurant_id}/tables")
+        if menu is None:
+            stop.wait(think_time)
+            continue
+
+        # Browse before ordering
+        stop.wait(rng.uniform(0, think_time))
+        menu_items = menu.json()
+        # An empty menu comes back as {"message": ...}
+        items = [i for i in menu_items if i.get('available', True)] if isinstance(menu_items, list) else []
+        if not items:
+            continue
+        cart = [
+            {'id': item['id'], 'name': item['name'], 'price': item['price'], 'quantity': rng.randint(1, 3)}
+            for item in rng.sample(items, k=min(len(items), rng.randint(1, 5)))
+        ]
+        payment_method = rng.choices([m for m, _ in PAYMENT_MIX], weights=[w for _, w in PAYMENT_MIX])[0]
+        timed(session, recorder, 'POST /api/customer-order/create-order', 'POST',
+              f"{base}/api/customer-order/create-order", json={
+                  'restaurant_id': restaurant_id,
+                  'table_number': table_number,
+                  'amount': round(sum(line['price'] * line['quantity'] for line in cart), 2),
+                  'payment_method': payment_method,
+                  'customerName': f'Guest {rng.randint(1, 9999)}',
+                  'items': cart,
+              })
+        stop.wait(rng.uniform(0, think_time))
+
+
+def kitchen(base, token, recorder, stop, poll_interval):
+    session = requests.Session()
+    session.headers['Authorization'] = f'Bearer {token}'
+    rng = random.Random()
+    while not stop.is_set():
+        response = timed(session, recorder, 'GET /api/orders/', 'GET',
+                         f"{base}/api/orders/", params={'status': 'pending,preparing,ready', 'limit': 50})
+        for order in (response.json() if response is not None else []):
+            if stop.is_set():
+                break
+            next_status = NEXT_STATUS.get(order['status'])
+            if next_status and rng.random() < 0.5:
+                timed(session, recorder, 'PUT /api/orders/<id>/status', 'PUT',
+                      f"{base}/api/orders/{order['id']}/status", json={'status': next_status})
+        stop.wait(poll_interval)
+
+
+# -------------------------
+# Report
+# -------------------------
+def report(recorder, elapsed):
+    rows = []
+    for label in sorted(recorder.samples):
+        values = sorted(recorder.samples[label])
+        rows.append({
+            'endpoint': label,
+            'requests': len(values),
+            'errors': recorder.errors[label],
+            'rps': round(len(values) / elapsed, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 1),
+            'p95_ms': round(percentile(values, 95) * 1000, 1),
+            'p99_ms': round(percentile(values, 99) * 1000, 1),
+            'max_ms': round(values[-1] * 1000, 1),
+        })
+
+    header = f"{'endpoint':<42}{'reqs':>8}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        print(f"{r['endpoint']:<42}{r['requests']:>8}{r['errors']:>8}{r['rps']:>9}"
+              f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['max_ms']:>9}")
+    total = sum(r['requests'] for r in rows)
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), "
+          f"{sum(r['errors'] for r in rows)} errors")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--customers', type=int, default=50, help='concurrent customers')
+    parser.add_argument('--kitchen', type=int, default=2, help='concurrent kitchen pollers')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of steady load')
+    parser.add_argument('--ramp-up', type=float, default=10, help='seconds to start all customers')
+    parser.add_argument('--think-time', type=float, default=2.0, help='max customer pause (s)')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='kitchen poll interval (s)')
+    parser.add_argument('--setup', action='store_true', help='create a throwaway restaurant first')
+    parser.add_argument('--tables', type=int, default=60)
+    parser.add_argument('--menu-items', type=int, default=120)
+    parser.add_argument('--email')
+    parser.add_argument('--password')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    base = args.base_url.rstrip('/')
+    if args.setup:
+        restaurant_id, token = setup_restaurant(base, args.tables, args.menu_items)
+    elif args.email and args.password:
+        restaurant_id, token = login(base, args.email, args.password)
+    else:
+        parser.error('pass --setup or --email/--password')
+
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=kitchen, args=(base, token, recorder, stop, args.poll_interval), daemon=True)
+        for _ in range(args.kitchen)
+    ]
+    for t in threads:
+        t.start()
+
+    print(f"Ramping up {args.customers} customers over {args.ramp_up:.0f}s, then running {args.duration:.0f}s...")
+    start = time.perf_counter()
+    for i in range(args.customers):
+        t = threading.Thread(target=customer, daemon=True,
+                             args=(base, restaurant_id, args.tables, recorder, stop, args.think_time))
+        t.start()
+        threads.append(t)
+        if args.ramp_up:
+            time.sleep(args.ramp_up / args.customers)
+
+    try:
+        stop.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    for t in threads:
+        t.join(timeout=35)
+    elapsed = time.perf_counter() - start
+
+    rows = report(recorder, elapsed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed_s': round(elapsed, 2), 'endpoints': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
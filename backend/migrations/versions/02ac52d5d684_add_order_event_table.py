@@ -0,0 +1,38 @@
+"""Add order_event table for the live order stream
+
+Revision ID: 02ac52d5d684
+Revises: 932937043aa8
+Create Date: 2026-10-17 09:12:41.508312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '02ac52d5d684'
+down_revision = '932937043aa8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=30), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_event', schema=None) as batch_op:
+        batch_op.create_index('ix_order_event_restaurant_id_id', ['restaurant_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_event_restaurant_id_id')
+
+    op.drop_table('order_event')
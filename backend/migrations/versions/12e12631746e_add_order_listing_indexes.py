@@ -0,0 +1,28 @@
+"""Add composite indexes for keyset order listing
+
+Revision ID: 12e12631746e
+Revises: 02ac52d5d684
+Create Date: 2026-10-17 10:03:17.224905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '12e12631746e'
+down_revision = '02ac52d5d684'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index('ix_order_restaurant_created', ['restaurant_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_order_restaurant_status_created', ['restaurant_id', 'status', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_restaurant_status_created')
+        batch_op.drop_index('ix_order_restaurant_created')
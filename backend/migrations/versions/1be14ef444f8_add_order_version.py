@@ -0,0 +1,26 @@
+"""Add order.version for optimistic concurrency on status changes
+
+Revision ID: 1be14ef444f8
+Revises: ce3369d0c667
+Create Date: 2026-10-17 14:05:32.418906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1be14ef444f8'
+down_revision = 'ce3369d0c667'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_column('version')
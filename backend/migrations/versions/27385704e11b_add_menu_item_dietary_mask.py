@@ -0,0 +1,45 @@
+"""Add menu_item.dietary_mask with a (restaurant_id, available, dietary_mask) index
+
+Revision ID: 27385704e11b
+Revises: e88bbb1d57fd
+Create Date: 2026-10-17 19:02:47.530812
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '27385704e11b'
+down_revision = 'e88bbb1d57fd'
+branch_labels = None
+depends_on = None
+
+# Same bits as utils.dietary.DIETARY_BITS (copied so the migration doesn't change with the app)
+DIETARY_BITS = {
+    'is_vegetarian': 1,
+    'is_vegan': 2,
+    'is_gluten_free': 4,
+    'is_nut_free': 8,
+}
+
+
+def upgrade():
+    with op.batch_alter_table('menu_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dietary_mask', sa.SmallInteger(), nullable=False, server_default='0'))
+
+    # Backfill from the existing flags in one UPDATE
+    menu_item = sa.table('menu_item', sa.column('dietary_mask', sa.SmallInteger()),
+                         *[sa.column(field, sa.Boolean()) for field in DIETARY_BITS])
+    mask = sum(sa.case((menu_item.c[field] == sa.true(), bit), else_=0) for field, bit in DIETARY_BITS.items())
+    op.execute(menu_item.update().values(dietary_mask=mask))
+
+    with op.batch_alter_table('menu_item', schema=None) as batch_op:
+        batch_op.create_index('ix_menu_item_restaurant_available_dietary',
+                              ['restaurant_id', 'available', 'dietary_mask'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('menu_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_menu_item_restaurant_available_dietary')
+        batch_op.drop_column('dietary_mask')
@@ -0,0 +1,127 @@
+"""Add review_summary running totals, daily rating rollups and the review listing index
+
+Revision ID: 58fe1b54a8c6
+Revises: 27385704e11b
+Create Date: 2026-10-17 19:48:13.204771
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '58fe1b54a8c6'
+down_revision = '27385704e11b'
+branch_labels = None
+depends_on = None
+
+RATINGS = (1, 2, 3, 4, 5)
+
+review_table = sa.table(
+    'review',
+    sa.column('id', sa.Integer),
+    sa.column('restaurant_id', sa.Integer),
+    sa.column('rating', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+summary_table = sa.table(
+    'monthly_summary',
+    sa.column('restaurant_id', sa.Integer),
+    sa.column('date', sa.Date),
+    sa.column('total_orders', sa.Integer),
+    sa.column('total_revenue', sa.Float),
+    sa.column('average_order_value', sa.Float),
+    sa.column('review_count', sa.Integer),
+    sa.column('rating_sum', sa.Integer),
+)
+
+
+def _backfill(conn):
+    # Running totals: one grouped INSERT ... SELECT
+    review_summary = sa.table('review_summary', *[
+        sa.column(name, sa.Integer)
+        for name in ['restaurant_id', 'rating_count', 'rating_sum'] + [f'rating_{r}' for r in RATINGS]
+    ])
+    r = review_table.c
+    conn.execute(review_summary.insert().from_select(
+        ['restaurant_id', 'rating_count', 'rating_sum'] + [f'rating_{n}' for n in RATINGS],
+        sa.select(
+            r.restaurant_id,
+            sa.func.count(r.id),
+            sa.func.coalesce(sa.func.sum(r.rating), 0),
+            *[sa.func.sum(sa.case((r.rating == n, 1), else_=0)) for n in RATINGS]
+        ).group_by(r.restaurant_id)
+    ))
+
+    # Daily rollups: update the days that already have a row, insert the rest
+    day = sa.func.date(r.created_at)
+    daily = conn.execute(
+        sa.select(r.restaurant_id, day, sa.func.count(r.id), sa.func.coalesce(sa.func.sum(r.rating), 0))
+        .where(r.created_at.isnot(None))
+        .group_by(r.restaurant_id, day)
+    ).all()
+    if not daily:
+        return
+
+    s = summary_table.c
+    existing = {
+        (rid, d.isoformat() if isinstance(d, date) else d)
+        for rid, d in conn.execute(sa.select(s.restaurant_id, s.date)).all()
+    }
+    updates, inserts = [], []
+    for rid, d, count, rating_sum in daily:
+        # SQLite returns DATE() as a string
+        d = date.fromisoformat(d) if isinstance(d, str) else d
+        row = {'rid': rid, 'day': d, 'count': count, 'rating_sum': int(rating_sum)}
+        (updates if (rid, d.isoformat()) in existing else inserts).append(row)
+
+    if updates:
+        conn.execute(
+            summary_table.update()
+            .where(s.restaurant_id == sa.bindparam('rid'), s.date == sa.bindparam('day'))
+            .values(review_count=sa.bindparam('count'), rating_sum=sa.bindparam('rating_sum')),
+            updates
+        )
+    if inserts:
+        conn.execute(summary_table.insert(), [
+            {'restaurant_id': row['rid'], 'date': row['day'], 'total_orders': 0, 'total_revenue': 0.0,
+             'average_order_value': 0.0, 'review_count': row['count'], 'rating_sum': row['rating_sum']}
+            for row in inserts
+        ])
+
+
+def upgrade():
+    op.create_table(
+        'review_summary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('restaurant_id', sa.Integer(), nullable=False),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        *[sa.Column(f'rating_{r}', sa.Integer(), nullable=False, server_default='0') for r in RATINGS],
+        sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('restaurant_id')
+    )
+
+    with op.batch_alter_table('monthly_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.create_index('ix_review_restaurant_created', ['restaurant_id', 'created_at', 'id'], unique=False)
+
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_restaurant_created')
+
+    with op.batch_alter_table('monthly_summary', schema=None) as batch_op:
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('review_count')
+
+    op.drop_table('review_summary')
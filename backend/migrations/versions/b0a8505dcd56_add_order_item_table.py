@@ -0,0 +1,124 @@
+"""Add normalized order_item table and backfill it from order.items_json
+
+Revision ID: b0a8505dcd56
+Revises: 12e12631746e
+Create Date: 2026-10-17 11:26:52.903417
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b0a8505dcd56'
+down_revision = '12e12631746e'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 1000
+
+order_table = sa.table(
+    'order',
+    sa.column('id', sa.Integer),
+    sa.column('restaurant_id', sa.Integer),
+    sa.column('items_json', sa.Text),
+)
+
+order_item_table = sa.table(
+    'order_item',
+    sa.column('order_id', sa.Integer),
+    sa.column('restaurant_id', sa.Integer),
+    sa.column('menu_item_id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('quantity', sa.Integer),
+    sa.column('unit_price', sa.Float),
+    sa.column('line_total', sa.Float),
+)
+
+menu_item_table = sa.table('menu_item', sa.column('id', sa.Integer))
+
+
+def _lines_for(order_id, restaurant_id, items_json, known_menu_ids):
+    try:
+        items = json.loads(items_json or '[]')
+    except ValueError:
+        return []
+    if not isinstance(items, list):
+        return []
+
+    rows = []
+    for line in items:
+        if not isinstance(line, dict):
+            continue
+        try:
+            quantity = max(int(line.get('quantity') or 1), 1)
+            unit_price = float(line.get('price') or 0)
+        except (TypeError, ValueError):
+            continue
+        try:
+            menu_item_id = int(line.get('id'))
+        except (TypeError, ValueError):
+            menu_item_id = None
+        if menu_item_id not in known_menu_ids:
+            menu_item_id = None
+        rows.append({
+            'order_id': order_id,
+            'restaurant_id': restaurant_id,
+            'menu_item_id': menu_item_id,
+            'name': str(line.get('name') or '')[:100],
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'line_total': round(unit_price * quantity, 2),
+        })
+    return rows
+
+
+def upgrade():
+    op.create_table('order_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('line_total', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_item_order_id'), ['order_id'], unique=False)
+        batch_op.create_index('ix_order_item_restaurant_menu_item', ['restaurant_id', 'menu_item_id'], unique=False)
+
+    # Backfill in id-ordered chunks so large order tables never load at once
+    bind = op.get_bind()
+    known_menu_ids = {row.id for row in bind.execute(sa.select(menu_item_table.c.id))}
+    last_id = 0
+    while True:
+        chunk = bind.execute(
+            sa.select(order_table.c.id, order_table.c.restaurant_id, order_table.c.items_json)
+            .where(order_table.c.id > last_id)
+            .order_by(order_table.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).fetchall()
+        if not chunk:
+            break
+
+        rows = []
+        for order_id, restaurant_id, items_json in chunk:
+            rows.extend(_lines_for(order_id, restaurant_id, items_json, known_menu_ids))
+        if rows:
+            op.bulk_insert(order_item_table, rows)
+        last_id = chunk[-1].id
+
+
+def downgrade():
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_item_restaurant_menu_item')
+        batch_op.drop_index(batch_op.f('ix_order_item_order_id'))
+
+    op.drop_table('order_item')
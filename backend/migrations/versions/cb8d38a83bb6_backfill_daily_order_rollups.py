@@ -0,0 +1,90 @@
+"""Backfill monthly_summary order totals from completed orders
+
+Revision ID: cb8d38a83bb6
+Revises: 58fe1b54a8c6
+Create Date: 2026-10-17 21:12:40.118305
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb8d38a83bb6'
+down_revision = '58fe1b54a8c6'
+branch_labels = None
+depends_on = None
+
+order_table = sa.table(
+    'order',
+    sa.column('id', sa.Integer),
+    sa.column('restaurant_id', sa.Integer),
+    sa.column('total', sa.Float),
+    sa.column('status', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+
+summary_table = sa.table(
+    'monthly_summary',
+    sa.column('restaurant_id', sa.Integer),
+    sa.column('date', sa.Date),
+    sa.column('total_orders', sa.Integer),
+    sa.column('total_revenue', sa.Float),
+    sa.column('average_order_value', sa.Float),
+    sa.column('review_count', sa.Integer),
+    sa.column('rating_sum', sa.Integer),
+)
+
+
+def upgrade():
+    # Analytics read order totals only from the daily rollups, so fill them
+    # for orders completed before the rollups were maintained. Same grouping
+    # as utils.summaries.rebuild_daily_summaries.
+    conn = op.get_bind()
+    o = order_table.c
+    day = sa.func.date(o.created_at)
+    daily = conn.execute(
+        sa.select(o.restaurant_id, day, sa.func.count(o.id), sa.func.coalesce(sa.func.sum(o.total), 0.0))
+        .where(o.status == 'completed', o.created_at.isnot(None))
+        .group_by(o.restaurant_id, day)
+    ).all()
+    if not daily:
+        return
+
+    s = summary_table.c
+    existing = {
+        (rid, d.isoformat() if isinstance(d, date) else d)
+        for rid, d in conn.execute(sa.select(s.restaurant_id, s.date)).all()
+    }
+    updates, inserts = [], []
+    for rid, d, count, revenue in daily:
+        # SQLite returns DATE() as a string
+        d = date.fromisoformat(d) if isinstance(d, str) else d
+        row = {'rid': rid, 'day': d, 'count': count, 'revenue': float(revenue),
+               'average': float(revenue) / count if count else 0.0}
+        (updates if (rid, d.isoformat()) in existing else inserts).append(row)
+
+    if updates:
+        # Recomputed totals replace whatever the day held (e.g. the zeroed
+        # rows 58fe1b54a8c6 inserted for days with reviews)
+        conn.execute(
+            summary_table.update()
+            .where(s.restaurant_id == sa.bindparam('rid'), s.date == sa.bindparam('day'))
+            .values(total_orders=sa.bindparam('count'), total_revenue=sa.bindparam('revenue'),
+                    average_order_value=sa.bindparam('average')),
+            updates
+        )
+    if inserts:
+        conn.execute(summary_table.insert(), [
+            {'restaurant_id': row['rid'], 'date': row['day'], 'total_orders': row['count'],
+             'total_revenue': row['revenue'], 'average_order_value': row['average'],
+             'review_count': 0, 'rating_sum': 0}
+            for row in inserts
+        ])
+
+
+def downgrade():
+    # Data-only migration; the rollup rows stay valid without it
+    pass
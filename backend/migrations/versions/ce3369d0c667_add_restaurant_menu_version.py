@@ -0,0 +1,26 @@
+"""Add restaurant.menu_version for menu cache invalidation
+
+Revision ID: ce3369d0c667
+Revises: b0a8505dcd56
+Create Date: 2026-10-17 12:41:09.117254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce3369d0c667'
+down_revision = 'b0a8505dcd56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('menu_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.drop_column('menu_version')
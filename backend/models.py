@@ -10,6 +10,7 @@ class Restaurant(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    menu_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     menu_items = db.relationship('MenuItem', backref='restaurant', lazy=True, cascade="all, delete-orphan")
     tables = db.relationship('Table', backref='restaurant', lazy=True, cascade="all, delete-orphan")
@@ -32,6 +33,12 @@ class MenuItem(db.Model):
     is_vegan = db.Column(db.Boolean, default=False, nullable=False)
     is_gluten_free = db.Column(db.Boolean, default=False, nullable=False)
     is_nut_free = db.Column(db.Boolean, default=False, nullable=False)
+    # The four flags above as bits (utils.dietary.DIETARY_BITS); written alongside them
+    dietary_mask = db.Column(db.SmallInteger, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_menu_item_restaurant_available_dietary', 'restaurant_id', 'available', 'dietary_mask'),
+    )
 
 class Table(db.Model):
     __tablename__ = "table"
@@ -52,11 +59,58 @@ class Order(db.Model):
     table_id = db.Column(db.Integer, db.ForeignKey("table.id"), nullable=False)
     customer_name = db.Column(db.String(100))
     customer_phone = db.Column(db.String(15))
-    items_json = db.Column(db.Text, nullable=False)  # Or create OrderItem table for normalized items
+    items_json = db.Column(db.Text, nullable=False)  # Kept for clients; lines are normalized in OrderItem
     total = db.Column(db.Float)
     status = db.Column(db.String(20), default='pending')
     payment_method = db.Column(db.String(20))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on every status change
+
+    items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index('ix_order_restaurant_created', 'restaurant_id', 'created_at', 'id'),
+        db.Index('ix_order_restaurant_status_created', 'restaurant_id', 'status', 'created_at', 'id'),
+    )
+
+class OrderItem(db.Model):
+    __tablename__ = "order_item"
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False, index=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_item.id", ondelete="SET NULL"))
+    name = db.Column(db.String(100), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    unit_price = db.Column(db.Float, nullable=False, default=0.0)
+    line_total = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (db.Index('ix_order_item_restaurant_menu_item', 'restaurant_id', 'menu_item_id'),)
+
+class OrderEvent(db.Model):
+    __tablename__ = "order_event"
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
+    order_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(30), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_order_event_restaurant_id_id', 'restaurant_id', 'id'),)
+
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_key"
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(50), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)  # NULL while the first request is still running
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (db.UniqueConstraint('scope', 'key', name='uq_idempotency_scope_key'),)
 
 class Review(db.Model):
     __tablename__ = "review"
@@ -67,6 +121,23 @@ class Review(db.Model):
     comment = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (db.Index('ix_review_restaurant_created', 'restaurant_id', 'created_at', 'id'),)
+
+# Running rating totals per restaurant, updated in the same transaction as each new review
+class ReviewSummary(db.Model):
+    __tablename__ = "review_summary"
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False, unique=True)
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Histogram: number of reviews with each rating
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
 class MonthlySummary(db.Model):
     __tablename__ = "monthly_summary"
     
@@ -76,6 +147,9 @@ class MonthlySummary(db.Model):
     total_orders = db.Column(db.Integer, default=0)
     total_revenue = db.Column(db.Float, default=0.0)
     average_order_value = db.Column(db.Float, default=0.0)
+    # Reviews written that day, for windowed average ratings
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     __table_args__ = (db.UniqueConstraint('restaurant_id', 'date', name='unique_restaurant_date'),)
 
@@ -1,30 +1,20 @@
 # routes/analytics.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from extensions import db
-from models import Order, Review
-from functools import wraps
-import jwt
+from models import Order, Review, MonthlySummary, Table
+from utils.analytics_cube import WEEKDAYS, cube_available, get_order_cube
+from utils.auth import auth_required
+from utils.orders import ORDER_STATUSES
 import datetime
 from sqlalchemy import func
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
-def auth_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            token = token.split(' ')[1] if ' ' in token else token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            user_id = data.get('restaurant_id')
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-        except Exception:
-            return jsonify({'error': 'Invalid token'}), 401
-        return f(user_id, *args, **kwargs)
-    return decorated
+TIME_RANGE_DAYS = {'7days': 7, '30days': 30, '90days': 90, '365days': 365}
+MAX_HOURLY_RANGE = datetime.timedelta(days=31)
+MAX_DAILY_RANGE = datetime.timedelta(days=731)
+MAX_UTC_OFFSET_MINUTES = 14 * 60
+
 
 @analytics_bp.route('/', methods=['GET'])
 @auth_required
@@ -32,24 +22,21 @@ def get_analytics(restaurant_id):
     time_range = request.args.get('timeRange', '7days')
     now = datetime.datetime.utcnow()
 
-    if time_range == '30days':
-        start_date = now - datetime.timedelta(days=30)
-    else:
-        start_date = now - datetime.timedelta(days=7)  # default 7 days
+    days = TIME_RANGE_DAYS.get(time_range, 7)  # default 7 days
+    start_date = now - datetime.timedelta(days=days)
 
-    completed_orders = Order.query.filter(
-        Order.restaurant_id == restaurant_id,
-        Order.status == 'completed',
-        Order.created_at >= start_date
-    ).all()
+    # Read the precomputed daily rollups (one row per day) instead of raw orders and reviews
+    total_orders, total_revenue, review_count, rating_sum = db.session.query(
+        func.coalesce(func.sum(MonthlySummary.total_orders), 0),
+        func.coalesce(func.sum(MonthlySummary.total_revenue), 0.0),
+        func.coalesce(func.sum(MonthlySummary.review_count), 0),
+        func.coalesce(func.sum(MonthlySummary.rating_sum), 0)
+    ).filter(
+        MonthlySummary.restaurant_id == restaurant_id,
+        MonthlySummary.date >= start_date.date()
+    ).one()
 
-    total_orders = len(completed_orders)
-    total_revenue = sum(order.total for order in completed_orders) if completed_orders else 0.0
-
-    avg_rating = db.session.query(func.avg(Review.rating)).filter(
-        Review.restaurant_id == restaurant_id,
-        Review.created_at >= start_date
-    ).scalar() or 0.0
+    avg_rating = float(rating_sum) / review_count if review_count else 0.0
 
     recent_reviews = Review.query.filter(
         Review.restaurant_id == restaurant_id,
@@ -60,23 +47,225 @@ def get_analytics(restaurant_id):
     recent_comments = [r.comment for r in recent_reviews]
 
     return jsonify({
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
+        'total_orders': int(total_orders),
+        'total_revenue': float(total_revenue),
+        'average_order_value': float(total_revenue) / total_orders if total_orders else 0.0,
         'average_rating': round(avg_rating, 2),
         'recent_reviews': recent_comments
     })
-from models import Order, MenuItem  # or whatever data you want to aggregate
 
-analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+def _parse_range_arg(value):
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _request_range(default_days):
+    """
+    (since, until) from the since/until (ISO 8601) or timeRange query params;
+    until defaults to now. Raises ValueError on malformed or empty ranges.
+    """
+    until = _parse_range_arg(request.args.get('until')) or datetime.datetime.utcnow()
+    since = _parse_range_arg(request.args.get('since'))
+    if since is None:
+        since = until - datetime.timedelta(days=TIME_RANGE_DAYS.get(request.args.get('timeRange'), default_days))
+    if since >= until:
+        raise ValueError('Invalid date range')
+    return since, until
+
+
+def _hour_bucket(column):
+    """
+    SQL expression truncating a timestamp to its hour, rendered as an ISO string.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return func.to_char(func.date_trunc('hour', column), 'YYYY-MM-DD"T"HH24:00:00')
+    if dialect == 'mysql':
+        return func.date_format(column, '%Y-%m-%dT%H:00:00')
+    return func.strftime('%Y-%m-%dT%H:00:00', column)
+
+
+@analytics_bp.route('/series', methods=['GET'])
+@auth_required
+def get_analytics_series(restaurant_id):
+    """
+    Revenue and completed-order counts bucketed by hour or day, for charts.
+    Query params: bucket (hour|day, default day), timeRange or since/until (ISO 8601).
+    Hourly buckets come from one grouped query over orders (max 31 days);
+    daily buckets read the precomputed daily rollups (max 2 years).
+    Empty buckets are returned as zeros.
+    """
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in ('hour', 'day'):
+        return jsonify({'error': 'Invalid bucket'}), 400
+
+    try:
+        since, until = _request_range(1 if bucket == 'hour' else 7)
+    except ValueError:
+        return jsonify({'error': 'Invalid date range'}), 400
+
+    if bucket == 'hour':
+        if until - since > MAX_HOURLY_RANGE:
+            return jsonify({'error': 'Hourly series are limited to 31 days'}), 400
+        label = _hour_bucket(Order.created_at)
+        rows = db.session.query(
+            label,
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total), 0.0)
+        ).filter(
+            Order.restaurant_id == restaurant_id,
+            Order.status == 'completed',
+            Order.created_at >= since,
+            Order.created_at < until
+        ).group_by(label).all()
+        step = datetime.timedelta(hours=1)
+        cursor = since.replace(minute=0, second=0, microsecond=0)
+        fmt = '%Y-%m-%dT%H:00:00'
+    else:
+        if until - since > MAX_DAILY_RANGE:
+            return jsonify({'error': 'Daily series are limited to 2 years'}), 400
+        rows = db.session.query(
+            MonthlySummary.date,
+            MonthlySummary.total_orders,
+            MonthlySummary.total_revenue
+        ).filter(
+            MonthlySummary.restaurant_id == restaurant_id,
+            MonthlySummary.date >= since.date(),
+            MonthlySummary.date <= until.date()
+        ).all()
+        rows = [(d.isoformat(), count, revenue) for d, count, revenue in rows]
+        step = datetime.timedelta(days=1)
+        cursor = datetime.datetime.combine(since.date(), datetime.time())
+        fmt = '%Y-%m-%d'
+
+    totals = {key: (int(count or 0), float(revenue or 0)) for key, count, revenue in rows}
+    series = []
+    while cursor < until:
+        key = cursor.strftime(fmt)
+        count, revenue = totals.get(key, (0, 0.0))
+        series.append({'bucket': key, 'orders': count, 'revenue': revenue})
+        cursor += step
+
+    return jsonify({
+        'bucket': bucket,
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'series': series
+    })
+
+
+# -------------------------
+# Drill-downs (in-memory order cube)
+# -------------------------
+def _cube_response(restaurant_id, breakdown, respond):
+    """
+    Shared handling for the cube endpoints: parses timeRange or since/until
+    (default 30 days) and ?status=a,b, refreshes this worker's cube for the
+    restaurant, runs `breakdown(cube, since=, until=, statuses=)` on it and
+    returns jsonify() of the range plus respond(result).
+    """
+    if not cube_available():
+        return jsonify({'error': 'Drill-down analytics are not available on this server'}), 503
+    try:
+        since, until = _request_range(30)
+    except ValueError:
+        return jsonify({'error': 'Invalid date range'}), 400
+    status = request.args.get('status')
+    statuses = [s.strip() for s in status.split(',') if s.strip()] if status else None
+    if statuses and any(s not in ORDER_STATUSES for s in statuses):
+        return jsonify({'error': 'Invalid status'}), 400
+
+    cube = get_order_cube(restaurant_id)
+    with cube.lock:
+        cube.refresh()
+        result = breakdown(cube, since=since, until=until, statuses=statuses)
+    return jsonify({'since': since.isoformat(), 'until': until.isoformat(), **respond(result, since, until)})
+
+
+@analytics_bp.route('/heatmap', methods=['GET'])
+@auth_required
+def get_order_heatmap(restaurant_id):
+    """
+    Orders and revenue per weekday x hour of day (Monday first).
+    Query params: timeRange or since/until, status (comma-separated),
+    utcOffset (minutes east of UTC, e.g. 330 for IST) to bucket in local time.
+    """
+    try:
+        utc_offset = int(request.args.get('utcOffset', 0))
+    except ValueError:
+        return jsonify({'error': 'Invalid utcOffset'}), 400
+    if abs(utc_offset) > MAX_UTC_OFFSET_MINUTES:
+        return jsonify({'error': 'Invalid utcOffset'}), 400
+
+    return _cube_response(
+        restaurant_id,
+        lambda cube, **kw: cube.heatmap(utc_offset_minutes=utc_offset, **kw),
+        lambda heatmap, since, until: {
+            'utc_offset': utc_offset,
+            'weekdays': list(WEEKDAYS),
+            'orders': heatmap[0],
+            'revenue': heatmap[1]
+        }
+    )
+
+
+@analytics_bp.route('/payment-mix', methods=['GET'])
+@auth_required
+def get_payment_mix(restaurant_id):
+    """
+    Orders, revenue and share of orders per payment method.
+    Query params: timeRange or since/until, status (comma-separated).
+    """
+    return _cube_response(
+        restaurant_id,
+        lambda cube, **kw: cube.payment_mix(**kw),
+        lambda mix, since, until: {'payment_methods': mix}
+    )
+
+
+@analytics_bp.route('/table-turnover', methods=['GET'])
+@auth_required
+def get_table_turnover(restaurant_id):
+    """
+    Per-table orders, revenue, average order value and orders per day
+    (turnover) over the range, busiest table first.
+    Query params: timeRange or since/until, status (comma-separated).
+    """
+    return _cube_response(
+        restaurant_id,
+        lambda cube, **kw: cube.table_turnover(**kw),
+        lambda tables, since, until: {'tables': _with_table_details(restaurant_id, tables, since, until)}
+    )
+
+
+def _with_table_details(restaurant_id, tables, since, until):
+    # Table numbers in one query; turnover is orders per day over the range
+    numbers = dict(db.session.query(Table.id, Table.number).filter(
+        Table.restaurant_id == restaurant_id
+    ).all()) if tables else {}
+    days = (until - since).total_seconds() / 86400
+    for row in tables:
+        row['table_number'] = numbers.get(row['table_id'])
+        row['orders_per_day'] = round(row['orders'] / days, 2)
+    return sorted(tables, key=lambda row: row['orders'], reverse=True)
+
 
 @analytics_bp.route('/<int:restaurant_id>', methods=['GET'])
 def restaurant_analytics(restaurant_id):
-    # Example: total sales and order count
-    orders = Order.query.filter_by(restaurant_id=restaurant_id).all()
-    total_sales = sum(o.total for o in orders)
-    order_count = len(orders)
+    # Total sales and order count, aggregated in SQL
+    order_count, total_sales, average_order_value = db.session.query(
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total), 0.0),
+        func.coalesce(func.avg(Order.total), 0.0)
+    ).filter(Order.restaurant_id == restaurant_id).one()
     return jsonify({
         "restaurant_id": restaurant_id,
-        "order_count": order_count,
-        "total_sales": total_sales
+        "order_count": int(order_count),
+        "total_sales": float(total_sales),
+        "average_order_value": round(float(average_order_value), 2)
     }), 200
\ No newline at end of file
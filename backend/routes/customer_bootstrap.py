@@ -0,0 +1,58 @@
+# routes/customer_bootstrap.py
+from flask import Blueprint, jsonify, request
+from models import MenuItem
+from routes.customer_menu import serialize_customer_item
+from utils import enabled_payment_modes, get_customer_context
+from utils.menu_cache import cached_for_version
+from utils.payment_gateway import get_payment_gateway
+
+customer_bootstrap_bp = Blueprint('customer_bootstrap', __name__, url_prefix='/api/customer/bootstrap')
+
+
+@customer_bootstrap_bp.route('/<int:restaurant_id>', methods=['GET'])
+@customer_bootstrap_bp.route('/<int:restaurant_id>/<table_number>', methods=['GET'])
+def get_customer_bootstrap(restaurant_id, table_number=None):
+    """
+    Everything the QR landing page needs in one round trip: restaurant profile,
+    the table, the available menu grouped by category and the enabled payment
+    modes. One query for restaurant, settings and table; the grouped menu
+    comes from the versioned menu cache (one more query on a miss).
+    A missing or unknown table (renamed, deleted) still returns the menu,
+    with "table": null.
+    """
+    context = get_customer_context(restaurant_id, table_number)
+    if context is None:
+        return jsonify({"error": "Restaurant not found"}), 404
+
+    menu = cached_for_version('bootstrap', restaurant_id, context.menu_version,
+                              lambda: _build_grouped_menu(restaurant_id))
+
+    response = jsonify({
+        "restaurant": {
+            "id": context.restaurant_id,
+            "name": context.name,
+            "description": context.description or "",
+        },
+        "table": {
+            "id": context.table_id,
+            "number": context.table_number,
+            "seats": context.seats,
+        } if context.table_id is not None else None,
+        "menu": menu,
+        "payment_modes": enabled_payment_modes(context, get_payment_gateway()),
+        "menu_version": context.menu_version,
+    })
+    # Revisits with an unchanged payload get a 304 instead of the body
+    response.add_etag()
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+
+def _build_grouped_menu(restaurant_id):
+    menu_items = MenuItem.query.filter_by(restaurant_id=restaurant_id, available=True).order_by(MenuItem.id).all()
+
+    # Categories in order of their first item
+    groups = {}
+    for item in menu_items:
+        groups.setdefault(item.category or "", []).append(serialize_customer_item(item))
+    return [{"category": category, "items": items} for category, items in groups.items()]
@@ -1,46 +1,100 @@
 # routes/customer_menu.py
-from flask import Blueprint, jsonify
+import hashlib
+
+from flask import Blueprint, jsonify, request
 from extensions import db
 from models import MenuItem
+from utils.dietary import dietary_mask, masks_including
+from utils.menu_cache import cached_for_version, cached_menu_response, get_menu_version
 
 customer_menu_bp = Blueprint('customer_menu', __name__, url_prefix='/api/customer/menu')
 
 
+# ?diet= names -> MenuItem flag fields
+DIET_FILTERS = {
+    "vegetarian": "is_vegetarian",
+    "vegan": "is_vegan",
+    "gluten_free": "is_gluten_free",
+    "nut_free": "is_nut_free",
+}
+
+
 @customer_menu_bp.route('/<int:restaurant_id>', methods=['GET'])
 def get_customer_menu(restaurant_id):
     """
     Returns all available menu items for a given restaurant.
     Each item includes basic info and dietary information.
+    Optional filters: ?diet=vegan,nut_free (items must match all) and
+    ?category=Mains,Desserts (any of). Diet filtering runs in the database on
+    the (restaurant_id, available, dietary_mask) index.
+    Served from the versioned menu cache (ETag / If-None-Match).
     """
+    diets = [d.strip().lower() for d in request.args.get('diet', '').split(',') if d.strip()]
+    unknown = [d for d in diets if d not in DIET_FILTERS]
+    if unknown:
+        return jsonify({"error": f"Unknown diet filter: {', '.join(unknown)}",
+                        "allowed": list(DIET_FILTERS)}), 400
+    required = dietary_mask({DIET_FILTERS[d]: True for d in diets})
+    categories = sorted({c.strip() for c in request.args.get('category', '').split(',') if c.strip()})
+
+    # One cache entry per diet mask (at most 16 per restaurant). Category
+    # subsets get their own ETag but are filtered from the cached item list
+    # rather than cached, so arbitrary ?category= values can't evict menus.
+    kind = f"customer-d{required}" if required else "customer"
+
     try:
-        # Fetch only available items
-        menu_items = MenuItem.query.filter_by(restaurant_id=restaurant_id, available=True).all()
-
-        if not menu_items:
-            return jsonify({"message": "No menu items available"}), 200
-
-        # Serialize menu items safely
-        result = []
-        for item in menu_items:
-            result.append({
-                "id": str(item.id),
-                "name": item.name,
-                "description": item.description or "",
-                "price": float(item.price) if item.price is not None else 0.0,
-                "category": item.category or "",
-                "image": item.image_url or "",
-                "available": item.available,
-                "dietaryInfo": {
-                    "isVegetarian": bool(item.is_vegetarian),
-                    "isVegan": bool(item.is_vegan),
-                    "isGlutenFree": bool(item.is_gluten_free),
-                    "isNutFree": bool(item.is_nut_free),
-                }
-            })
-
-        return jsonify(result), 200
+        if not categories:
+            return cached_menu_response(kind, restaurant_id,
+                                        lambda: _customer_menu_payload(_customer_items(restaurant_id, required)))
+
+        version = get_menu_version(restaurant_id)
+        digest = hashlib.sha1("\n".join(categories).encode()).hexdigest()[:12]
+
+        def build():
+            items = cached_for_version(f"{kind}-items", restaurant_id, version,
+                                       lambda: _customer_items(restaurant_id, required))
+            wanted = set(categories)
+            return _customer_menu_payload([item for item in items if item["category"] in wanted])
+
+        return cached_menu_response(f"{kind}-c{digest}", restaurant_id, build, version=version, cache=False)
 
     except Exception as e:
         # Log error for debugging
         print(f"Error fetching customer menu for restaurant {restaurant_id}: {e}")
         return jsonify({"error": "Server error", "details": str(e)}), 500
+
+
+def _customer_items(restaurant_id, required=0):
+    # Fetch only available items
+    query = MenuItem.query.filter_by(restaurant_id=restaurant_id, available=True)
+    if required:
+        # IN over the matching masks keeps this a seek on the composite index
+        query = query.filter(MenuItem.dietary_mask.in_(masks_including(required)))
+    return [serialize_customer_item(item) for item in query.order_by(MenuItem.id).all()]
+
+
+def _customer_menu_payload(items):
+    if not items:
+        return {"message": "No menu items available"}, 200
+    return items, 200
+
+
+def serialize_customer_item(item):
+    """
+    Customer-facing menu item (also used by the bootstrap payload).
+    """
+    return {
+        "id": str(item.id),
+        "name": item.name,
+        "description": item.description or "",
+        "price": float(item.price) if item.price is not None else 0.0,
+        "category": item.category or "",
+        "image": item.image_url or "",
+        "available": item.available,
+        "dietaryInfo": {
+            "isVegetarian": bool(item.is_vegetarian),
+            "isVegan": bool(item.is_vegan),
+            "isGlutenFree": bool(item.is_gluten_free),
+            "isNutFree": bool(item.is_nut_free),
+        }
+    }
@@ -1,29 +1,31 @@
 # routes/customer_order.py
 from flask import Blueprint, request, jsonify
 from extensions import db
-from models import Order, Table
-from utils import get_restaurant_settings_dict
-import json
+from models import Order
+from utils import get_customer_context
+from utils.order_events import record_order_event, notify_order_events
+from utils.idempotency import idempotent
+from utils.orders import build_order_items, insert_order_items, order_items_json
+from utils.qr_helper import qr_data_uri
+from utils.payment_gateway import PaymentGatewayError, get_payment_gateway
 import urllib.parse
-import razorpay
 
 customer_order_bp = Blueprint('customer_order', __name__, url_prefix='/api/customer-order')
 
-# Initialize Razorpay client globally (replace with environment variables ideally)
-razorpay_client = razorpay.Client(auth=("rzp_test_e3clyMYTBwCo5r", "IlcQx8KXIasO6QgGXmKCmopE"))
-
 
 @customer_order_bp.route('/create-order', methods=['POST'])
+@idempotent('customer_order')
 def create_order_with_payment():
     """
     Creates a new order and generates payment instructions based on selected method:
     cash, UPI, or Razorpay.
+    Send an Idempotency-Key header to make retries safe: a repeated request
+    returns the original response instead of creating another order.
     """
     data = request.get_json() or {}
 
     # --- Parse payload safely ---
     try:
-        amount = float(data.get('amount', 0))
         restaurant_id = int(data.get('restaurant_id', 0))
         table_number = data.get('table_number')
         requested_payment_mode = (data.get('payment_method') or '').strip().lower()
@@ -35,18 +37,26 @@ def create_order_with_payment():
         return jsonify({"error": "Invalid payload", "details": str(e)}), 400
 
     # --- Validate essential fields ---
-    if not (restaurant_id and table_number and amount > 0):
+    if not (restaurant_id and table_number and items):
         return jsonify({"error": "Missing required order details"}), 400
 
-    # --- Find the table ---
-    table = Table.query.filter_by(restaurant_id=restaurant_id, number=str(table_number)).first()
-    if not table:
+    # --- Find the table (with the restaurant's settings, one query) ---
+    context = get_customer_context(restaurant_id, table_number)
+    if context is None or context.table_id is None:
         return jsonify({"error": "Invalid table number"}), 400
 
-    # --- Get restaurant settings ---
-    rs = get_restaurant_settings_dict(restaurant_id)
-    upi_id = rs.get("upi_id")
-    razorpay_merchant_id = rs.get("razorpay_merchant_id")
+    # --- Price the cart from the menu (the client-sent amount is not trusted) ---
+    try:
+        order_items, amount, rejected = build_order_items(restaurant_id, items, menu_version=context.menu_version)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "Invalid payload", "details": str(e)}), 400
+    if rejected:
+        return jsonify({"error": "Some items can't be ordered", "rejected": rejected}), 422
+    if amount <= 0:
+        return jsonify({"error": "Missing required order details"}), 400
+
+    upi_id = context.upi_id
+    razorpay_merchant_id = context.razorpay_merchant_id
 
     # --- Initialize payment variables ---
     payment_mode = None
@@ -58,17 +68,18 @@ def create_order_with_payment():
         payment_mode = "cash"
 
     elif requested_payment_mode == "razorpay" and razorpay_merchant_id:
-        if not razorpay_client:
+        gateway = get_payment_gateway()
+        if not gateway:
             return jsonify({"error": "Razorpay is not configured on server"}), 400
         try:
-            razorpay_order = razorpay_client.order.create({
-                "amount": int(amount * 100),  # Convert to paise
-                "currency": "INR",
-                "receipt": f"receipt_{restaurant_id}_table_{table_number}",
-            })
+            razorpay_order = gateway.create_order(
+                amount,
+                currency="INR",
+                receipt=f"receipt_{restaurant_id}_table_{table_number}",
+            )
             razorpay_order_id = razorpay_order.get("id")
             payment_mode = "razorpay"
-        except Exception as e:
+        except PaymentGatewayError as e:
             print(f"[ERROR] Razorpay order creation failed: {e}")
             return jsonify({"error": "Failed to create Razorpay order", "details": str(e)}), 500
 
@@ -81,7 +92,8 @@ def create_order_with_payment():
             "cu": "INR"
         }
         upi_str = "upi://pay?" + urllib.parse.urlencode(upi_params)
-        upi_qr = f"https://api.qrserver.com/v1/create-qr-code/?size=250x250&data={urllib.parse.quote(upi_str)}"
+        # Rendered locally and inlined so the phone needs no extra round trip
+        upi_qr = qr_data_uri(upi_str, 'png')
 
     else:
         return jsonify({"error": "Invalid or unsupported payment method"}), 400
@@ -90,24 +102,31 @@ def create_order_with_payment():
     try:
         order = Order(
             restaurant_id=restaurant_id,
-            table_id=table.id,
+            table_id=context.table_id,
             customer_name=customer_name,
             customer_phone=customer_phone,
-            items_json=json.dumps(items),
+            items_json=order_items_json(order_items),
             total=amount,
             status='pending',
             payment_method=payment_mode
         )
         db.session.add(order)
+        db.session.flush()
+        insert_order_items(order, order_items)
+        record_order_event(order, 'order.created')
+        order_id = order.id
         db.session.commit()
     except Exception as e:
         print(f"[ERROR] Saving order failed: {e}")
         db.session.rollback()
         return jsonify({"error": "Failed to save order", "details": str(e)}), 500
 
+    notify_order_events()
+
     # --- Return order details ---
     return jsonify({
-        "local_order_id": order.id,
+        "local_order_id": order_id,
+        "amount": amount,
         "payment_mode": payment_mode,
         "upi_id": upi_id if payment_mode == "upi" else None,
         "upi_qr": upi_qr,
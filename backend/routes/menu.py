@@ -1,33 +1,20 @@
 # routes/menu.py
-from flask import Blueprint, request, jsonify, current_app
+import json
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from extensions import db
 from models import MenuItem
-from functools import wraps
-import jwt
-from utils.dietary import detect_dietary_info
+from utils.auth import auth_required
+from utils.dietary import detect_dietary_info, detect_dietary_info_batch, dietary_mask
+from utils.menu_cache import bump_menu_version, cached_menu_response
+from utils.menu_io import (
+    MenuImportError, import_menu_rows, iter_csv_rows, iter_ndjson_rows, iter_json_array_rows,
+    export_menu_csv, export_menu_ndjson
+)
 
 menu_bp = Blueprint('menu', __name__, url_prefix='/api/menu')
 
-
-# -------------------------
-# Auth decorator
-# -------------------------
-def auth_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            token = token.split(' ')[1] if ' ' in token else token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            restaurant_id = data.get('restaurant_id')
-            if not restaurant_id:
-                return jsonify({'error': 'Invalid token'}), 401
-        except Exception:
-            return jsonify({'error': 'Invalid token'}), 401
-        return f(restaurant_id, *args, **kwargs)
-    return decorated
+DIETARY_FIELDS = ('is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_nut_free')
 
 
 # -------------------------
@@ -59,9 +46,11 @@ def add_menu_item(restaurant_id):
         is_vegan=diet["is_vegan"],
         is_gluten_free=diet["is_gluten_free"],
         is_nut_free=diet["is_nut_free"],
+        dietary_mask=diet["dietary_mask"],
     )
 
     db.session.add(item)
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({'message': 'Menu item added', 'id': item.id}), 201
 
@@ -71,8 +60,12 @@ def add_menu_item(restaurant_id):
 # -------------------------
 @menu_bp.route('/<int:restaurant_id>', methods=['GET'])
 def get_menu(restaurant_id):
-    menu_items = MenuItem.query.filter_by(restaurant_id=restaurant_id).all()
-    return jsonify([
+    return cached_menu_response('admin', restaurant_id, lambda: _build_menu(restaurant_id))
+
+
+def _build_menu(restaurant_id):
+    menu_items = MenuItem.query.filter_by(restaurant_id=restaurant_id).order_by(MenuItem.id).all()
+    return [
         {
             "id": item.id,
             "name": item.name,
@@ -88,7 +81,7 @@ def get_menu(restaurant_id):
                 "isNutFree": bool(item.is_nut_free),
             }
         } for item in menu_items
-    ]), 200
+    ], 200
 
 
 # -------------------------
@@ -102,10 +95,24 @@ def update_menu_item(restaurant_id, item_id):
         return jsonify({'error': 'Menu item not found'}), 404
 
     data = request.get_json() or {}
-    for field in ['name', 'description', 'price', 'category', 'image_url', 'available',
-                  'is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_nut_free']:
+    text_changed = any(
+        field in data and data[field] != getattr(item, field)
+        for field in ('name', 'description')
+    )
+    for field in ['name', 'description', 'price', 'category', 'image_url', 'available']:
         if field in data:
             setattr(item, field, data[field])
+
+    # Re-detect flags when the text changes; explicit flags in the payload still win
+    if text_changed:
+        for field, value in detect_dietary_info(item.name, item.description).items():
+            setattr(item, field, value)
+    for field in DIETARY_FIELDS:
+        if field in data:
+            setattr(item, field, data[field])
+    item.dietary_mask = dietary_mask({field: getattr(item, field) for field in DIETARY_FIELDS})
+
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({'message': 'Menu item updated'}), 200
 
@@ -121,5 +128,107 @@ def delete_menu_item(restaurant_id, item_id):
         return jsonify({'error': 'Menu item not found'}), 404
 
     db.session.delete(item)
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({'message': 'Menu item deleted'}), 200
+
+
+# -------------------------
+# Re-classify dietary flags for a whole menu
+# -------------------------
+@menu_bp.route('/<int:menu_restaurant_id>/reclassify', methods=['POST'])
+@auth_required
+def reclassify_menu(restaurant_id, menu_restaurant_id):
+    """
+    Re-runs dietary detection over every item of the restaurant's menu in one
+    batch and writes the changed rows with a single bulk UPDATE.
+    """
+    if menu_restaurant_id != restaurant_id:
+        return jsonify({'error': 'Forbidden'}), 403
+
+    rows = db.session.query(
+        MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.dietary_mask,
+        *[getattr(MenuItem, f) for f in DIETARY_FIELDS]
+    ).filter(MenuItem.restaurant_id == restaurant_id).all()
+
+    detected = detect_dietary_info_batch((r.name, r.description) for r in rows)
+    changes = [
+        {'id': r.id, **flags}
+        for r, flags in zip(rows, detected)
+        if r.dietary_mask != flags['dietary_mask'] or any(bool(getattr(r, f)) != flags[f] for f in DIETARY_FIELDS)
+    ]
+
+    if changes:
+        db.session.execute(db.update(MenuItem), changes)
+        bump_menu_version(restaurant_id)
+        db.session.commit()
+
+    return jsonify({
+        'message': 'Menu reclassified',
+        'total': len(rows),
+        'updated': len(changes)
+    }), 200
+
+
+# -------------------------
+# Bulk import / export
+# -------------------------
+@menu_bp.route('/import', methods=['POST'])
+@auth_required
+def import_menu(restaurant_id):
+    """
+    Bulk-create menu items. Accepts:
+    - text/csv body (header: name,description,price,category,image_url,available)
+    - application/x-ndjson body (one JSON object per line)
+    - application/json body (array of objects)
+    - multipart/form-data with a 'file' field (.csv, .ndjson/.jsonl or .json)
+    Rows are inserted in batches; invalid rows are skipped and reported.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        filename = (upload.filename or '').lower()
+        stream = upload.stream
+        fmt = 'csv' if filename.endswith('.csv') else 'ndjson' if filename.endswith(('.ndjson', '.jsonl')) else 'json'
+    else:
+        stream = request.stream
+        mimetype = request.mimetype
+        fmt = 'csv' if mimetype == 'text/csv' else 'ndjson' if mimetype in ('application/x-ndjson', 'application/jsonl') else 'json'
+
+    try:
+        if fmt == 'csv':
+            rows = iter_csv_rows(stream)
+        elif fmt == 'ndjson':
+            rows = iter_ndjson_rows(stream)
+        else:
+            try:
+                payload = json.load(stream)
+            except ValueError:
+                return jsonify({'error': 'Invalid JSON'}), 400
+            rows = iter_json_array_rows(payload)
+        result = import_menu_rows(restaurant_id, rows)
+    except MenuImportError as e:
+        # Earlier batches may already be committed; report them
+        db.session.rollback()
+        return jsonify({'error': str(e), **e.result}), 400
+
+    status = 201 if result['imported'] else 400
+    return jsonify({'message': 'Menu import finished', **result}), status
+
+
+@menu_bp.route('/export', methods=['GET'])
+@auth_required
+def export_menu(restaurant_id):
+    """
+    Stream the restaurant's full menu as CSV (default) or NDJSON (?format=ndjson).
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt == 'csv':
+        body, mimetype, ext = export_menu_csv(restaurant_id), 'text/csv', 'csv'
+    elif fmt == 'ndjson':
+        body, mimetype, ext = export_menu_ndjson(restaurant_id), 'application/x-ndjson', 'ndjson'
+    else:
+        return jsonify({'error': 'Unsupported format'}), 400
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="menu_{restaurant_id}.{ext}"'
+    return response
@@ -1,58 +1,90 @@
 # routes/order.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from extensions import db
 from models import Order, Table
-from functools import wraps
-import jwt
+from utils.order_events import record_order_event, record_order_events, notify_order_events, stream_order_events
+from utils.orders import (
+    ORDER_STATUSES, can_transition, previous_statuses, serialize_order, filter_orders,
+    build_order_items, insert_order_items, order_items_json
+)
+from utils.pagination import PaginationError, keyset_page, parse_page_size
+from utils.summaries import apply_order_completion, apply_orders_completion
+from utils.auth import STREAM_TOKEN_TTL, auth_required, create_stream_token, stream_auth_required
 import json
 from datetime import datetime
+from sqlalchemy.orm.attributes import set_committed_value
 
 order_bp = Blueprint('order', __name__, url_prefix='/api/orders')
 
+MAX_BULK_ORDERS = 200
+
 
 # -------------------------
-# Auth decorator
+# Get orders (newest first, cursor-paginated)
 # -------------------------
-def auth_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            token = token.split(' ')[1] if ' ' in token else token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            restaurant_id = data.get('restaurant_id')
-            if not restaurant_id:
-                return jsonify({'error': 'Invalid token'}), 401
-        except Exception:
-            return jsonify({'error': 'Invalid token'}), 401
-        return f(restaurant_id, *args, **kwargs)
-    return decorated
+@order_bp.route('/', methods=['GET'])
+@auth_required
+def get_orders(restaurant_id):
+    """
+    Query params: status (comma-separated), since, until (ISO 8601),
+    limit, cursor. The cursor for the next page is returned in the
+    X-Next-Cursor header; it is absent on the last page.
+    """
+    try:
+        query = filter_orders(Order.query.filter_by(restaurant_id=restaurant_id), request.args)
+        orders, next_cursor = keyset_page(
+            query, Order.created_at, Order.id,
+            cursor=request.args.get('cursor'),
+            limit=parse_page_size(request.args.get('limit'))
+        )
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify([serialize_order(o) for o in orders])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
 
 
 # -------------------------
-# Get all orders
+# Live order updates (SSE)
 # -------------------------
-@order_bp.route('/', methods=['GET'])
+@order_bp.route('/stream-token', methods=['POST'])
 @auth_required
-def get_orders(restaurant_id):
-    orders = Order.query.filter_by(restaurant_id=restaurant_id).all()
-    result = [
-        {
-            'id': o.id,
-            'table_id': o.table_id,
-            'customer_name': o.customer_name,
-            'customer_phone': o.customer_phone,
-            'items_json': o.items_json,
-            'total': float(o.total),
-            'status': o.status,
-            'payment_method': o.payment_method,
-            'created_at': o.created_at.isoformat() if o.created_at else None
-        }
-        for o in orders
-    ]
-    return jsonify(result), 200
+def get_stream_token(restaurant_id):
+    """
+    Short-lived token for opening the stream with EventSource, which can't
+    send an Authorization header: GET /api/orders/stream?token=<token>.
+    """
+    return jsonify({
+        'token': create_stream_token(restaurant_id),
+        'expires_in': int(STREAM_TOKEN_TTL.total_seconds())
+    }), 200
+
+
+@order_bp.route('/stream', methods=['GET'])
+@stream_auth_required
+def stream_orders(restaurant_id):
+    """
+    Server-Sent Events feed of order changes for the kitchen dashboard.
+    Events: order.created, order.updated (data is the serialized order), and
+    reset when the resume cursor fell behind retention (reload the order list).
+    Authenticate with the Authorization header or ?token= from /stream-token.
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) to resume.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+
+    response = Response(
+        stream_with_context(stream_order_events(restaurant_id, last_event_id)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 # -------------------------
@@ -69,46 +101,185 @@ def create_order(restaurant_id):
     total = data.get('total')
     payment_method = data.get('payment_method', 'cash')
 
-    if not table_number or total is None:
-        return jsonify({'error': 'Table number and total are required'}), 400
+    if not table_number or (total is None and not items):
+        return jsonify({'error': 'Table number and items (or a total) are required'}), 400
 
     table = Table.query.filter_by(restaurant_id=restaurant_id, number=str(table_number)).first()
     if not table:
         return jsonify({'error': 'Invalid table number'}), 400
 
+    if items:
+        # Priced from the menu; a client-sent total is ignored
+        try:
+            order_items, total, rejected = build_order_items(restaurant_id, items)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid order items'}), 400
+        if rejected:
+            return jsonify({'error': "Some items can't be ordered", 'rejected': rejected}), 422
+        items_json = order_items_json(order_items)
+    else:
+        # Ad-hoc order entered by staff with a manual total
+        try:
+            total = float(total)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid total'}), 400
+        order_items, items_json = [], json.dumps([])
+
     order = Order(
         restaurant_id=restaurant_id,
         table_id=table.id,
         customer_name=customer_name,
         customer_phone=customer_phone,
-        items_json=json.dumps(items),
-        total=float(total),
+        items_json=items_json,
+        total=total,
         status='pending',
         payment_method=payment_method,
         created_at=datetime.utcnow()
     )
     db.session.add(order)
+    db.session.flush()
+    insert_order_items(order, order_items)
+    record_order_event(order, 'order.created')
+    order_id = order.id
     db.session.commit()
+    notify_order_events()
 
-    return jsonify({'message': 'Order created', 'order_id': order.id}), 201
+    return jsonify({'message': 'Order created', 'order_id': order_id, 'total': total}), 201
 
 
 # -------------------------
 # Update order status
 # -------------------------
+def _advance_statement(restaurant_id, order_ids, from_statuses, new_status):
+    """
+    Compare-and-swap UPDATE: only rows still in one of `from_statuses` move,
+    and each moved row's version is bumped.
+    """
+    return db.update(Order).where(
+        Order.restaurant_id == restaurant_id,
+        Order.id.in_(order_ids),
+        Order.status.in_(from_statuses)
+    ).values(status=new_status, version=Order.version + 1).execution_options(synchronize_session=False)
+
+
+def _mark_advanced(order, new_status):
+    # Mirror the UPDATE on the loaded instance without scheduling another write
+    set_committed_value(order, 'status', new_status)
+    set_committed_value(order, 'version', (order.version or 0) + 1)
+
+
 @order_bp.route('/<int:order_id>/status', methods=['PUT'])
 @auth_required
 def update_order_status(restaurant_id, order_id):
+    """
+    Payload: {"status": str, "version": int (optional)}
+    Orders only move forward one step (pending -> preparing -> ready -> completed).
+    Pass the version the client last saw to reject stale updates; either way
+    a concurrent change between read and write returns 409 with the current order.
+    """
     data = request.get_json() or {}
     new_status = data.get('status')
-    valid_statuses = ['pending', 'preparing', 'ready', 'completed']
-    if new_status not in valid_statuses:
+    if new_status not in ORDER_STATUSES:
         return jsonify({'error': 'Invalid status'}), 400
 
+    expected_version = data.get('version')
+    if expected_version is not None:
+        try:
+            expected_version = int(expected_version)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid version'}), 400
+
     order = Order.query.filter_by(id=order_id, restaurant_id=restaurant_id).first()
     if not order:
         return jsonify({'error': 'Order not found'}), 404
-    
-    order.status = new_status
+
+    if expected_version is not None and expected_version != order.version:
+        return jsonify({'error': 'Order was changed by someone else', 'order': serialize_order(order)}), 409
+    if not can_transition(order.status, new_status):
+        return jsonify({
+            'error': f'Cannot move order from {order.status} to {new_status}',
+            'order': serialize_order(order)
+        }), 409
+
+    result = db.session.execute(
+        _advance_statement(restaurant_id, [order.id], [order.status], new_status)
+        .where(Order.version == order.version)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        current = Order.query.filter_by(id=order_id, restaurant_id=restaurant_id).first()
+        return jsonify({'error': 'Order was changed by someone else', 'order': serialize_order(current)}), 409
+
+    _mark_advanced(order, new_status)
+    if new_status == 'completed':
+        apply_order_completion(order)
+    record_order_event(order, 'order.updated')
+    response = serialize_order(order)
     db.session.commit()
-    return jsonify({'message': 'Order status updated'}), 200
+    notify_order_events()
+    return jsonify({'message': 'Order status updated', 'order': response}), 200
+
+
+@order_bp.route('/bulk-status', methods=['POST'])
+@auth_required
+def bulk_update_order_status(restaurant_id):
+    """
+    Move many orders to the next status in one UPDATE.
+    Payload: {"order_ids": [int, ...], "status": str}
+    Orders that don't exist or aren't in the preceding status are skipped
+    and reported; the rest move together.
+    """
+    data = request.get_json() or {}
+    new_status = data.get('status')
+    order_ids = data.get('order_ids')
+    if new_status not in ORDER_STATUSES:
+        return jsonify({'error': 'Invalid status'}), 400
+    from_statuses = previous_statuses(new_status)
+    if not from_statuses:
+        return jsonify({'error': f'Orders cannot be moved to {new_status}'}), 400
+    # A string would otherwise be iterated digit by digit, and int() would
+    # truncate floats and accept booleans
+    if not isinstance(order_ids, list) or any(isinstance(i, (bool, float)) for i in order_ids):
+        return jsonify({'error': 'order_ids must be a list of integers'}), 400
+    try:
+        order_ids = list(dict.fromkeys(int(i) for i in order_ids))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'order_ids must be a list of integers'}), 400
+    if not order_ids or len(order_ids) > MAX_BULK_ORDERS:
+        return jsonify({'error': f'Provide between 1 and {MAX_BULK_ORDERS} order_ids'}), 400
+
+    # Lock the candidates (FOR UPDATE on Postgres/MySQL) so the UPDATE below
+    # moves exactly these rows
+    orders = Order.query.filter(
+        Order.restaurant_id == restaurant_id,
+        Order.id.in_(order_ids)
+    ).with_for_update().all()
+    by_id = {o.id: o for o in orders}
+    movable = [o for o in orders if o.status in from_statuses]
+    skipped = [
+        {'id': i, 'error': 'Order not found'} if i not in by_id
+        else {'id': i, 'error': f'Cannot move order from {by_id[i].status} to {new_status}'}
+        for i in order_ids
+        if i not in by_id or by_id[i].status not in from_statuses
+    ]
+
+    if movable:
+        result = db.session.execute(
+            _advance_statement(restaurant_id, [o.id for o in movable], from_statuses, new_status)
+        )
+        if result.rowcount != len(movable):
+            db.session.rollback()
+            return jsonify({'error': 'Orders were changed by someone else, retry'}), 409
+
+        for order in movable:
+            _mark_advanced(order, new_status)
+        if new_status == 'completed':
+            apply_orders_completion(movable)
+        record_order_events(movable, 'order.updated')
+
+    updated = [serialize_order(o) for o in movable]
+    db.session.commit()
+    if movable:
+        notify_order_events()
+
+    return jsonify({'updated': updated, 'skipped': skipped}), 200
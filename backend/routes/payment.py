@@ -1,6 +1,6 @@
 # routes/payment.py
-from flask import Blueprint, request, jsonify, current_app
-import razorpay
+from flask import Blueprint, request, jsonify
+from utils.payment_gateway import PaymentGatewayError, get_payment_gateway
 
 payment_bp = Blueprint('payment', __name__, url_prefix='/api/payment')
 
@@ -30,26 +30,18 @@ def create_razorpay_order():
         return jsonify({'error': 'Invalid amount'}), 400
 
     # Ensure Razorpay keys are configured
-    key_id = current_app.config.get('RAZORPAY_KEY_ID')
-    key_secret = current_app.config.get('RAZORPAY_KEY_SECRET')
-    if not key_id or not key_secret:
+    gateway = get_payment_gateway()
+    if not gateway:
         return jsonify({'error': 'Razorpay not configured'}), 400
 
-    razorpay_client = razorpay.Client(auth=(key_id, key_secret))
-
-    # Create Razorpay order
+    # Create Razorpay order (shared pooled client)
     try:
-        razorpay_order = razorpay_client.order.create({
-            "amount": int(amount * 100),  # amount in paise
-            "currency": currency,
-            "receipt": receipt,
-            "payment_capture": 1
-        })
+        razorpay_order = gateway.create_order(amount, currency=currency, receipt=receipt, payment_capture=1)
         return jsonify({
             "order_id": razorpay_order.get("id"),
             "amount": razorpay_order.get("amount"),
             "currency": razorpay_order.get("currency"),
             "receipt": razorpay_order.get("receipt")
         }), 201
-    except Exception as e:
+    except PaymentGatewayError as e:
         return jsonify({'error': f"Failed to create Razorpay order: {str(e)}"}), 500
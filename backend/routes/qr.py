@@ -0,0 +1,28 @@
+# routes/qr.py
+from flask import Blueprint, request, jsonify, Response
+from utils.qr_helper import QR_FORMATS, qr_digest, qr_signature_valid, render_qr
+
+qr_bp = Blueprint('qr', __name__, url_prefix='/api/qr')
+
+
+@qr_bp.route('/<fmt>', methods=['GET'])
+def get_qr_image(fmt):
+    """
+    Renders (or serves from the disk cache) a QR code for ?data=<payload>.
+    Only payloads signed by this server (?sig=, see qr_image_url) are added
+    to the disk cache; others are rendered in memory.
+    The URL fully determines the image, so it is cached as immutable.
+    """
+    data = request.args.get('data', '')
+    if fmt not in QR_FORMATS:
+        return jsonify({'error': 'Unsupported format'}), 400
+
+    try:
+        image = render_qr(data, fmt, persist=qr_signature_valid(data, request.args.get('sig')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = Response(image, mimetype=QR_FORMATS[fmt])
+    response.set_etag(qr_digest(data, fmt))
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
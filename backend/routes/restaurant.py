@@ -1,5 +1,7 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from models import Restaurant, Table, Order
+from utils.orders import filter_orders
+from utils.pagination import PaginationError, keyset_page, parse_page_size
 
 restaurant_bp = Blueprint(
     "restaurant",
@@ -43,13 +45,25 @@ def get_restaurant_tables(restaurant_id):
 # ---------------- Restaurant Orders ----------------
 @restaurant_bp.route("/<int:restaurant_id>/orders", methods=["GET"])
 def get_restaurant_orders(restaurant_id):
-    orders = Order.query.filter_by(restaurant_id=restaurant_id).all()
-    return jsonify([
+    try:
+        query = filter_orders(Order.query.filter_by(restaurant_id=restaurant_id), request.args)
+        orders, next_cursor = keyset_page(
+            query, Order.created_at, Order.id,
+            cursor=request.args.get("cursor"),
+            limit=parse_page_size(request.args.get("limit"))
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify([
         {
             "id": o.id,
             "status": o.status,
-            "amount": o.amount,
-            "created_at": o.created_at.isoformat(),
+            "amount": o.total,
+            "created_at": o.created_at.isoformat() if o.created_at else None,
         }
         for o in orders
     ])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
@@ -1,35 +1,15 @@
 # routes/review.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from extensions import db
 from models import Review
-from functools import wraps
-import jwt
+from utils.auth import auth_required
+from utils.pagination import PaginationError, keyset_page, parse_page_size
+from utils.summaries import apply_review, get_review_summary
 from datetime import datetime
 
 review_bp = Blueprint('review', __name__, url_prefix='/api/review')
 
 
-def auth_required(f):
-    """
-    Decorator to enforce JWT authentication for restaurant endpoints.
-    """
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            token = token.split(' ')[1] if ' ' in token else token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            restaurant_id = data.get('restaurant_id')
-            if not restaurant_id:
-                return jsonify({'error': 'Invalid token'}), 401
-        except Exception:
-            return jsonify({'error': 'Invalid token'}), 401
-        return f(restaurant_id, *args, **kwargs)
-    return decorated
-
-
 @review_bp.route('/', methods=['POST'])
 @auth_required
 def add_review(restaurant_id):
@@ -45,8 +25,9 @@ def add_review(restaurant_id):
     rating = data.get('rating')
     comment = data.get('comment', '')
 
-    if rating is None or not (1 <= rating <= 5):
-        return jsonify({'error': 'Rating (1-5) is required'}), 400
+    # Whole numbers only: the rating totals and histogram are built from it
+    if not isinstance(rating, int) or isinstance(rating, bool) or not (1 <= rating <= 5):
+        return jsonify({'error': 'Rating must be a whole number from 1 to 5'}), 400
 
     review = Review(
         restaurant_id=restaurant_id,
@@ -55,23 +36,48 @@ def add_review(restaurant_id):
         created_at=datetime.utcnow()
     )
     db.session.add(review)
+    db.session.flush()
+    review_id = review.id
+    apply_review(review)
     db.session.commit()
 
-    return jsonify({'message': 'Review added', 'review_id': review.id}), 201
+    return jsonify({'message': 'Review added', 'review_id': review_id}), 201
 
 
 @review_bp.route('/', methods=['GET'])
 @auth_required
 def get_reviews(restaurant_id):
     """
-    Get all reviews for the authenticated restaurant, most recent first.
+    Reviews for the authenticated restaurant, most recent first.
+    Query params: limit (default 50, max 200), cursor (from X-Next-Cursor).
     """
-    reviews = Review.query.filter_by(restaurant_id=restaurant_id).order_by(Review.created_at.desc()).all()
-    return jsonify([
+    try:
+        reviews, next_cursor = keyset_page(
+            Review.query.filter_by(restaurant_id=restaurant_id),
+            Review.created_at, Review.id,
+            cursor=request.args.get('cursor'),
+            limit=parse_page_size(request.args.get('limit'))
+        )
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify([
         {
             'id': r.id,
             'rating': r.rating,
             'comment': r.comment,
             'created_at': r.created_at.isoformat()
         } for r in reviews
-    ]), 200
+    ])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+
+@review_bp.route('/summary', methods=['GET'])
+@auth_required
+def get_reviews_summary(restaurant_id):
+    """
+    All-time rating count, average and 1-5 histogram, read from the running totals.
+    """
+    return jsonify(get_review_summary(restaurant_id)), 200
@@ -1,31 +1,12 @@
 # routes/settings.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from extensions import db
 from models import Restaurant, RestaurantSettings
-from functools import wraps
-import jwt
+from utils.auth import auth_required
 
 settings_bp = Blueprint('settings', __name__, url_prefix='/api')
 
 
-def auth_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            token = token.split(' ')[1] if ' ' in token else token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            restaurant_id = data.get('restaurant_id')
-            if not restaurant_id:
-                return jsonify({'error': 'Invalid token'}), 401
-        except Exception:
-            return jsonify({'error': 'Invalid token'}), 401
-        return f(restaurant_id, *args, **kwargs)
-    return decorated
-
-
 @settings_bp.route('/settings', methods=['GET'])
 @auth_required
 def get_settings(restaurant_id):
@@ -1,71 +1,41 @@
 # routes/table.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, Response
 from extensions import db
 from models import Table
-from functools import wraps
-import jwt
-import urllib.parse
+from utils.auth import auth_required
+from utils.qr_helper import QR_FORMATS, build_public_base, qr_image_url, qr_svg_inline, render_qr
+from xml.sax.saxutils import escape
+import io
+import zipfile
 
 table_bp = Blueprint('tables', __name__, url_prefix='/api/tables')
 
+MAX_BULK_TABLES = 500
 
-def auth_required(f):
+
+def table_menu_url(base_url, restaurant_id, number):
     """
-    Decorator to enforce JWT authentication for restaurant endpoints.
+    Customer-facing menu URL encoded in a table's QR (adjust if your frontend uses a different route).
     """
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            token = token.split(' ')[1] if ' ' in token else token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            restaurant_id = data.get('restaurant_id')
-            if not restaurant_id:
-                return jsonify({'error': 'Invalid token'}), 401
-        except Exception:
-            return jsonify({'error': 'Invalid token'}), 401
-        return f(restaurant_id, *args, **kwargs)
-    return decorated
-
-
-def _build_public_base():
-    """
-    Build the public base URL from incoming request headers.
-    Works with ngrok, Cloudflare Tunnel, reverse proxies, etc.
-
-    Priority:
-    1) X-Forwarded-Proto + X-Forwarded-Host (if proxy supplies them)
-    2) X-Forwarded-Proto + Host
-    3) request.scheme + Host
-    4) request.host_url as fallback
-    """
-    forwarded_proto = request.headers.get("X-Forwarded-Proto")
-    forwarded_host = request.headers.get("X-Forwarded-Host") or request.headers.get("Host")
-
-    if forwarded_proto and forwarded_host:
-        scheme = forwarded_proto
-        host = forwarded_host
-    elif forwarded_host:
-        scheme = forwarded_proto or request.scheme
-        host = forwarded_host
-    else:
-        # As a final fallback, use Flask's host_url (contains scheme+host)
-        # host_url contains trailing slash, remove it.
-        return request.host_url.rstrip('/')
+    return f"{base_url}/menu/{restaurant_id}/table_{number}"
 
-    base = f"{scheme}://{host}"
-    return base.rstrip('/')
 
-
-def generate_qr_code_for_target(target_url: str) -> str:
+def generate_qr_code_for_target(target_url: str, base_url: str) -> str:
     """
-    Uses a QR generation service to create a QR image URL for the given target URL.
-    Encodes the target properly.
+    Renders the QR for the target URL locally (warming the disk cache) and
+    returns the URL this server serves the image from.
     """
-    encoded_data = urllib.parse.quote(target_url, safe='')
-    return f"https://api.qrserver.com/v1/create-qr-code/?size=200x200&data={encoded_data}"
+    render_qr(target_url, 'png', persist=True)
+    return qr_image_url(base_url, target_url, 'png')
+
+
+def _serialize_table(t):
+    return {
+        'id': t.id,
+        'number': t.number,
+        'seats': t.seats,
+        'qr_code': t.qr_code
+    }
 
 
 @table_bp.route('/', methods=['POST'])
@@ -85,13 +55,11 @@ def add_table(restaurant_id):
         return jsonify({'error': 'Table number already exists'}), 400
 
     # Build public base dynamically from request (works with ngrok)
-    base_url = _build_public_base()
-
-    # Construct the customer-facing path (adjust if your frontend uses a different route)
-    target = f"{base_url}/menu/{restaurant_id}/table_{number}"
+    base_url = build_public_base()
+    target = table_menu_url(base_url, restaurant_id, number)
 
-    # Generate QR image (using qrserver API). You can switch to other services or generate images server-side.
-    qr_code_url = generate_qr_code_for_target(target)
+    # Render the QR locally; qr_code points at this server's cached image
+    qr_code_url = generate_qr_code_for_target(target, base_url)
 
     table = Table(restaurant_id=restaurant_id, number=number, seats=seats, qr_code=qr_code_url)
     db.session.add(table)
@@ -99,12 +67,105 @@ def add_table(restaurant_id):
 
     return jsonify({
         'message': 'Table added',
-        'table': {
-            'id': table.id,
-            'number': table.number,
-            'seats': table.seats,
-            'qr_code': table.qr_code
+        'table': _serialize_table(table)
+    }), 201
+
+
+def _bulk_table_numbers(data):
+    """
+    Table numbers from a bulk payload: {"numbers": [...]} or {"from": int, "to": int}.
+    Duplicates in the payload are dropped, keeping the first occurrence.
+    """
+    if data.get('numbers') is not None:
+        if not isinstance(data['numbers'], list):
+            raise ValueError('numbers must be a list')
+        numbers = [str(n).strip() for n in data['numbers'] if n is not None]
+    elif data.get('from') is not None and data.get('to') is not None:
+        try:
+            start, end = int(data['from']), int(data['to'])
+        except (TypeError, ValueError):
+            raise ValueError('from and to must be integers')
+        if end < start:
+            raise ValueError('to must not be less than from')
+        if end - start + 1 > MAX_BULK_TABLES:
+            raise ValueError(f'At most {MAX_BULK_TABLES} tables per request')
+        numbers = [str(n) for n in range(start, end + 1)]
+    else:
+        raise ValueError('Provide either numbers or from/to')
+
+    numbers = [n for n in dict.fromkeys(numbers) if n]
+    if not numbers:
+        raise ValueError('No table numbers given')
+    if any(len(n) > 50 for n in numbers):
+        raise ValueError('Table numbers must be at most 50 characters')
+    if len(numbers) > MAX_BULK_TABLES:
+        raise ValueError(f'At most {MAX_BULK_TABLES} tables per request')
+    return numbers
+
+
+def _bulk_table_seats(data):
+    """
+    Seats per table from a bulk payload; 0 when omitted.
+    """
+    seats = data.get('seats')
+    if seats is None:
+        return 0
+    if isinstance(seats, bool) or not isinstance(seats, (int, str)):
+        raise ValueError('seats must be a positive integer')
+    try:
+        seats = int(seats)
+    except ValueError:
+        raise ValueError('seats must be a positive integer')
+    if seats < 1:
+        raise ValueError('seats must be a positive integer')
+    return seats
+
+
+@table_bp.route('/bulk', methods=['POST'])
+@auth_required
+def add_tables_bulk(restaurant_id):
+    """
+    Add many tables in one request and one transaction.
+    Payload: {"numbers": ["1", "2", "Patio-1"], "seats": int}
+          or {"from": 1, "to": 60, "seats": int}
+    Fails without creating anything if any number already exists.
+    """
+    data = request.get_json() or {}
+    try:
+        numbers = _bulk_table_numbers(data)
+        seats = _bulk_table_seats(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    existing = db.session.scalars(
+        db.select(Table.number).where(Table.restaurant_id == restaurant_id, Table.number.in_(numbers))
+    ).all()
+    if existing:
+        return jsonify({'error': 'Table number already exists', 'duplicates': sorted(existing)}), 400
+
+    base_url = build_public_base()
+    rows = [
+        {
+            'restaurant_id': restaurant_id,
+            'number': number,
+            'seats': seats,
+            'qr_code': generate_qr_code_for_target(table_menu_url(base_url, restaurant_id, number), base_url)
         }
+        for number in numbers
+    ]
+    # One executemany INSERT plus one SELECT for the new ids, on every dialect
+    db.session.execute(db.insert(Table), rows)
+    tables = db.session.scalars(
+        db.select(Table)
+        .where(Table.restaurant_id == restaurant_id, Table.number.in_(numbers))
+        .order_by(Table.id)
+    ).all()
+    created = [_serialize_table(t) for t in tables]
+    db.session.commit()
+
+    return jsonify({
+        'message': f'{len(created)} tables added',
+        'tables': created
     }), 201
 
 
@@ -115,12 +176,7 @@ def get_tables(restaurant_id):
     Get all tables for the authenticated restaurant.
     """
     tables = Table.query.filter_by(restaurant_id=restaurant_id).all()
-    return jsonify([{
-        'id': t.id,
-        'number': t.number,
-        'seats': t.seats,
-        'qr_code': t.qr_code
-    } for t in tables]), 200
+    return jsonify([_serialize_table(t) for t in tables]), 200
 
 
 @table_bp.route('/<int:table_id>', methods=['DELETE'])
@@ -144,12 +200,7 @@ def get_tables_public(restaurant_id):
     Public endpoint: Get all tables of a restaurant (no auth required).
     """
     tables = Table.query.filter_by(restaurant_id=restaurant_id).all()
-    return jsonify([{
-        'id': t.id,
-        'number': t.number,
-        'seats': t.seats,
-        'qr_code': t.qr_code
-    } for t in tables]), 200
+    return jsonify([_serialize_table(t) for t in tables]), 200
 
 
 # --- New endpoint: regenerate QR for an existing table (useful when ngrok URL changed) ---
@@ -163,17 +214,94 @@ def regenerate_table_qr(restaurant_id, table_id):
     if not table:
         return jsonify({'error': 'Table not found'}), 404
 
-    base_url = _build_public_base()
-    target = f"{base_url}/menu/{restaurant_id}/table_{table.number}"
-    table.qr_code = generate_qr_code_for_target(target)
+    base_url = build_public_base()
+    target = table_menu_url(base_url, restaurant_id, table.number)
+    table.qr_code = generate_qr_code_for_target(target, base_url)
     db.session.commit()
 
     return jsonify({
         'message': 'QR regenerated',
-        'table': {
-            'id': table.id,
-            'number': table.number,
-            'seats': table.seats,
-            'qr_code': table.qr_code
-        }
+        'table': _serialize_table(table)
+    }), 200
+
+
+@table_bp.route('/regenerate', methods=['POST'])
+@auth_required
+def regenerate_all_table_qrs(restaurant_id):
+    """
+    Regenerate QR codes for every table of the restaurant in one request
+    (e.g. after the public host changed) with a single bulk UPDATE.
+    """
+    tables = Table.query.filter_by(restaurant_id=restaurant_id).order_by(Table.id).all()
+    base_url = build_public_base()
+
+    updates = []
+    for t in tables:
+        target = table_menu_url(base_url, restaurant_id, t.number)
+        updates.append({'id': t.id, 'qr_code': generate_qr_code_for_target(target, base_url)})
+
+    # Serialize before commit so the response doesn't reload each expired row
+    regenerated = [{**_serialize_table(t), 'qr_code': u['qr_code']} for t, u in zip(tables, updates)]
+    if updates:
+        db.session.execute(db.update(Table), updates)
+        db.session.commit()
+
+    return jsonify({
+        'message': 'QR codes regenerated',
+        'tables': regenerated
     }), 200
+
+
+@table_bp.route('/qr-sheet', methods=['GET'])
+@auth_required
+def get_table_qr_sheet(restaurant_id):
+    """
+    All table QR codes in one download.
+    ?format=svg (default): a single printable SVG sheet with labelled codes.
+    ?format=zip&image=png|svg: one image per table in a ZIP archive.
+    """
+    output = request.args.get('format', 'svg')
+    tables = Table.query.filter_by(restaurant_id=restaurant_id).order_by(Table.id).all()
+    base_url = build_public_base()
+    targets = [(t.number, table_menu_url(base_url, restaurant_id, t.number)) for t in tables]
+
+    if output == 'zip':
+        image = request.args.get('image', 'png')
+        if image not in QR_FORMATS:
+            return jsonify({'error': 'Unsupported image format'}), 400
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for number, target in targets:
+                zf.writestr(f"table_{number}.{image}", render_qr(target, image, persist=True))
+        response = Response(buf.getvalue(), mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename="tables_{restaurant_id}_qr.zip"'
+        return response
+
+    if output != 'svg':
+        return jsonify({'error': 'Unsupported format'}), 400
+
+    return Response(_qr_sheet_svg(targets), mimetype='image/svg+xml')
+
+
+def _qr_sheet_svg(targets, columns=4, cell=220, label_height=30):
+    """
+    Lays the codes out on a grid, each labelled with its table number.
+    """
+    rows = (len(targets) + columns - 1) // columns
+    width = columns * cell
+    height = max(rows, 1) * (cell + label_height)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" fill="#fff"/>',
+    ]
+    for i, (number, target) in enumerate(targets):
+        x = (i % columns) * cell
+        y = (i // columns) * (cell + label_height)
+        parts.append(f'<g transform="translate({x + 10},{y + 10})">{qr_svg_inline(target, scale=5)}</g>')
+        parts.append(
+            f'<text x="{x + cell / 2}" y="{y + cell + label_height / 2}" text-anchor="middle" '
+            f'font-family="sans-serif" font-size="18">Table {escape(str(number))}</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts)
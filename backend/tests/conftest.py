@@ -0,0 +1,193 @@
+# tests/conftest.py
+"""
+Shared fixtures for the endpoint suite.
+
+One app is built from create_app against an in-memory SQLite database and
+seeded once per session with realistic volumes (PERF_ORDERS orders, default
+100k). Tests check each response and assert an upper bound on the SQL
+statements per request. Wall-time budgets are opt-in (`pytest --timing`)
+since they depend on the machine; PERF_TIME_FACTOR scales them (default 3).
+"""
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Must be set before config.py is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['PAYMENT_GATEWAY'] = 'stub'
+os.environ['QR_CACHE_DIR'] = tempfile.mkdtemp(prefix='taptable-qr-')
+os.environ.pop('METRICS_DIR', None)
+os.environ.pop('METRICS_TOKEN', None)
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from extensions import db
+from models import MenuItem, Order, Restaurant, RestaurantSettings, Review, Table
+from routes.auth import create_token
+from utils.summaries import rebuild_daily_summaries, rebuild_review_summaries
+
+MENU_ITEMS = 200
+TABLES = 50
+REVIEWS = 500
+ORDERS = int(os.getenv('PERF_ORDERS', '100000'))
+TIME_FACTOR = float(os.getenv('PERF_TIME_FACTOR', '3.0'))
+
+# Seeded menu ids start at 1; every tenth dish (ids 1, 11, 21, ...) is unavailable
+AVAILABLE_ITEM_IDS = [i + 1 for i in range(MENU_ITEMS) if i % 10 != 0]
+UNAVAILABLE_ITEM_IDS = [i + 1 for i in range(MENU_ITEMS) if i % 10 == 0]
+
+OWNER_EMAIL = 'owner@example.com'
+OWNER_PASSWORD = 'secret-password'
+STATUSES = ['pending', 'preparing', 'ready', 'completed', 'completed', 'completed']
+
+
+def _seed(rng):
+    owner = Restaurant(name='Budget Bistro', email=OWNER_EMAIL,
+                       password_hash=generate_password_hash(OWNER_PASSWORD))
+    other = Restaurant(name='Other Place', email='other@example.com', password_hash='x')
+    db.session.add_all([owner, other])
+    db.session.flush()
+    db.session.add(RestaurantSettings(restaurant_id=owner.id, upi_id='bistro@upi',
+                                      razorpay_merchant_id='merchant_1'))
+
+    categories = ['Starters', 'Mains', 'Breads', 'Desserts', 'Drinks']
+    db.session.execute(db.insert(MenuItem), [
+        {
+            'restaurant_id': owner.id,
+            'name': f'Dish {i}',
+            'description': rng.choice(['paneer tikka', 'chicken curry', 'vegan salad', 'butter naan', None]),
+            'price': round(rng.uniform(50, 600), 2),
+            'category': categories[i % len(categories)],
+            'available': i % 10 != 0,
+        }
+        for i in range(MENU_ITEMS)
+    ])
+    db.session.execute(db.insert(Table), [
+        {'restaurant_id': owner.id, 'number': str(n), 'seats': 4}
+        for n in range(1, TABLES + 1)
+    ])
+    db.session.flush()
+    table_ids = db.session.scalars(db.select(Table.id).where(Table.restaurant_id == owner.id)).all()
+
+    now = datetime.utcnow()
+    items_json = json.dumps([{'id': 1, 'name': 'Dish 1', 'price': 100.0, 'quantity': 2}])
+    for start in range(0, ORDERS, 10000):
+        db.session.execute(db.insert(Order), [
+            {
+                'restaurant_id': owner.id,
+                'table_id': rng.choice(table_ids),
+                'items_json': items_json,
+                'total': round(rng.uniform(100, 3000), 2),
+                'status': rng.choice(STATUSES),
+                'payment_method': 'cash',
+                'created_at': now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+            }
+            for _ in range(start, min(start + 10000, ORDERS))
+        ])
+
+    db.session.execute(db.insert(Review), [
+        {
+            'restaurant_id': owner.id,
+            'rating': rng.randint(1, 5),
+            'comment': f'Review {i}',
+            'created_at': now - timedelta(hours=i),
+        }
+        for i in range(REVIEWS)
+    ])
+    db.session.commit()
+    rebuild_daily_summaries(owner.id)
+    rebuild_review_summaries(owner.id)
+    return owner.id
+
+
+def pytest_addoption(parser):
+    parser.addoption('--timing', action='store_true',
+                     help='Also enforce the per-request wall-time budgets (scaled by PERF_TIME_FACTOR).')
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        app.config['SEED_RESTAURANT_ID'] = _seed(random.Random(42))
+        # Keep the seeding garbage out of later full GC passes, which would
+        # otherwise land inside (and blow) a timed request
+        gc.collect()
+        gc.freeze()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='session')
+def restaurant_id(app):
+    return app.config['SEED_RESTAURANT_ID']
+
+
+@pytest.fixture(scope='session')
+def auth_headers(app, restaurant_id):
+    return {'Authorization': f'Bearer {create_token(restaurant_id)}'}
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def count_queries(app):
+    """
+    Context manager yielding a list that collects every SQL statement run inside it.
+    """
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return counter
+
+
+@pytest.fixture()
+def within_budget(request, client, count_queries):
+    """
+    Sends one request and asserts its status and SQL statement count, plus
+    its wall time when run with --timing.
+    Usage: within_budget('get', '/api/menu/1', queries=2, ms=50, headers=...)
+    """
+    check_time = request.config.getoption('timing')
+
+    def call(method, url, *, queries, ms, status=200, **kwargs):
+        with count_queries() as statements:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            # Drain streamed bodies so their queries and time are counted
+            response.get_data()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert response.status_code == status, response.get_data(as_text=True)
+        assert len(statements) <= queries, (
+            f"{method.upper()} {url} ran {len(statements)} SQL statements (budget {queries}):\n"
+            + '\n'.join(s.splitlines()[0] for s in statements)
+        )
+        if check_time:
+            limit = ms * TIME_FACTOR
+            assert elapsed_ms <= limit, f"{method.upper()} {url} took {elapsed_ms:.1f} ms (budget {limit:.0f} ms)"
+        return response
+    return call
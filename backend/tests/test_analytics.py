@@ -0,0 +1,116 @@
+# tests/test_analytics.py
+import datetime
+
+import pytest
+
+from conftest import AVAILABLE_ITEM_IDS
+from models import Order
+
+
+def _completed_orders(restaurant_id, since, until=None):
+    query = Order.query.filter(
+        Order.restaurant_id == restaurant_id,
+        Order.status == 'completed',
+        Order.created_at >= since
+    )
+    if until is not None:
+        query = query.filter(Order.created_at < until)
+    return query.count()
+
+
+@pytest.mark.parametrize('time_range, days', [('7days', 7), ('30days', 30), ('365days', 365)])
+def test_dashboard_analytics(within_budget, auth_headers, restaurant_id, time_range, days):
+    # Reads daily rollups (orders and ratings), so the cost must not depend on the order volume
+    response = within_budget('get', f'/api/analytics/?timeRange={time_range}', queries=2, ms=50,
+                             headers=auth_headers)
+    assert 1 <= response.json['average_rating'] <= 5
+    # Rollups cover whole days, starting at midnight of the first one
+    first_day = datetime.datetime.combine(
+        (datetime.datetime.utcnow() - datetime.timedelta(days=days)).date(), datetime.time()
+    )
+    assert response.json['total_orders'] == _completed_orders(restaurant_id, first_day)
+
+
+def test_series_by_day(within_budget, client, auth_headers):
+    response = within_budget('get', '/api/analytics/series?bucket=day&timeRange=365days', queries=1, ms=100,
+                             headers=auth_headers)
+    series = response.json['series']
+    assert len(series) == 366
+    totals = client.get('/api/analytics/?timeRange=365days', headers=auth_headers).json
+    assert sum(b['orders'] for b in series) == totals['total_orders']
+
+
+def test_series_by_hour(within_budget, auth_headers, restaurant_id):
+    response = within_budget('get', '/api/analytics/series?bucket=hour&timeRange=7days', queries=1, ms=200,
+                             headers=auth_headers)
+    since = datetime.datetime.fromisoformat(response.json['since'])
+    until = datetime.datetime.fromisoformat(response.json['until'])
+    series = response.json['series']
+    assert 7 * 24 <= len(series) <= 7 * 24 + 1
+    assert sum(b['orders'] for b in series) == _completed_orders(restaurant_id, since, until)
+
+
+def test_all_time_analytics(within_budget, restaurant_id):
+    response = within_budget('get', f'/api/analytics/{restaurant_id}', queries=1, ms=300)
+    assert response.json['order_count'] == Order.query.filter_by(restaurant_id=restaurant_id).count()
+
+
+def _load_cube(client, auth_headers):
+    # The first drill-down in this worker loads every order; later ones refresh incrementally
+    client.get('/api/analytics/payment-mix', headers=auth_headers)
+
+
+def test_heatmap_warm_refresh(within_budget, client, auth_headers):
+    _load_cube(client, auth_headers)
+    # New orders since the newest loaded id, plus status events since the last refresh
+    response = within_budget('get', '/api/analytics/heatmap?timeRange=365days&utcOffset=330', queries=2,
+                             ms=100, headers=auth_headers)
+    assert len(response.json['orders']) == 7
+    assert all(len(day) == 24 for day in response.json['orders'])
+
+
+def test_heatmap_matches_sql(client, auth_headers, restaurant_id):
+    response = client.get('/api/analytics/heatmap?timeRange=30days&status=completed', headers=auth_headers)
+    since = datetime.datetime.fromisoformat(response.json['since'])
+    until = datetime.datetime.fromisoformat(response.json['until'])
+    expected = Order.query.filter(
+        Order.restaurant_id == restaurant_id,
+        Order.status == 'completed',
+        Order.created_at >= since,
+        Order.created_at < until
+    ).count()
+    assert sum(map(sum, response.json['orders'])) == expected
+
+
+def test_payment_mix_picks_up_new_orders(within_budget, client, auth_headers):
+    _load_cube(client, auth_headers)
+    order_id = client.post('/api/orders/', headers=auth_headers, json={
+        'table_number': '3', 'payment_method': 'card', 'items': [{'id': AVAILABLE_ITEM_IDS[0], 'quantity': 2}]
+    }).json['order_id']
+    client.put(f'/api/orders/{order_id}/status', headers=auth_headers, json={'status': 'preparing'})
+
+    response = within_budget('get', '/api/analytics/payment-mix?timeRange=7days&status=preparing', queries=2,
+                             ms=100, headers=auth_headers)
+    card = next(m for m in response.json['payment_methods'] if m['method'] == 'card')
+    assert card['orders'] >= 1
+    assert sum(m['share'] for m in response.json['payment_methods']) == pytest.approx(1, abs=1e-3)
+
+
+def test_table_turnover(within_budget, client, auth_headers):
+    _load_cube(client, auth_headers)
+    # Plus the table numbers
+    response = within_budget('get', '/api/analytics/table-turnover?timeRange=90days', queries=3, ms=100,
+                             headers=auth_headers)
+    tables = response.json['tables']
+    assert tables and all(t['table_number'] for t in tables)
+    assert [t['orders'] for t in tables] == sorted((t['orders'] for t in tables), reverse=True)
+
+
+@pytest.mark.parametrize('query', ['status=served', 'since=yesterday', 'utcOffset=9999'])
+def test_drill_down_rejects_bad_params(within_budget, auth_headers, query):
+    within_budget('get', f'/api/analytics/heatmap?{query}', queries=0, ms=20, status=400, headers=auth_headers)
+
+
+@pytest.mark.parametrize('query', ['bucket=day&since=0001-01-01', 'bucket=hour&timeRange=90days'])
+def test_series_rejects_oversized_ranges(within_budget, auth_headers, query):
+    within_budget('get', f'/api/analytics/series?{query}', queries=0, ms=20, status=400, headers=auth_headers)
@@ -0,0 +1,59 @@
+# tests/test_auth.py
+from conftest import OWNER_EMAIL, OWNER_PASSWORD
+
+
+def test_register(within_budget, client):
+    # Password hashing dominates the time budget
+    response = within_budget('post', '/api/auth/register', queries=3, ms=1000, status=201,
+                             json={'name': 'New Place', 'email': 'new@example.com', 'password': 'pw'})
+    assert response.json['restaurant']['email'] == 'new@example.com'
+    # The returned token authenticates as the new restaurant
+    settings = client.get('/api/settings', headers={'Authorization': f"Bearer {response.json['token']}"})
+    assert settings.json['name'] == 'New Place'
+
+
+def test_register_duplicate_email(within_budget):
+    response = within_budget('post', '/api/auth/register', queries=1, ms=50, status=400,
+                             json={'name': 'Again', 'email': OWNER_EMAIL, 'password': 'pw'})
+    assert response.json['error'] == 'Email already registered'
+
+
+def test_login(within_budget, restaurant_id):
+    response = within_budget('post', '/api/auth/login', queries=1, ms=1000,
+                             json={'email': OWNER_EMAIL, 'password': OWNER_PASSWORD})
+    assert response.json['token']
+    assert response.json['restaurant']['id'] == restaurant_id
+
+
+def test_login_wrong_password(within_budget):
+    response = within_budget('post', '/api/auth/login', queries=1, ms=1000, status=401,
+                             json={'email': OWNER_EMAIL, 'password': 'wrong'})
+    assert 'token' not in response.json
+
+
+def _stream_token(client, auth_headers):
+    response = client.post('/api/orders/stream-token', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['expires_in'] == 60
+    return response.json['token']
+
+
+def test_stream_accepts_stream_token_in_query(client, auth_headers):
+    token = _stream_token(client, auth_headers)
+    response = client.get(f'/api/orders/stream?token={token}', buffered=False)
+    try:
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+    finally:
+        response.close()
+
+
+def test_stream_rejects_session_token_in_query(client, auth_headers):
+    # Long-lived tokens must not end up in URLs
+    session_token = auth_headers['Authorization'].split(' ')[1]
+    assert client.get(f'/api/orders/stream?token={session_token}').status_code == 401
+
+
+def test_stream_token_is_rejected_elsewhere(client, auth_headers):
+    token = _stream_token(client, auth_headers)
+    assert client.get('/api/orders/', headers={'Authorization': f'Bearer {token}'}).status_code == 401
@@ -0,0 +1,38 @@
+# tests/test_customer_bootstrap.py
+import pytest
+
+from conftest import MENU_ITEMS
+
+
+def test_bootstrap_is_one_round_trip(within_budget, client, restaurant_id):
+    url = f'/api/customer/bootstrap/{restaurant_id}/7'
+    # Cold: context query plus the grouped menu; warm: the context query only
+    client.get(url)
+    response = within_budget('get', url, queries=1, ms=50)
+
+    data = response.json
+    assert data['restaurant']['name'] == 'Budget Bistro'
+    assert data['table']['number'] == '7'
+    assert data['payment_modes'] == ['cash', 'upi', 'razorpay']
+    items = [item for group in data['menu'] for item in group['items']]
+    assert len(items) == MENU_ITEMS - MENU_ITEMS // 10
+    assert all(item['category'] == group['category'] for group in data['menu'] for item in group['items'])
+
+
+def test_bootstrap_revisit_is_not_modified(within_budget, client, restaurant_id):
+    url = f'/api/customer/bootstrap/{restaurant_id}/7'
+    etag = client.get(url).headers['ETag']
+    within_budget('get', url, queries=1, ms=50, status=304, headers={'If-None-Match': etag})
+
+
+@pytest.mark.parametrize('path', ['/999', '/Patio-1', ''])
+def test_bootstrap_unknown_or_missing_table_still_returns_menu(within_budget, client, restaurant_id, path):
+    url = f'/api/customer/bootstrap/{restaurant_id}{path}'
+    client.get(url)
+    response = within_budget('get', url, queries=1, ms=50)
+    assert response.json['table'] is None
+    assert response.json['menu']
+
+
+def test_bootstrap_unknown_restaurant(within_budget):
+    within_budget('get', '/api/customer/bootstrap/999999/1', queries=1, ms=50, status=404)
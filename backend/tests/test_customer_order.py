@@ -0,0 +1,89 @@
+# tests/test_customer_order.py
+import pytest
+
+from conftest import AVAILABLE_ITEM_IDS, UNAVAILABLE_ITEM_IDS
+
+
+@pytest.mark.parametrize('payment_method', ['cash', 'upi', 'razorpay'])
+def test_create_customer_order(within_budget, client, auth_headers, restaurant_id, payment_method):
+    # Budget includes loading the price map on a cold cache
+    items = [{'id': item_id, 'name': f'Dish {item_id}', 'price': 120, 'quantity': 2}
+             for item_id in AVAILABLE_ITEM_IDS[:5]]
+    response = within_budget('post', '/api/customer-order/create-order', queries=5, ms=200, status=201, json={
+        'restaurant_id': restaurant_id,
+        'table_number': '3',
+        'amount': 1200,
+        'payment_method': payment_method,
+        'customerName': 'Asha',
+        'items': items,
+    })
+    order_id = response.json['local_order_id']
+    if payment_method == 'upi':
+        assert response.json['upi_qr'].startswith('data:image/png;base64,')
+
+    # The kitchen sees the new ticket as pending, with the chosen payment method
+    pending = client.get('/api/orders/?status=pending&limit=20', headers=auth_headers).json
+    order = next(o for o in pending if o['id'] == order_id)
+    assert order['payment_method'] == payment_method
+    assert order['customer_name'] == 'Asha'
+
+
+def test_customer_order_is_priced_by_the_server(client, restaurant_id):
+    menu = {int(item['id']): item for item in client.get(f'/api/customer/menu/{restaurant_id}').json}
+    item_id = AVAILABLE_ITEM_IDS[1]
+    response = client.post('/api/customer-order/create-order', json={
+        'restaurant_id': restaurant_id, 'table_number': '3', 'amount': 1, 'payment_method': 'cash',
+        'items': [{'id': item_id, 'name': 'Dish', 'price': 0.5, 'quantity': 2}],
+    })
+    assert response.status_code == 201
+    assert response.json['amount'] == pytest.approx(menu[item_id]['price'] * 2)
+
+
+def test_customer_order_rejects_unavailable_items(within_budget, restaurant_id):
+    response = within_budget('post', '/api/customer-order/create-order', queries=2, ms=50, status=422, json={
+        'restaurant_id': restaurant_id, 'table_number': '3', 'payment_method': 'cash',
+        'items': [{'id': UNAVAILABLE_ITEM_IDS[0], 'quantity': 1}],
+    })
+    assert response.json['rejected'][0]['error'] == 'Item is unavailable'
+
+
+def test_create_customer_order_unknown_table(within_budget, restaurant_id):
+    response = within_budget('post', '/api/customer-order/create-order', queries=1, ms=50, status=400, json={
+        'restaurant_id': restaurant_id, 'table_number': '999', 'amount': 10, 'payment_method': 'cash',
+        'items': [{'id': AVAILABLE_ITEM_IDS[0], 'quantity': 1}],
+    })
+    assert response.json['error'] == 'Invalid table number'
+
+
+def _order_payload(restaurant_id, payment_method='razorpay'):
+    return {
+        'restaurant_id': restaurant_id,
+        'table_number': '4',
+        'amount': 360,
+        'payment_method': payment_method,
+        'items': [{'id': 7, 'name': 'Dish 7', 'price': 120, 'quantity': 3}],
+    }
+
+
+def test_idempotent_retry_replays_without_writes(within_budget, client, app, restaurant_id):
+    headers = {'Idempotency-Key': 'checkout-retry-1'}
+    gateway = app.razorpay_client
+    first = client.post('/api/customer-order/create-order', json=_order_payload(restaurant_id), headers=headers)
+    assert first.status_code == 201
+    gateway_orders = gateway.orders_created
+
+    # The retry is a single lookup: no order, no event, no gateway call
+    retry = within_budget('post', '/api/customer-order/create-order', queries=1, ms=50, status=201,
+                          json=_order_payload(restaurant_id), headers=headers)
+    assert retry.json == first.json
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert gateway.orders_created == gateway_orders
+
+
+def test_idempotency_key_reused_with_different_body(client, restaurant_id):
+    headers = {'Idempotency-Key': 'checkout-retry-2'}
+    assert client.post('/api/customer-order/create-order', json=_order_payload(restaurant_id, 'cash'),
+                       headers=headers).status_code == 201
+    response = client.post('/api/customer-order/create-order', json=_order_payload(restaurant_id, 'upi'),
+                           headers=headers)
+    assert response.status_code == 422
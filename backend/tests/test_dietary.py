@@ -0,0 +1,45 @@
+# tests/test_dietary.py
+import pytest
+
+from utils.dietary import detect_dietary_info, detect_dietary_info_batch
+
+
+@pytest.mark.parametrize('name, flag', [
+    ('Pistachio kulfi', 'is_nut_free'),
+    ('Cashewnut curry', 'is_nut_free'),
+    ('Buttermilk', 'is_vegan'),
+    ('Milkshake', 'is_vegan'),
+    ('Cheeseburger', 'is_vegan'),
+    ('Breadsticks', 'is_gluten_free'),
+    ('Ham sandwich', 'is_vegetarian'),
+    ('Eggs benedict', 'is_vegetarian'),
+])
+def test_keywords_match_stems_and_compounds(name, flag):
+    assert detect_dietary_info(name, None)[flag] is False
+
+
+@pytest.mark.parametrize('name', [
+    'Champagne sorbet', 'Eggplant curry', 'Butternut squash soup', 'Breadfruit chips', 'Rotisserie vegetables',
+])
+def test_keywords_do_not_match_inside_other_words(name):
+    flags = detect_dietary_info(name, None)
+    assert all(flags[f] for f in ('is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_nut_free'))
+
+
+@pytest.mark.parametrize('name', [
+    'Eggless chocolate cake', 'Egg-less brownie', 'Peanut-free salad', 'Nut bowl, no cashews', 'Salad without egg',
+])
+def test_negated_keywords_do_not_match(name):
+    flags = detect_dietary_info(name, None)
+    assert all(flags[f] for f in ('is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_nut_free'))
+
+
+def test_negation_only_covers_its_own_keyword():
+    flags = detect_dietary_info('Peanut-free satay', 'with cashews')
+    assert flags['is_nut_free'] is False
+
+
+def test_batch_matches_single():
+    items = [('Pistachio kulfi', None), ('Champagne sorbet', 'chilled'), ('Cheeseburger', 'with fries'),
+             ('Eggless chocolate cake', None), ('Peanut-free salad', 'no egg')]
+    assert detect_dietary_info_batch(items) == [detect_dietary_info(n, d) for n, d in items]
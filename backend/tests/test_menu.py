@@ -0,0 +1,125 @@
+# tests/test_menu.py
+from conftest import MENU_ITEMS
+from utils import menu_cache
+
+
+def test_get_menu(within_budget, restaurant_id, auth_headers):
+    response = within_budget('get', f'/api/menu/{restaurant_id}', queries=2, ms=100, headers=auth_headers)
+    assert len(response.json) == MENU_ITEMS
+
+
+def test_get_menu_not_modified(within_budget, client, restaurant_id, auth_headers):
+    etag = client.get(f'/api/menu/{restaurant_id}', headers=auth_headers).headers['ETag']
+    within_budget('get', f'/api/menu/{restaurant_id}', queries=1, ms=20, status=304,
+                  headers={**auth_headers, 'If-None-Match': etag})
+
+
+def test_get_customer_menu(within_budget, restaurant_id):
+    response = within_budget('get', f'/api/customer/menu/{restaurant_id}', queries=2, ms=100)
+    # Every tenth seeded dish is unavailable and hidden from customers
+    assert len(response.json) == MENU_ITEMS - MENU_ITEMS // 10
+    assert all(item['available'] for item in response.json)
+
+
+def test_customer_menu_dietary_and_category_filter(within_budget, client, restaurant_id, auth_headers):
+    client.post(f'/api/menu/{restaurant_id}/reclassify', headers=auth_headers)
+    menu = client.get(f'/api/menu/{restaurant_id}', headers=auth_headers).json
+    expected = [
+        item for item in menu
+        if item['available'] and item['dietaryInfo']['isVegan'] and item['dietaryInfo']['isNutFree']
+        and item['category'] in ('Mains', 'Desserts')
+    ]
+    response = within_budget('get', f'/api/customer/menu/{restaurant_id}?diet=vegan,nut_free&category=Mains,Desserts',
+                             queries=2, ms=100)
+    assert [int(item['id']) for item in response.json] == [item['id'] for item in expected]
+
+
+
+def test_customer_menu_category_lists_share_one_cache_entry(within_budget, client, restaurant_id):
+    client.get(f'/api/customer/menu/{restaurant_id}?diet=vegetarian&category=Mains')
+    cached = len(menu_cache._cache)
+    for n in range(50):
+        client.get(f'/api/customer/menu/{restaurant_id}?diet=vegetarian&category=Mains,Random{n}')
+    assert len(menu_cache._cache) == cached
+    # Other category lists are filtered from the cached items: only the version lookup
+    response = within_budget('get', f'/api/customer/menu/{restaurant_id}?diet=vegetarian&category=Desserts',
+                             queries=1, ms=50)
+    assert response.json and all(item['category'] == 'Desserts' for item in response.json)
+    within_budget('get', f'/api/customer/menu/{restaurant_id}?diet=vegetarian&category=Desserts', queries=1,
+                  ms=20, status=304, headers={'If-None-Match': response.headers['ETag']})
+
+
+def test_customer_menu_rejects_unknown_diet(within_budget, restaurant_id):
+    within_budget('get', f'/api/customer/menu/{restaurant_id}?diet=keto', queries=0, ms=20, status=400)
+
+
+def test_add_update_delete_menu_item(within_budget, client, restaurant_id, auth_headers):
+    def menu_item(item_id):
+        menu = client.get(f'/api/menu/{restaurant_id}', headers=auth_headers).json
+        return next((item for item in menu if item['id'] == item_id), None)
+
+    created = within_budget('post', '/api/menu/', queries=3, ms=50, status=201, headers=auth_headers,
+                            json={'name': 'Paneer Wrap', 'price': 150, 'category': 'Mains'})
+    item_id = created.json['id']
+    item = menu_item(item_id)
+    assert item['price'] == 150
+    assert item['dietaryInfo']['isVegetarian'] and not item['dietaryInfo']['isVegan']
+
+    within_budget('put', f'/api/menu/{item_id}', queries=3, ms=50, headers=auth_headers,
+                  json={'name': 'Chicken Wrap', 'price': 180})
+    item = menu_item(item_id)
+    assert (item['name'], item['price']) == ('Chicken Wrap', 180)
+    # Renaming reclassifies the dish
+    assert not item['dietaryInfo']['isVegetarian']
+
+    within_budget('delete', f'/api/menu/{item_id}', queries=3, ms=50, headers=auth_headers)
+    assert menu_item(item_id) is None
+
+
+def test_reclassify_menu(within_budget, restaurant_id, auth_headers):
+    # Bulk UPDATE: the statement count must not grow with the menu size
+    response = within_budget('post', f'/api/menu/{restaurant_id}/reclassify', queries=3, ms=200,
+                             headers=auth_headers)
+    assert response.json['total'] >= MENU_ITEMS
+    assert 0 <= response.json['updated'] <= response.json['total']
+
+
+def test_import_menu(within_budget, auth_headers):
+    rows = ['name,description,price,category'] + [f'Import {i},spicy lentils,{100 + i},Mains' for i in range(600)]
+    response = within_budget('post', '/api/menu/import', queries=4, ms=500, status=201,
+                             data='\n'.join(rows).encode(), headers={**auth_headers, 'Content-Type': 'text/csv'})
+    assert response.json['imported'] == 600
+
+
+def test_export_menu(within_budget, auth_headers):
+    response = within_budget('get', '/api/menu/export?format=csv', queries=1, ms=200, headers=auth_headers)
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith('id,name,description,price')
+    assert len(lines) - 1 >= MENU_ITEMS
+
+
+def test_import_rejects_non_text_names_and_non_finite_prices(client, auth_headers):
+    lines = [
+        '{"name": 42, "price": 10}',
+        '{"name": ["Soup"], "price": 10}',
+        '{"name": {"en": "Soup"}, "price": 10}',
+        '{"name": "Soup", "price": NaN}',
+        '{"name": "Soup", "price": Infinity}',
+        '{"name": "Soup", "price": true}',
+        '{"name": "Soup", "price": 10, "category": ["Mains"]}',
+    ]
+    response = client.post('/api/menu/import', data='\n'.join(lines).encode(),
+                           headers={**auth_headers, 'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == 201
+    assert response.json['imported'] == 1
+    assert [e['row'] for e in response.json['errors']] == [2, 3, 4, 5, 6, 7]
+
+
+def test_import_reports_rows_committed_before_a_failure(client, auth_headers):
+    rows = ['name,description,price,category'] + [f'Partial {i},dal,{100 + i},Mains' for i in range(1000)]
+    body = '\n'.join(rows).encode() + b'\nBroken \xff\xfe,row,1,Mains\n'
+    response = client.post('/api/menu/import', data=body, headers={**auth_headers, 'Content-Type': 'text/csv'})
+    assert response.status_code == 400
+    assert response.json['error']
+    # The first batch (IMPORT_BATCH_SIZE rows) was committed before the bad bytes were read
+    assert response.json['imported'] == 500
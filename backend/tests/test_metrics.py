@@ -0,0 +1,78 @@
+# tests/test_metrics.py
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from utils.metrics import WorkerMetrics
+
+
+@pytest.fixture()
+def metrics_config(app):
+    saved = {key: app.config.get(key) for key in ('TESTING', 'METRICS_TOKEN')}
+    yield app.config
+    app.config.update(saved)
+
+
+def test_metrics_served_in_testing_without_token(client):
+    response = client.get('/api/_metrics')
+    assert response.status_code == 200
+    assert 'http_requests_total' in response.get_data(as_text=True)
+
+
+def test_metrics_disabled_in_production_without_token(client, metrics_config):
+    metrics_config['TESTING'] = False
+    assert client.get('/api/_metrics').status_code == 404
+
+
+@pytest.mark.parametrize('testing', [True, False])
+def test_metrics_require_configured_token(client, metrics_config, testing):
+    metrics_config.update(TESTING=testing, METRICS_TOKEN='scrape-secret')
+    assert client.get('/api/_metrics').status_code == 401
+    assert client.get('/api/_metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/api/_metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+
+
+def test_metrics_reject_non_ascii_token(client, metrics_config):
+    metrics_config['METRICS_TOKEN'] = 'scrape-secret'
+    assert client.get('/api/_metrics', headers={'Authorization': 'Bearer scrapé'}).status_code == 401
+
+
+def _requests_total(snapshots):
+    return sum(row[-1] for snap in snapshots for row in snap.get('requests', []))
+
+
+def test_exited_workers_are_folded_into_retired_totals(tmp_path):
+    # A pid that is certainly gone: a child that already exited
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    dead = WorkerMetrics(str(tmp_path))
+    dead.registry.record('menu', 'GET', 200, 0.01, 1, 0.001)
+    dead._path = str(tmp_path / f'metrics_{child.pid}_dead.json')
+    dead.flush()
+
+    retiring = WorkerMetrics(str(tmp_path))
+    retiring.registry.record('menu', 'GET', 200, 0.01, 1, 0.001)
+    retiring.flush()
+    retiring.retire()
+
+    scraper = WorkerMetrics(str(tmp_path))
+    scraper.registry.record('menu', 'GET', 200, 0.01, 1, 0.001)
+    assert _requests_total(scraper.collect()) == 3
+    assert sorted(p.name for p in tmp_path.glob('metrics_*.json')) == [os.path.basename(scraper._path)]
+    # Folding is idempotent across scrapes
+    assert _requests_total(scraper.collect()) == 3
+
+
+def test_failed_statements_do_not_leak_query_timers(app):
+    with app.test_request_context():
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+        assert not connection.info.get('query_start')
+        db.session.rollback()
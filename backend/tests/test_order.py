@@ -0,0 +1,195 @@
+# tests/test_order.py
+from datetime import datetime
+
+import pytest
+
+from conftest import AVAILABLE_ITEM_IDS, ORDERS, UNAVAILABLE_ITEM_IDS
+from extensions import db
+from models import MonthlySummary, OrderEvent, OrderItem
+from utils.order_events import latest_order_event_id, stream_order_events
+
+
+def _newest_first(orders):
+    keys = [(o['created_at'], o['id']) for o in orders]
+    return keys == sorted(keys, reverse=True)
+
+
+def test_list_orders_first_page(within_budget, auth_headers):
+    response = within_budget('get', '/api/orders/?limit=50', queries=1, ms=100, headers=auth_headers)
+    assert len(response.json) == min(50, ORDERS)
+    assert _newest_first(response.json)
+    assert response.headers.get('X-Next-Cursor')
+
+
+def test_list_orders_follows_cursor(within_budget, client, auth_headers):
+    first = client.get('/api/orders/?limit=50', headers=auth_headers)
+    cursor = first.headers['X-Next-Cursor']
+    response = within_budget('get', f'/api/orders/?limit=50&cursor={cursor}', queries=1, ms=100,
+                             headers=auth_headers)
+    # The second page continues where the first stopped
+    assert _newest_first(first.json + response.json)
+    assert not {o['id'] for o in first.json} & {o['id'] for o in response.json}
+
+
+def test_list_orders_filtered_by_status(within_budget, auth_headers):
+    response = within_budget('get', '/api/orders/?status=pending,preparing&limit=200', queries=1, ms=150,
+                             headers=auth_headers)
+    assert len(response.json) == 200
+    assert {o['status'] for o in response.json} <= {'pending', 'preparing'}
+
+
+def test_list_orders_rejects_unknown_status(within_budget, auth_headers):
+    within_budget('get', '/api/orders/?status=served', queries=0, ms=20, status=400, headers=auth_headers)
+
+
+@pytest.mark.parametrize('lines', [1, 25])
+def test_create_order_statement_count_is_flat(within_budget, auth_headers, lines):
+    # OrderItem rows are batched into one INSERT, so more lines cost no more statements.
+    # The budget includes loading the price map on a cold cache.
+    items = [{'id': item_id, 'quantity': 1} for item_id in AVAILABLE_ITEM_IDS[:lines]]
+    response = within_budget('post', '/api/orders/', queries=6, ms=100, status=201, headers=auth_headers,
+                             json={'table_number': '1', 'items': items})
+    stored = db.session.execute(
+        db.select(OrderItem.menu_item_id).where(OrderItem.order_id == response.json['order_id'])
+    ).scalars().all()
+    assert sorted(stored) == AVAILABLE_ITEM_IDS[:lines]
+
+
+def test_create_order_ignores_client_prices(client, auth_headers, restaurant_id):
+    menu = {item['id']: item for item in client.get(f'/api/menu/{restaurant_id}').json}
+    item_id = AVAILABLE_ITEM_IDS[0]
+    response = client.post('/api/orders/', headers=auth_headers, json={
+        'table_number': '1', 'total': 1,
+        'items': [{'id': item_id, 'name': 'Free lunch', 'price': 0.01, 'quantity': 3}]
+    })
+    assert response.status_code == 201
+    assert response.json['total'] == pytest.approx(menu[item_id]['price'] * 3)
+
+
+def test_create_order_rejects_unavailable_items(within_budget, auth_headers):
+    item_id = UNAVAILABLE_ITEM_IDS[0]
+    response = within_budget('post', '/api/orders/', queries=2, ms=50, status=422, headers=auth_headers, json={
+        'table_number': '1', 'items': [{'id': item_id, 'quantity': 1}, {'id': 999999, 'quantity': 1}]
+    })
+    assert [r['error'] for r in response.json['rejected']] == ['Item is unavailable', 'Item not found']
+
+
+def _new_order(client, auth_headers, table_number='2'):
+    return client.post('/api/orders/', headers=auth_headers, json={
+        'table_number': table_number, 'items': [{'id': AVAILABLE_ITEM_IDS[0], 'quantity': 1}]
+    }).json
+
+
+def _advance(client, auth_headers, order_id, *statuses):
+    for status in statuses:
+        client.put(f'/api/orders/{order_id}/status', headers=auth_headers, json={'status': status})
+
+
+def _todays_rollup(restaurant_id):
+    row = db.session.execute(
+        db.select(MonthlySummary.total_orders, MonthlySummary.total_revenue).where(
+            MonthlySummary.restaurant_id == restaurant_id,
+            MonthlySummary.date == datetime.utcnow().date()
+        )
+    ).first()
+    return tuple(row) if row else (0, 0.0)
+
+
+def test_complete_order_updates_rollup(within_budget, client, auth_headers, restaurant_id):
+    order = _new_order(client, auth_headers)
+    _advance(client, auth_headers, order['order_id'], 'preparing', 'ready')
+    orders_before, revenue_before = _todays_rollup(restaurant_id)
+
+    response = within_budget('put', f"/api/orders/{order['order_id']}/status", queries=4, ms=100,
+                             headers=auth_headers, json={'status': 'completed'})
+    assert response.json['order']['status'] == 'completed'
+    assert response.json['order']['version'] == 3
+
+    orders_after, revenue_after = _todays_rollup(restaurant_id)
+    assert orders_after == orders_before + 1
+    assert revenue_after == pytest.approx(revenue_before + order['total'])
+
+
+def test_illegal_transition_is_rejected(within_budget, client, auth_headers):
+    order_id = _new_order(client, auth_headers)['order_id']
+    response = within_budget('put', f'/api/orders/{order_id}/status', queries=1, ms=50, status=409,
+                             headers=auth_headers, json={'status': 'completed'})
+    assert response.json['order']['status'] == 'pending'
+
+
+def test_stale_version_is_rejected(within_budget, client, auth_headers):
+    order_id = _new_order(client, auth_headers)['order_id']
+    _advance(client, auth_headers, order_id, 'preparing')
+    # A second tablet still showing version 0 tries to move the ticket
+    response = within_budget('put', f'/api/orders/{order_id}/status', queries=1, ms=50, status=409,
+                             headers=auth_headers, json={'status': 'ready', 'version': 0})
+    assert response.json['order']['status'] == 'preparing'
+
+
+def test_bulk_transition_is_one_update(within_budget, client, auth_headers):
+    order_ids = [_new_order(client, auth_headers, table_number=str(n))['order_id'] for n in range(1, 13)]
+    for order_id in order_ids:
+        _advance(client, auth_headers, order_id, 'preparing')
+    # Statement count stays flat: lock/select, UPDATE, event INSERT
+    response = within_budget('post', '/api/orders/bulk-status', queries=3, ms=100, headers=auth_headers,
+                             json={'order_ids': order_ids + [999999999], 'status': 'ready'})
+    assert len(response.json['updated']) == 12
+    assert response.json['skipped'] == [{'id': 999999999, 'error': 'Order not found'}]
+
+
+
+@pytest.mark.parametrize('order_ids', ['123', 123, [1.5], [True], [1, 'x'], []])
+def test_bulk_transition_rejects_bad_order_ids(within_budget, auth_headers, order_ids):
+    within_budget('post', '/api/orders/bulk-status', queries=0, ms=20, status=400, headers=auth_headers,
+                  json={'order_ids': order_ids, 'status': 'preparing'})
+
+
+def test_bulk_complete_updates_rollups_per_day(within_budget, client, auth_headers):
+    orders = [_new_order(client, auth_headers, table_number=str(n)) for n in range(1, 21)]
+    order_ids = [o['order_id'] for o in orders]
+    for order_id in order_ids:
+        _advance(client, auth_headers, order_id, 'preparing', 'ready')
+    before = client.get('/api/analytics/?timeRange=7days', headers=auth_headers).json
+    within_budget('post', '/api/orders/bulk-status', queries=4, ms=100, headers=auth_headers,
+                  json={'order_ids': order_ids, 'status': 'completed'})
+    after = client.get('/api/analytics/?timeRange=7days', headers=auth_headers).json
+    assert after['total_orders'] == before['total_orders'] + 20
+    assert after['total_revenue'] == pytest.approx(before['total_revenue'] + sum(o['total'] for o in orders))
+
+
+def test_restaurant_orders(within_budget, restaurant_id):
+    response = within_budget('get', f'/api/restaurants/{restaurant_id}/orders?limit=100', queries=1, ms=150)
+    assert len(response.json) == 100
+    assert _newest_first(response.json)
+
+
+def _stream_frames(restaurant_id, last_event_id, count=2):
+    stream = stream_order_events(restaurant_id, last_event_id)
+    try:
+        return [next(stream) for _ in range(count)]
+    finally:
+        stream.close()
+
+
+def test_stream_resumes_from_retained_cursor(client, auth_headers, restaurant_id):
+    order_id = _new_order(client, auth_headers)['order_id']
+    event_id = db.session.scalar(db.select(db.func.max(OrderEvent.id)).where(OrderEvent.order_id == order_id))
+    frame = _stream_frames(restaurant_id, event_id - 1)[1]
+    assert frame.startswith(f'id: {event_id}\nevent: order.created\n')
+
+
+def test_stream_resets_cursor_behind_retention(client, auth_headers, restaurant_id):
+    _new_order(client, auth_headers)
+    oldest = db.session.scalar(db.select(db.func.min(OrderEvent.id)))
+    # Simulate pruning: the client's next event is gone
+    db.session.execute(db.delete(OrderEvent).where(OrderEvent.id == oldest))
+    db.session.commit()
+    frame = _stream_frames(restaurant_id, oldest - 1)[1]
+    assert frame == f'id: {latest_order_event_id(restaurant_id)}\nevent: reset\ndata: {{}}\n\n'
+
+
+def test_stream_resets_cursor_ahead_of_newest_event(client, auth_headers, restaurant_id):
+    _new_order(client, auth_headers)
+    newest = db.session.scalar(db.select(db.func.max(OrderEvent.id)))
+    frame = _stream_frames(restaurant_id, newest + 1000)[1]
+    assert frame == f'id: {latest_order_event_id(restaurant_id)}\nevent: reset\ndata: {{}}\n\n'
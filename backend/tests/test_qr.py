@@ -0,0 +1,28 @@
+# tests/test_qr.py
+import os
+
+from utils.qr_helper import qr_digest, qr_image_url
+
+
+def _cached(app, data):
+    digest = qr_digest(data, 'png')
+    return os.path.exists(os.path.join(app.config['QR_CACHE_DIR'], digest[:2], f'{digest}.png'))
+
+
+def test_unsigned_payload_is_not_cached(app, client):
+    response = client.get('/api/qr/png?data=arbitrary-payload')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert not _cached(app, 'arbitrary-payload')
+
+
+def test_signed_payload_is_cached(app, client):
+    with app.test_request_context():
+        url = qr_image_url('', 'https://example.test/menu/1/table_1')
+    assert client.get(url).status_code == 200
+    assert _cached(app, 'https://example.test/menu/1/table_1')
+
+
+def test_forged_signature_is_not_cached(app, client):
+    assert client.get('/api/qr/png?data=forged&sig=deadbeef').status_code == 200
+    assert not _cached(app, 'forged')
@@ -0,0 +1,46 @@
+# tests/test_review.py
+import pytest
+
+from conftest import REVIEWS
+
+
+def test_add_review(within_budget, client, auth_headers):
+    before = client.get('/api/review/summary', headers=auth_headers).json
+    # Review INSERT plus the running-total and daily-rollup UPDATEs
+    within_budget('post', '/api/review/', queries=3, ms=50, status=201, headers=auth_headers,
+                  json={'rating': 4, 'comment': 'Great'})
+    after = client.get('/api/review/summary', headers=auth_headers).json
+    assert after['count'] == before['count'] + 1
+    assert after['histogram']['4'] == before['histogram']['4'] + 1
+
+
+@pytest.mark.parametrize('rating', [9, 0, None, 4.5, True, '3'])
+def test_add_review_rejects_bad_rating(within_budget, auth_headers, rating):
+    within_budget('post', '/api/review/', queries=0, ms=20, status=400, headers=auth_headers,
+                  json={'rating': rating})
+
+
+def test_review_summary_is_one_read(within_budget, auth_headers):
+    response = within_budget('get', '/api/review/summary', queries=1, ms=20, headers=auth_headers)
+    summary = response.json
+    assert summary['count'] >= REVIEWS
+    assert sum(summary['histogram'].values()) == summary['count']
+    assert 1 <= summary['average'] <= 5
+
+
+def test_get_reviews_first_page(within_budget, auth_headers):
+    response = within_budget('get', '/api/review/?limit=50', queries=1, ms=50, headers=auth_headers)
+    assert len(response.json) == 50
+    assert response.headers.get('X-Next-Cursor')
+
+
+def test_get_reviews_follows_cursor(within_budget, client, auth_headers):
+    first = client.get('/api/review/?limit=50', headers=auth_headers)
+    cursor = first.headers['X-Next-Cursor']
+    response = within_budget('get', f'/api/review/?limit=50&cursor={cursor}', queries=1, ms=50,
+                             headers=auth_headers)
+    assert not {r['id'] for r in first.json} & {r['id'] for r in response.json}
+
+
+def test_get_reviews_rejects_bad_cursor(within_budget, auth_headers):
+    within_budget('get', '/api/review/?cursor=nope', queries=0, ms=20, status=400, headers=auth_headers)
@@ -0,0 +1,14 @@
+# tests/test_settings.py
+def test_get_settings(within_budget, auth_headers):
+    response = within_budget('get', '/api/settings', queries=2, ms=50, headers=auth_headers)
+    assert response.json['upi_id'] == 'bistro@upi'
+
+
+def test_update_settings(within_budget, client, auth_headers):
+    within_budget('post', '/api/settings', queries=3, ms=50, headers=auth_headers,
+                  json={'phone': '9999999999', 'description': 'Family dining'})
+    settings = client.get('/api/settings', headers=auth_headers).json
+    assert settings['phone'] == '9999999999'
+    assert settings['description'] == 'Family dining'
+    # Fields not in the payload are kept
+    assert settings['upi_id'] == 'bistro@upi'
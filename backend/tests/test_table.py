@@ -0,0 +1,55 @@
+# tests/test_table.py
+import pytest
+
+from conftest import TABLES
+
+
+def test_get_tables(within_budget, auth_headers):
+    response = within_budget('get', '/api/tables/', queries=1, ms=50, headers=auth_headers)
+    assert len(response.json) >= TABLES
+
+
+def test_get_tables_public(within_budget, restaurant_id):
+    response = within_budget('get', f'/api/tables/public/{restaurant_id}', queries=1, ms=50)
+    assert {str(n) for n in range(1, TABLES + 1)} <= {t['number'] for t in response.json}
+
+
+def test_add_and_delete_table(within_budget, client, auth_headers):
+    created = within_budget('post', '/api/tables/', queries=3, ms=200, status=201, headers=auth_headers,
+                            json={'number': 'Patio-1', 'seats': 2})
+    table = created.json['table']
+    assert table['number'] == 'Patio-1' and table['seats'] == 2
+    assert table['qr_code']
+    within_budget('delete', f"/api/tables/{table['id']}", queries=3, ms=50, headers=auth_headers)
+    remaining = client.get('/api/tables/', headers=auth_headers).json
+    assert table['id'] not in {t['id'] for t in remaining}
+
+
+def test_bulk_add_tables(within_budget, auth_headers):
+    response = within_budget('post', '/api/tables/bulk', queries=3, ms=2000, status=201, headers=auth_headers,
+                             json={'from': 101, 'to': 130, 'seats': 4})
+    assert [t['number'] for t in response.json['tables']] == [str(n) for n in range(101, 131)]
+
+
+
+@pytest.mark.parametrize('seats', ['four', [4], 0, -2, True, 2.5])
+def test_bulk_add_tables_rejects_bad_seats(within_budget, auth_headers, seats):
+    response = within_budget('post', '/api/tables/bulk', queries=0, ms=20, status=400, headers=auth_headers,
+                             json={'from': 201, 'to': 202, 'seats': seats})
+    assert response.json == {'error': 'seats must be a positive integer'}
+
+
+def test_regenerate_all_qrs(within_budget, client, auth_headers):
+    response = within_budget('post', '/api/tables/regenerate', queries=2, ms=5000, headers=auth_headers)
+    tables = response.json['tables']
+    assert len(tables) >= TABLES
+    # Each QR points at this server's signed image URL, and the stored value matches
+    assert all('/api/qr/png?data=' in t['qr_code'] and '&sig=' in t['qr_code'] for t in tables)
+    stored = {t['id']: t['qr_code'] for t in client.get('/api/tables/', headers=auth_headers).json}
+    assert all(stored[t['id']] == t['qr_code'] for t in tables)
+
+
+def test_qr_sheet(within_budget, auth_headers):
+    response = within_budget('get', '/api/tables/qr-sheet', queries=1, ms=5000, headers=auth_headers)
+    assert response.mimetype == 'image/svg+xml'
+    assert response.get_data(as_text=True).count('<svg') > TABLES
@@ -1,4 +1,7 @@
-from models import RestaurantSettings
+from sqlalchemy import false
+
+from extensions import db
+from models import Restaurant, RestaurantSettings, Table
 
 def get_restaurant_settings_dict(restaurant_id):
     """
@@ -12,3 +15,42 @@ def get_restaurant_settings_dict(restaurant_id):
         "razorpay_merchant_id": settings.razorpay_merchant_id,
         # Add more fields as needed
     }
+
+
+def get_customer_context(restaurant_id, table_number):
+    """
+    Loads what a customer-facing request needs about a restaurant in one query:
+    restaurant_id, name, menu_version, upi_id, razorpay_merchant_id,
+    description, and the table (table_id, table_number, seats; None if
+    table_number is None or doesn't exist). Returns None if the restaurant
+    doesn't exist.
+    """
+    return db.session.query(
+        Restaurant.id.label('restaurant_id'),
+        Restaurant.name,
+        Restaurant.menu_version,
+        RestaurantSettings.upi_id,
+        RestaurantSettings.razorpay_merchant_id,
+        RestaurantSettings.description,
+        Table.id.label('table_id'),
+        Table.number.label('table_number'),
+        Table.seats,
+    ).outerjoin(
+        RestaurantSettings, RestaurantSettings.restaurant_id == Restaurant.id
+    ).outerjoin(
+        Table, (Table.restaurant_id == Restaurant.id) & (
+            Table.number == str(table_number) if table_number is not None else false()
+        )
+    ).filter(Restaurant.id == restaurant_id).first()
+
+
+def enabled_payment_modes(context, gateway):
+    """
+    Payment modes a customer can pick, in the order they are offered.
+    """
+    modes = ["cash"]
+    if context.upi_id:
+        modes.append("upi")
+    if context.razorpay_merchant_id and gateway is not None:
+        modes.append("razorpay")
+    return modes
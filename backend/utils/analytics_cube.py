@@ -0,0 +1,278 @@
+# utils/analytics_cube.py
+"""
+In-memory columnar order cube for dashboard drill-downs (heatmaps, payment
+mix, table turnover).
+
+Each worker loads a restaurant's orders once into NumPy arrays (id, created
+timestamp, total, status code, table id, payment code) and answers
+breakdowns with vectorized group-bys (np.bincount) instead of per-request
+scans. Later requests refresh incrementally: orders with an id above the
+newest loaded one are appended, and status changes are replayed from the
+order event log (OrderEvent), which every status write already records;
+its order.created events also catch orders that committed after a
+higher id was loaded. Events are pruned after EVENT_RETENTION, so a cube not refreshed within
+half that window is reloaded from scratch.
+
+NumPy is optional; without it cube_available() is False and the cube
+endpoints answer 503.
+"""
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Order, OrderEvent
+from utils.order_events import EVENT_RETENTION
+from utils.orders import ORDER_STATUSES
+
+try:
+    import numpy as np
+except ImportError:  # optional: cube endpoints disabled
+    np = None
+
+STATUS_CODES = {status: code for code, status in enumerate(ORDER_STATUSES)}
+UNKNOWN_STATUS = -1
+MAX_CACHED_CUBES = 64
+LOAD_CHUNK_SIZE = 10000
+MAX_STALENESS = EVENT_RETENTION / 2
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROS_PER_DAY = 86400 * 10 ** 6
+_MICROS_PER_HOUR = 3600 * 10 ** 6
+# 1970-01-01 was a Thursday; shifts day numbers so Monday is 0
+_WEEKDAY_OFFSET = 3
+
+_cubes = OrderedDict()
+_cubes_lock = threading.Lock()
+
+
+def cube_available():
+    return np is not None
+
+
+def _epoch_micros(value):
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class OrderCube:
+    # (name, dtype) of every column; rows are kept sorted by order id
+    COLUMNS = (
+        ('ids', 'int64'),
+        ('created', 'int64'),   # UTC epoch microseconds
+        ('totals', 'float64'),
+        ('status', 'int8'),
+        ('table_ids', 'int64'),
+        ('payment', 'int16'),
+    )
+
+    def __init__(self, restaurant_id):
+        self.restaurant_id = restaurant_id
+        self.lock = threading.Lock()
+        self.payment_methods = []  # payment code -> name
+        self._payment_codes = {}
+        self._reset()
+
+    def _reset(self):
+        self._arrays = {name: np.empty(1024, dtype) for name, dtype in self.COLUMNS}
+        self.size = 0
+        self.last_order_id = 0
+        self.last_event_id = 0
+        self.refreshed_at = None
+
+    def column(self, name):
+        return self._arrays[name][:self.size]
+
+    def _payment_code(self, method):
+        method = method or 'unknown'
+        code = self._payment_codes.get(method)
+        if code is None:
+            code = self._payment_codes[method] = len(self.payment_methods)
+            self.payment_methods.append(method)
+        return code
+
+    def _append(self, rows):
+        n = len(rows)
+        needed = self.size + n
+        capacity = len(self._arrays['ids'])
+        if needed > capacity:
+            # Grow geometrically so incremental refreshes stay amortized O(new rows)
+            while capacity < needed:
+                capacity *= 2
+            for name, array in self._arrays.items():
+                grown = np.empty(capacity, array.dtype)
+                grown[:self.size] = array[:self.size]
+                self._arrays[name] = grown
+
+        ids, created, totals, statuses, table_ids, payments = zip(*rows)
+        end = self.size + n
+        self._arrays['ids'][self.size:end] = ids
+        self._arrays['created'][self.size:end] = [_epoch_micros(c) if c else 0 for c in created]
+        self._arrays['totals'][self.size:end] = [float(t or 0) for t in totals]
+        self._arrays['status'][self.size:end] = [STATUS_CODES.get(s, UNKNOWN_STATUS) for s in statuses]
+        self._arrays['table_ids'][self.size:end] = [t or 0 for t in table_ids]
+        self._arrays['payment'][self.size:end] = [self._payment_code(p) for p in payments]
+        self.size = end
+        self.last_order_id = max(self.last_order_id, int(max(ids)))
+
+    def _sort(self):
+        order = np.argsort(self.column('ids'), kind='stable')
+        for name in self._arrays:
+            self._arrays[name][:self.size] = self._arrays[name][:self.size][order]
+
+    def _order_rows(self, *criteria):
+        return db.select(
+            Order.id, Order.created_at, Order.total, Order.status, Order.table_id, Order.payment_method
+        ).where(Order.restaurant_id == self.restaurant_id, *criteria).order_by(Order.id)
+
+    def _load_new_orders(self):
+        stmt = self._order_rows(Order.id > self.last_order_id).execution_options(yield_per=LOAD_CHUNK_SIZE)
+        for rows in db.session.execute(stmt).partitions():
+            self._append(rows)
+
+    def _apply_status_events(self):
+        events = db.session.execute(
+            db.select(OrderEvent.id, OrderEvent.order_id, OrderEvent.payload).where(
+                OrderEvent.restaurant_id == self.restaurant_id,
+                OrderEvent.id > self.last_event_id,
+                OrderEvent.event_type.in_(('order.created', 'order.updated'))
+            ).order_by(OrderEvent.id)
+        ).all()
+        if not events:
+            return
+
+        # Last event per order wins; events are in commit (id) order
+        latest = {}
+        for _, order_id, payload in events:
+            try:
+                latest[order_id] = STATUS_CODES.get(json.loads(payload).get('status'), UNKNOWN_STATUS)
+            except (TypeError, ValueError, AttributeError):
+                continue
+        self.last_event_id = events[-1][0]
+
+        if latest:
+            ids = self.column('ids')
+            order_ids = np.fromiter(latest.keys(), np.int64, len(latest))
+            codes = np.fromiter(latest.values(), np.int8, len(latest))
+            positions = np.searchsorted(ids, order_ids)
+            found = positions < self.size
+            found[found] &= ids[positions[found]] == order_ids[found]
+            self._arrays['status'][positions[found]] = codes[found]
+
+            # Orders below the newest loaded id that committed after it was loaded
+            missing = order_ids[~found & (order_ids <= self.last_order_id)]
+            if len(missing):
+                rows = db.session.execute(self._order_rows(Order.id.in_(missing.tolist()))).all()
+                if rows:
+                    self._append(rows)
+                    self._sort()
+
+    def refresh(self):
+        """
+        Brings the cube up to date: a full load the first time (or when the
+        event log may have been pruned past it), otherwise new orders plus
+        status changes since the last refresh.
+        """
+        now = datetime.utcnow()
+        if self.refreshed_at is None or now - self.refreshed_at > MAX_STALENESS:
+            self._reset()
+            # Taken before loading so no status change in between is missed
+            self.last_event_id = db.session.query(db.func.max(OrderEvent.id)).filter(
+                OrderEvent.restaurant_id == self.restaurant_id
+            ).scalar() or 0
+        self._load_new_orders()
+        self._apply_status_events()
+        self.refreshed_at = now
+
+    # -------------------------
+    # Breakdowns
+    # -------------------------
+    def _mask(self, since=None, until=None, statuses=None):
+        created = self.column('created')
+        mask = np.ones(self.size, bool)
+        if since is not None:
+            mask &= created >= _epoch_micros(since)
+        if until is not None:
+            mask &= created < _epoch_micros(until)
+        if statuses:
+            mask &= np.isin(self.column('status'), [STATUS_CODES[s] for s in statuses])
+        return mask
+
+    def heatmap(self, since=None, until=None, statuses=None, utc_offset_minutes=0):
+        """
+        Orders and revenue per (weekday, hour of day) in the restaurant's local time.
+        Returns two 7x24 nested lists, Monday first.
+        """
+        mask = self._mask(since, until, statuses)
+        local = self.column('created')[mask] + utc_offset_minutes * 60 * 10 ** 6
+        days, micros = np.divmod(local, _MICROS_PER_DAY)
+        cells = ((days + _WEEKDAY_OFFSET) % 7) * 24 + micros // _MICROS_PER_HOUR
+        orders = np.bincount(cells, minlength=7 * 24).reshape(7, 24)
+        revenue = np.bincount(cells, weights=self.column('totals')[mask], minlength=7 * 24).reshape(7, 24)
+        return orders.tolist(), np.round(revenue, 2).tolist()
+
+    def payment_mix(self, since=None, until=None, statuses=None):
+        """
+        [{method, orders, revenue, share}] by payment method, largest revenue first.
+        """
+        mask = self._mask(since, until, statuses)
+        codes = self.column('payment')[mask]
+        methods = len(self.payment_methods)
+        orders = np.bincount(codes, minlength=methods)
+        revenue = np.bincount(codes, weights=self.column('totals')[mask], minlength=methods)
+        total_orders = int(orders.sum())
+        mix = [
+            {
+                'method': method,
+                'orders': int(orders[code]),
+                'revenue': round(float(revenue[code]), 2),
+                'share': round(int(orders[code]) / total_orders, 4) if total_orders else 0.0,
+            }
+            for code, method in enumerate(self.payment_methods)
+            if orders[code]
+        ]
+        return sorted(mix, key=lambda m: m['revenue'], reverse=True)
+
+    def table_turnover(self, since=None, until=None, statuses=None):
+        """
+        [{table_id, orders, revenue, average_order_value, first_order, last_order}] per table.
+        """
+        mask = self._mask(since, until, statuses)
+        table_ids, index = np.unique(self.column('table_ids')[mask], return_inverse=True)
+        if not len(table_ids):
+            return []
+        created = self.column('created')[mask]
+        orders = np.bincount(index, minlength=len(table_ids))
+        revenue = np.bincount(index, weights=self.column('totals')[mask], minlength=len(table_ids))
+        first = np.full(len(table_ids), np.iinfo(np.int64).max)
+        last = np.full(len(table_ids), np.iinfo(np.int64).min)
+        np.minimum.at(first, index, created)
+        np.maximum.at(last, index, created)
+        return [
+            {
+                'table_id': int(table_id),
+                'orders': int(orders[i]),
+                'revenue': round(float(revenue[i]), 2),
+                'average_order_value': round(float(revenue[i]) / int(orders[i]), 2),
+                'first_order': (_EPOCH + int(first[i]) * _MICROSECOND).isoformat(),
+                'last_order': (_EPOCH + int(last[i]) * _MICROSECOND).isoformat(),
+            }
+            for i, table_id in enumerate(table_ids)
+        ]
+
+
+def get_order_cube(restaurant_id):
+    """
+    This worker's cube for the restaurant (created on first use). Callers
+    hold cube.lock while refreshing and reading it.
+    """
+    with _cubes_lock:
+        cube = _cubes.get(restaurant_id)
+        if cube is None:
+            cube = _cubes[restaurant_id] = OrderCube(restaurant_id)
+        _cubes.move_to_end(restaurant_id)
+        while len(_cubes) > MAX_CACHED_CUBES:
+            _cubes.popitem(last=False)
+    return cube
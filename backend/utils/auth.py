@@ -0,0 +1,116 @@
+# utils/auth.py
+"""
+Shared JWT authentication for restaurant (dashboard) endpoints.
+
+Verified claims are kept in a bounded LRU keyed by a SHA-256 digest of the
+token, and each entry expires at the token's own `exp`, so repeated
+dashboard requests skip the HS256 signature check without ever accepting
+an expired token.
+
+Browsers' EventSource can't send an Authorization header, so the order
+stream also takes a short-lived ?token= minted by POST /api/orders/stream-token.
+Those tokens carry a `scope` claim and are rejected everywhere else, so one
+leaking through a URL (logs, history) only grants a minute of that stream.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+
+import jwt
+from flask import request, jsonify, current_app
+
+TOKEN_CACHE_SIZE = 1024
+# Upper bound for tokens that carry no exp claim
+TOKEN_CACHE_MAX_TTL = 300
+STREAM_TOKEN_SCOPE = 'order-stream'
+STREAM_TOKEN_TTL = timedelta(seconds=60)
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_key(token, secret):
+    return hashlib.sha256(f"{secret}\x00{token}".encode()).digest()
+
+
+def verify_token(token):
+    """
+    Returns the token's claims, raising jwt.InvalidTokenError if it is
+    invalid or expired.
+    """
+    secret = current_app.config['SECRET_KEY']
+    key = _cache_key(token, secret)
+    now = time.time()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            claims, expires_at = entry
+            if now < expires_at:
+                _cache.move_to_end(key)
+                return claims
+            del _cache[key]
+
+    claims = jwt.decode(token, secret, algorithms=['HS256'])
+    expires_at = claims.get('exp', now + TOKEN_CACHE_MAX_TTL)
+
+    with _lock:
+        _cache[key] = (claims, expires_at)
+        _cache.move_to_end(key)
+        while len(_cache) > TOKEN_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return claims
+
+
+def create_stream_token(restaurant_id):
+    """
+    Short-lived token accepted only by stream_auth_required endpoints.
+    """
+    payload = {
+        'restaurant_id': restaurant_id,
+        'scope': STREAM_TOKEN_SCOPE,
+        'exp': datetime.utcnow() + STREAM_TOKEN_TTL
+    }
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def _authenticate(f, token, scope, args, kwargs):
+    if not token:
+        return jsonify({'error': 'Token missing'}), 401
+    try:
+        token = token.split(' ')[1] if ' ' in token else token
+        data = verify_token(token)
+        restaurant_id = data.get('restaurant_id')
+        if not restaurant_id or data.get('scope') != scope:
+            return jsonify({'error': 'Invalid token'}), 401
+    except Exception:
+        return jsonify({'error': 'Invalid token'}), 401
+    return f(restaurant_id, *args, **kwargs)
+
+
+def auth_required(f):
+    """
+    Decorator to enforce JWT authentication for restaurant endpoints.
+    Passes the token's restaurant_id as the first argument.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        return _authenticate(f, request.headers.get('Authorization'), None, args, kwargs)
+    return decorated
+
+
+def stream_auth_required(f):
+    """
+    auth_required that, without an Authorization header, accepts a stream
+    token (create_stream_token) in ?token= for EventSource clients.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        header = request.headers.get('Authorization')
+        if header:
+            return _authenticate(f, header, None, args, kwargs)
+        return _authenticate(f, request.args.get('token'), STREAM_TOKEN_SCOPE, args, kwargs)
+    return decorated
@@ -0,0 +1,92 @@
+# utils/db_pool.py
+"""
+Database connection pool telemetry.
+
+Server databases use MeteredQueuePool, a QueuePool that times every checkout
+(waiting for a free connection, or opening a new one). pool_status() reports
+the pool of the current worker process, so hitting /api/_dbtest a few times
+behind gunicorn shows each worker's usage against the DB connection limit.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class CheckoutStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.count,
+                'timeouts': self.timeouts,
+                'avg_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                'max_ms': round(self.max * 1000, 3),
+                'total_ms': round(self.total * 1000, 3),
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep the counters
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - start)
+        return conn
+
+
+def init_pool_metrics(app):
+    """
+    Switches pooled (non-SQLite) engines to MeteredQueuePool. Call before db.init_app.
+    """
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if 'pool_size' in options:
+        options.setdefault('poolclass', MeteredQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pid': os.getpid(), 'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            # QueuePool counts up from -size; only connections beyond size are overflow
+            'overflow': max(pool.overflow(), 0),
+            'timeout_s': pool.timeout(),
+        })
+    stats = getattr(pool, 'checkout_stats', None)
+    if stats is not None:
+        status['checkout_wait'] = stats.snapshot()
+    return status
@@ -1,4 +1,5 @@
 import re
+from bisect import bisect_right
 
 NON_VEG = [
     "chicken", "egg", "eggs", "mutton", "lamb", "fish", "prawn", "shrimp",
@@ -6,33 +7,114 @@ NON_VEG = [
 ]
 
 DAIRY = [
-    "milk", "butter", "cheese", "paneer", "ghee", "cream", "yogurt", "curd", "mayo"
+    "milk", "butter", "cheese", "paneer", "ghee", "cream", "yogurt", "curd", "mayo",
+    "buttery", "cheesy", "creamy", "mayonnaise", "buttermilk", "milkshake", "cheeseburger"
 ]
 
 GLUTEN = [
-    "wheat", "maida", "atta", "bread", "pasta", "pizza", "roti", "naan", "chapati"
+    "wheat", "maida", "atta", "bread", "pasta", "pizza", "roti", "naan", "chapati",
+    "breadstick", "breadcrumb"
 ]
 
 NUTS = [
-    "almond", "cashew", "pista", "walnut", "peanut", "hazelnut"
+    "almond", "cashew", "pista", "walnut", "peanut", "hazelnut", "pistachio", "cashewnut"
 ]
 
-def detect_dietary_info(name, description):
-    text = f"{name} {description}".lower()
+# Bit per flag in MenuItem.dietary_mask, so "vegan + nut-free" is one indexed predicate
+DIETARY_BITS = {
+    "is_vegetarian": 1,
+    "is_vegan": 2,
+    "is_gluten_free": 4,
+    "is_nut_free": 8,
+}
+
+CATEGORIES = (
+    ("non_veg", NON_VEG),
+    ("dairy", DAIRY),
+    ("gluten", GLUTEN),
+    ("nuts", NUTS),
+)
+
+
+# A keyword preceded by one of these, or followed by "-free"/"-less", is
+# negated ("no egg", "peanut-free salad", "egg less cake")
+NEGATING_PREFIXES = ("no", "without")
+NEGATING_SUFFIXES = ("free", "less")
+
+
+def _compile_matcher():
+    # One alternation for all keywords, matched as whole words with an
+    # optional plural suffix, so "ham" stays out of "champagne" and "roti"
+    # out of "rotisserie". Compounds ("buttermilk", "pistachio") are listed
+    # explicitly rather than matched as prefixes, which would also catch
+    # "eggless" or "butternut".
+    groups = []
+    for label, words in CATEGORIES:
+        alternatives = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+        groups.append(f"(?P<{label}>{alternatives})")
+    not_after = "".join(rf"(?<!\b{p} )" for p in NEGATING_PREFIXES)
+    not_before = rf"(?![\s-]?(?:{'|'.join(NEGATING_SUFFIXES)})\b)"
+    return re.compile(not_after + r"\b(?:" + "|".join(groups) + r")(?:e?s)?\b" + not_before)
+
+
+_MATCHER = _compile_matcher()
+
+
+def dietary_mask(flags):
+    """
+    Packs a {flag: bool} dict (the four is_* fields) into the dietary_mask bits.
+    """
+    return sum(bit for field, bit in DIETARY_BITS.items() if flags.get(field))
+
 
-    has_non_veg = any(word in text for word in NON_VEG)
-    has_dairy = any(word in text for word in DAIRY)
-    has_gluten = any(word in text for word in GLUTEN)
-    has_nuts = any(word in text for word in NUTS)
+def masks_including(required):
+    """
+    Every mask value that has all the `required` bits set (at most 16).
+    """
+    return [mask for mask in range(sum(DIETARY_BITS.values()) + 1) if mask & required == required]
 
-    is_vegetarian = not has_non_veg
-    is_vegan = is_vegetarian and not has_dairy
-    is_gluten_free = not has_gluten
-    is_nut_free = not has_nuts
 
-    return {
+def _flags(found):
+    is_vegetarian = "non_veg" not in found
+    flags = {
         "is_vegetarian": is_vegetarian,
-        "is_vegan": is_vegan,
-        "is_gluten_free": is_gluten_free,
-        "is_nut_free": is_nut_free
+        "is_vegan": is_vegetarian and "dairy" not in found,
+        "is_gluten_free": "gluten" not in found,
+        "is_nut_free": "nuts" not in found
     }
+    flags["dietary_mask"] = dietary_mask(flags)
+    return flags
+
+
+def detect_dietary_info(name, description):
+    text = f"{name} {description or ''}".lower()
+
+    found = set()
+    for match in _MATCHER.finditer(text):
+        found.add(match.lastgroup)
+        if len(found) == len(CATEGORIES):
+            break
+
+    return _flags(found)
+
+
+def detect_dietary_info_batch(items):
+    """
+    Classifies many (name, description) pairs in a single regex pass over
+    their concatenated text. Returns one flags dict per input, in order.
+    """
+    texts = [f"{name} {description or ''}".lower() for name, description in items]
+    if not texts:
+        return []
+
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1  # newline separator
+
+    found = [set() for _ in texts]
+    for match in _MATCHER.finditer("\n".join(texts)):
+        found[bisect_right(starts, match.start()) - 1].add(match.lastgroup)
+
+    return [_flags(f) for f in found]
@@ -0,0 +1,146 @@
+# utils/idempotency.py
+"""
+Idempotency-Key support for endpoints that must not run twice on a retry.
+
+The first request with a key claims it by inserting an IdempotencyKey row
+(unique on scope + key) and, once the view has finished, stores the
+response on that row. A retry with the same key and body gets the stored
+response back: it costs one SELECT and never reaches the view, so no
+second order or gateway call is made. Keys expire after IDEMPOTENCY_TTL.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+import click
+from flask import Response, jsonify, make_response, request
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_TTL = timedelta(hours=24)
+# A claim older than this whose request never finished (worker killed) may be retaken
+IN_PROGRESS_TIMEOUT = timedelta(seconds=60)
+MAX_KEY_LENGTH = 255
+PRUNE_EVERY = 500
+
+_claims = 0
+
+
+def _request_hash():
+    return hashlib.sha256(request.path.encode() + b'\n' + request.get_data()).hexdigest()
+
+
+def _lookup(scope, key):
+    return IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _claim(scope, key, request_hash):
+    """
+    Inserts the in-progress row. Returns False if another request holds the key.
+    """
+    global _claims
+    try:
+        db.session.add(IdempotencyKey(scope=scope, key=key, request_hash=request_hash,
+                                      created_at=datetime.utcnow()))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+    _claims += 1
+    if _claims % PRUNE_EVERY == 0:
+        prune_idempotency_keys()
+    return True
+
+
+def _release(scope, key):
+    db.session.rollback()
+    IdempotencyKey.query.filter_by(scope=scope, key=key).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def idempotent(scope):
+    """
+    Decorator: honour an optional Idempotency-Key header for this view.
+    Responses below 500 are stored and replayed; on a server error the key is
+    released so the client can retry.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return f(*args, **kwargs)
+            key = key.strip()
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters'}), 400
+
+            request_hash = _request_hash()
+            now = datetime.utcnow()
+            record = _lookup(scope, key)
+            if record is not None:
+                expired = record.created_at < now - IDEMPOTENCY_TTL
+                abandoned = record.status_code is None and record.created_at < now - IN_PROGRESS_TIMEOUT
+                if expired or abandoned:
+                    _release(scope, key)
+                    record = None
+
+            if record is None and not _claim(scope, key, request_hash):
+                # Lost the race to a concurrent request with the same key
+                record = _lookup(scope, key)
+                if record is None:
+                    return jsonify({'error': 'Idempotency key conflict, please retry'}), 409
+
+            if record is not None:
+                if record.request_hash != request_hash:
+                    return jsonify({'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'}), 422
+                if record.status_code is None:
+                    return jsonify({'error': 'A request with this Idempotency-Key is still being processed'}), 409
+                return _replay(record)
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                _release(scope, key)
+                raise
+
+            if response.status_code >= 500:
+                _release(scope, key)
+                return response
+
+            db.session.rollback()
+            IdempotencyKey.query.filter_by(scope=scope, key=key).update({
+                'status_code': response.status_code,
+                'response_body': response.get_data(as_text=True)
+            }, synchronize_session=False)
+            db.session.commit()
+            return response
+        return decorated
+    return decorator
+
+
+def prune_idempotency_keys():
+    """
+    Deletes keys older than IDEMPOTENCY_TTL. Returns the number removed.
+    """
+    cutoff = datetime.utcnow() - IDEMPOTENCY_TTL
+    removed = IdempotencyKey.query.filter(IdempotencyKey.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+
+@click.command('prune-idempotency-keys')
+@with_appcontext
+def prune_idempotency_keys_command():
+    """Delete expired Idempotency-Key records."""
+    click.echo(f"Removed {prune_idempotency_keys()} expired idempotency keys.")
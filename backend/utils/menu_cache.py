@@ -0,0 +1,120 @@
+# utils/menu_cache.py
+"""
+Per-restaurant menu versioning and serialized-menu cache.
+
+Restaurant.menu_version is bumped in the same transaction as every menu
+write, so all workers agree on the current version with one primary-key
+lookup. Serialized payloads are cached in-process by (kind, restaurant_id,
+version) and served with an ETag; clients that already hold the current
+version get a 304 without the menu being queried or serialized. The same
+cache holds each restaurant's price map for server-side order pricing and
+the grouped menu of the customer bootstrap payload.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+from extensions import db
+from models import MenuItem, Restaurant
+
+MAX_CACHED_MENUS = 512
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_menu_version(restaurant_id):
+    return db.session.query(Restaurant.menu_version).filter(
+        Restaurant.id == restaurant_id
+    ).scalar() or 0
+
+
+def bump_menu_version(restaurant_id):
+    """
+    Invalidates cached menus for a restaurant. Call before committing a menu write.
+    """
+    db.session.execute(
+        db.update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(menu_version=Restaurant.menu_version + 1)
+    )
+
+
+def _cache_get(key):
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+
+def _cache_put(key, entry):
+    with _lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_MENUS:
+            _cache.popitem(last=False)
+
+
+def cached_menu_response(kind, restaurant_id, build, version=None, cache=True):
+    """
+    Returns the menu response for `kind` ('customer', 'admin', ...), honouring
+    If-None-Match. `build()` returns (payload, status) and only runs on a
+    cache miss for the current version (looked up unless given). With
+    cache=False the body is built on every request and only the ETag is
+    versioned, for kinds with too many variants to cache.
+    """
+    if version is None:
+        version = get_menu_version(restaurant_id)
+    etag = f"{kind}-{restaurant_id}-{version}"
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        key = (kind, restaurant_id, version)
+        entry = _cache_get(key) if cache else None
+        if entry is None:
+            payload, status = build()
+            entry = (current_app.json.dumps(payload).encode(), status)
+            if cache:
+                _cache_put(key, entry)
+        body, status = entry
+        response = Response(body, status=status, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+def cached_for_version(kind, restaurant_id, version, build):
+    """
+    Returns build() for (kind, restaurant_id, version), building it only on a
+    cache miss. Callers pass the version they already read. Treat the result as read-only.
+    """
+    key = (kind, restaurant_id, version)
+    value = _cache_get(key)
+    if value is None:
+        value = build()
+        _cache_put(key, value)
+    return value
+
+
+def get_price_map(restaurant_id, version=None):
+    """
+    {menu_item_id: (name, price, available)} for the restaurant's current menu
+    version (looked up unless given), loaded with one query and cached until
+    the menu changes. Treat the returned dict as read-only.
+    """
+    def build():
+        rows = db.session.query(MenuItem.id, MenuItem.name, MenuItem.price, MenuItem.available).filter(
+            MenuItem.restaurant_id == restaurant_id
+        ).all()
+        return {
+            item_id: (name, float(price or 0), available is not False)
+            for item_id, name, price, available in rows
+        }
+
+    if version is None:
+        version = get_menu_version(restaurant_id)
+    return cached_for_version('prices', restaurant_id, version, build)
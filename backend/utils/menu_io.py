@@ -0,0 +1,219 @@
+# utils/menu_io.py
+"""
+Bulk menu import/export.
+
+Imports read the upload incrementally (CSV or NDJSON lines), classify dietary
+flags per batch and insert each batch with one multi-row INSERT, so a large
+menu costs a handful of statements and transactions. Exports stream rows
+from the database in chunks instead of building the whole menu in memory.
+"""
+import csv
+import io
+import json
+import math
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db
+from models import MenuItem
+from utils.dietary import detect_dietary_info_batch
+from utils.menu_cache import bump_menu_version
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+MENU_FIELDS = ['id', 'name', 'description', 'price', 'category', 'image_url', 'available',
+               'is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_nut_free']
+
+
+class MenuImportError(ValueError):
+    """
+    The upload can't be read further. `result` counts what earlier batches
+    already committed ({'imported', 'failed', 'errors'}).
+    """
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result or {'imported': 0, 'failed': 0, 'errors': []}
+
+
+def _parse_bool(value, default=True):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+class _ReadOnlyStream(io.RawIOBase):
+    """
+    Adapts a bare file-like object (anything with read(n)) for TextIOWrapper.
+    gunicorn hands Werkzeug its own request body object, which lacks the io.IOBase API.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _text_stream(stream, encoding, newline=None):
+    if not isinstance(stream, io.IOBase):
+        stream = io.BufferedReader(_ReadOnlyStream(stream))
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+
+
+def iter_csv_rows(stream):
+    """
+    Yields (row_number, dict) from a binary CSV stream with a header row.
+    """
+    reader = csv.DictReader(_text_stream(stream, 'utf-8-sig', newline=''))
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_ndjson_rows(stream):
+    """
+    Yields (row_number, dict) from a binary stream of one JSON object per line.
+    Malformed lines are yielded as (row_number, None).
+    """
+    for row_number, line in enumerate(_text_stream(stream, 'utf-8'), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row_number, row if isinstance(row, dict) else None
+
+
+def iter_json_array_rows(items):
+    if not isinstance(items, list):
+        raise MenuImportError('Expected a JSON array of menu items')
+    for row_number, row in enumerate(items, start=1):
+        yield row_number, row if isinstance(row, dict) else None
+
+
+def _text(row, field):
+    # JSON rows can carry any type; numbers are accepted as text, lists/objects/booleans are not
+    value = row.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f'{field.capitalize()} must be text')
+    return str(value).strip() or None
+
+
+def _validate_row(row):
+    if row is None:
+        raise ValueError('Malformed row')
+    name = _text(row, 'name')
+    if not name:
+        raise ValueError('Name is required')
+    price = row.get('price')
+    if isinstance(price, bool):
+        raise ValueError('Price must be a number')
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        raise ValueError('Price must be a number')
+    if not math.isfinite(price):
+        raise ValueError('Price must be a number')
+    if price < 0:
+        raise ValueError('Price must not be negative')
+    return {
+        'name': name[:100],
+        'description': _text(row, 'description'),
+        'price': price,
+        'category': _text(row, 'category'),
+        'image_url': _text(row, 'image_url'),
+        'available': _parse_bool(row.get('available')),
+    }
+
+
+def _flush_batch(restaurant_id, batch):
+    flags = detect_dietary_info_batch((r['name'], r['description']) for r in batch)
+    db.session.execute(
+        db.insert(MenuItem),
+        [{'restaurant_id': restaurant_id, **row, **f} for row, f in zip(batch, flags)]
+    )
+    bump_menu_version(restaurant_id)
+    db.session.commit()
+
+
+def import_menu_rows(restaurant_id, rows):
+    """
+    Validates and inserts rows from one of the iter_*_rows generators.
+    Returns {'imported': n, 'failed': n, 'errors': [{'row': n, 'error': str}, ...]}.
+    Each batch commits on its own, so if the upload turns unreadable or a
+    batch fails to insert, raises MenuImportError whose `result` reports
+    the rows earlier batches already imported.
+    """
+    result = {'imported': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    try:
+        for row_number, row in rows:
+            try:
+                batch.append(_validate_row(row))
+            except ValueError as e:
+                result['failed'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append({'row': row_number, 'error': str(e)})
+                continue
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _flush_batch(restaurant_id, batch)
+                result['imported'] += len(batch)
+                batch = []
+
+        if batch:
+            _flush_batch(restaurant_id, batch)
+            result['imported'] += len(batch)
+    except (MenuImportError, UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        raise MenuImportError(str(e), result)
+    except SQLAlchemyError as e:
+        print(f"[ERROR] Menu import batch failed: {e}")
+        db.session.rollback()
+        raise MenuImportError('Saving a batch of menu items failed', result)
+
+    return result
+
+
+def _export_rows(restaurant_id):
+    query = db.session.query(*[getattr(MenuItem, f) for f in MENU_FIELDS]).filter(
+        MenuItem.restaurant_id == restaurant_id
+    ).order_by(MenuItem.id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    for row in query:
+        yield dict(zip(MENU_FIELDS, row))
+
+
+def export_menu_csv(restaurant_id):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=MENU_FIELDS)
+    writer.writeheader()
+    for row in _export_rows(restaurant_id):
+        writer.writerow(row)
+        if buf.tell() >= 16384:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def export_menu_ndjson(restaurant_id):
+    lines = []
+    for row in _export_rows(restaurant_id):
+        lines.append(json.dumps(row))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
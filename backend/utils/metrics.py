@@ -0,0 +1,386 @@
+# utils/metrics.py
+"""
+Request and SQL metrics in Prometheus text format (served at /api/_metrics).
+
+Each request records its latency, status code, and SQL query count and time,
+labelled by Flask endpoint. SQL timing comes from SQLAlchemy cursor events.
+
+Every gunicorn worker keeps its own counters. When METRICS_DIR is set, each
+worker also writes a snapshot to its own file in that directory (at most once
+per METRICS_FLUSH_INTERVAL). The worker answering a scrape sums all of those
+files. A worker that exits folds its counters into one retired-totals file
+and removes its own; files left by workers that died without exiting cleanly
+are folded the same way on the next scrape. So the totals cover every
+worker, including recycled ones, and the directory stays bounded. Clear it
+when deploying.
+"""
+import atexit
+import fcntl
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+METRICS_FLUSH_INTERVAL = 1.0
+# Not recorded: the scrape itself and liveness probes
+UNTRACKED_ENDPOINTS = {'metrics', 'health'}
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = '.lock'
+
+# Every WorkerMetrics, reset in forked children by one at-fork hook
+_instances = weakref.WeakSet()
+_fork_hook_installed = False
+
+
+def _new_histogram(buckets):
+    return [[0] * len(buckets), 0.0, 0]
+
+
+def _observe(hist, buckets, value):
+    counts = hist[0]
+    # Non-cumulative per bucket; made cumulative on render
+    index = bisect_left(buckets, value)
+    if index < len(counts):
+        counts[index] += 1
+    hist[1] += value
+    hist[2] += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}   # (endpoint, method, status) -> count
+        self.latency = {}    # (endpoint, method) -> histogram
+        self.sql_count = {}  # (endpoint,) -> histogram of queries per request
+        self.sql_time = {}   # (endpoint,) -> seconds
+
+    def record(self, endpoint, method, status, seconds, queries, sql_seconds):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            _observe(self.latency.setdefault((endpoint, method), _new_histogram(LATENCY_BUCKETS)),
+                     LATENCY_BUCKETS, seconds)
+            _observe(self.sql_count.setdefault((endpoint,), _new_histogram(SQL_COUNT_BUCKETS)),
+                     SQL_COUNT_BUCKETS, queries)
+            self.sql_time[(endpoint,)] = self.sql_time.get((endpoint,), 0.0) + sql_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': [[*k, v] for k, v in self.requests.items()],
+                'latency': [[*k, list(h[0]), h[1], h[2]] for k, h in self.latency.items()],
+                'sql_count': [[*k, list(h[0]), h[1], h[2]] for k, h in self.sql_count.items()],
+                'sql_time': [[*k, v] for k, v in self.sql_time.items()],
+            }
+
+
+def _merge(snapshots):
+    requests, latency, sql_count, sql_time = {}, {}, {}, {}
+    for snap in snapshots:
+        for *key, value in snap.get('requests', []):
+            requests[tuple(key)] = requests.get(tuple(key), 0) + value
+        for target, rows in ((latency, snap.get('latency', [])), (sql_count, snap.get('sql_count', []))):
+            for row in rows:
+                key, (counts, total, count) = tuple(row[:-3]), row[-3:]
+                hist = target.setdefault(key, [[0] * len(counts), 0.0, 0])
+                hist[0] = [a + b for a, b in zip(hist[0], counts)]
+                hist[1] += total
+                hist[2] += count
+        for *key, value in snap.get('sql_time', []):
+            sql_time[tuple(key)] = sql_time.get(tuple(key), 0.0) + value
+    return requests, latency, sql_count, sql_time
+
+
+def _combine(snapshots):
+    """
+    Sums snapshots into a single snapshot.
+    """
+    requests, latency, sql_count, sql_time = _merge(snapshots)
+    return {
+        'requests': [[*k, v] for k, v in requests.items()],
+        'latency': [[*k, h[0], h[1], h[2]] for k, h in latency.items()],
+        'sql_count': [[*k, h[0], h[1], h[2]] for k, h in sql_count.items()],
+        'sql_time': [[*k, v] for k, v in sql_time.items()],
+    }
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _render_histogram(lines, name, label_names, data, buckets):
+    for key, (counts, total, count) in sorted(data.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels(label_names, key, ('le', bound))} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(label_names, key, ('le', '+Inf'))} {count}")
+        lines.append(f"{name}_sum{_labels(label_names, key)} {total}")
+        lines.append(f"{name}_count{_labels(label_names, key)} {count}")
+
+
+def render_prometheus(snapshots):
+    requests, latency, sql_count, sql_time = _merge(snapshots)
+    lines = [
+        '# HELP taptable_http_requests_total HTTP requests by endpoint, method and status.',
+        '# TYPE taptable_http_requests_total counter',
+    ]
+    for key, value in sorted(requests.items()):
+        lines.append(f"taptable_http_requests_total{_labels(('endpoint', 'method', 'status'), key)} {value}")
+
+    lines += [
+        '# HELP taptable_http_request_duration_seconds Time to produce the response.',
+        '# TYPE taptable_http_request_duration_seconds histogram',
+    ]
+    _render_histogram(lines, 'taptable_http_request_duration_seconds', ('endpoint', 'method'),
+                      latency, LATENCY_BUCKETS)
+
+    lines += [
+        '# HELP taptable_http_request_sql_queries SQL statements executed per request.',
+        '# TYPE taptable_http_request_sql_queries histogram',
+    ]
+    _render_histogram(lines, 'taptable_http_request_sql_queries', ('endpoint',), sql_count, SQL_COUNT_BUCKETS)
+
+    lines += [
+        '# HELP taptable_sql_duration_seconds_total Time spent executing SQL statements.',
+        '# TYPE taptable_sql_duration_seconds_total counter',
+    ]
+    for key, value in sorted(sql_time.items()):
+        lines.append(f"taptable_sql_duration_seconds_total{_labels(('endpoint',), key)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class WorkerMetrics:
+    """
+    The current process's registry plus its snapshot file under METRICS_DIR.
+    """
+    def __init__(self, metrics_dir=None):
+        global _fork_hook_installed
+        self.registry = MetricsRegistry()
+        self.metrics_dir = metrics_dir
+        self._path = None
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        _instances.add(self)
+        if not _fork_hook_installed:
+            os.register_at_fork(after_in_child=_reset_after_fork)
+            _fork_hook_installed = True
+        if metrics_dir:
+            atexit.register(self.retire)
+
+    def _reset_after_fork(self):
+        # Forked workers start empty and write their own file
+        self.registry = MetricsRegistry()
+        self._path = None
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def _file_path(self):
+        if self._path is None:
+            self._path = os.path.join(
+                self.metrics_dir, f"metrics_{os.getpid()}_{uuid.uuid4().hex[:8]}.json"
+            )
+        return self._path
+
+    def flush(self):
+        if not self.metrics_dir:
+            return
+        with self._flush_lock:
+            path = self._file_path()
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.registry.snapshot(), f)
+            os.replace(tmp_path, path)
+            self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if self.metrics_dir and time.monotonic() - self._last_flush >= METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def retire(self):
+        """
+        At worker exit: moves this worker's counters into the retired totals.
+        """
+        if not self.metrics_dir or self._path is None:
+            return
+        self.flush()
+        self._fold([self._path])
+        self._path = None
+
+    @contextmanager
+    def _dir_lock(self):
+        # Serializes folding across the workers sharing METRICS_DIR
+        with open(os.path.join(self.metrics_dir, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _fold(self, paths):
+        """
+        Adds the snapshot files at `paths` to the retired totals and deletes them.
+        Files another worker already folded are skipped.
+        """
+        retired_path = os.path.join(self.metrics_dir, RETIRED_FILE)
+        with self._dir_lock():
+            snapshots = [_read_snapshot(retired_path) or {}]
+            folded = []
+            for path in paths:
+                snapshot = _read_snapshot(path)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+                    folded.append(path)
+            if not folded:
+                return
+            fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(_combine(snapshots), f)
+            os.replace(tmp_path, retired_path)
+            for path in folded:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def collect(self):
+        """
+        Snapshots to export: the retired totals plus every live worker's file,
+        or just this process without METRICS_DIR.
+        """
+        if not self.metrics_dir:
+            return [self.registry.snapshot()]
+        self.flush()
+        live, dead = [], []
+        for filename in os.listdir(self.metrics_dir):
+            if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                continue
+            path = os.path.join(self.metrics_dir, filename)
+            (live if _pid_alive(_worker_pid(filename)) else dead).append(path)
+        if dead:
+            self._fold(dead)
+        paths = [os.path.join(self.metrics_dir, RETIRED_FILE)] + live
+        return [s for s in map(_read_snapshot, paths) if s is not None]
+
+
+def _reset_after_fork():
+    for metrics in list(_instances):
+        metrics._reset_after_fork()
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _worker_pid(filename):
+    # metrics_<pid>_<suffix>.json
+    try:
+        return int(filename.split('_')[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    if pid is None:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# -------------------------
+# SQL timing (all engines)
+# -------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if has_request_context() and 'sql_stats' in g:
+        g.sql_stats[0] += 1
+        g.sql_stats[1] += elapsed
+
+
+def _handle_sql_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get('query_start') if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _listen_sql_events():
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_sql_error)
+
+
+def init_metrics(app):
+    """
+    Installs the request hooks and the /api/_metrics endpoint. Scrapes need
+    METRICS_TOKEN; without one the endpoint is only served in debug/testing.
+    """
+    metrics = WorkerMetrics(app.config.get('METRICS_DIR'))
+    _listen_sql_events()
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_start = time.perf_counter()
+        g.sql_stats = [0, 0.0]
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('request_start', None)
+        endpoint = request.endpoint or 'unmatched'
+        if start is not None and endpoint not in UNTRACKED_ENDPOINTS:
+            queries, sql_seconds = g.get('sql_stats', (0, 0.0))
+            metrics.registry.record(endpoint, request.method, response.status_code,
+                                    time.perf_counter() - start, queries, sql_seconds)
+            metrics.maybe_flush()
+        return response
+
+    @app.route('/api/_metrics', endpoint='metrics')
+    def prometheus_metrics():
+        token = current_app.config.get('METRICS_TOKEN')
+        if not token:
+            if not (current_app.debug or current_app.testing):
+                return Response('Not Found\n', status=404, mimetype='text/plain')
+        elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                                     f"Bearer {token}".encode()):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(render_prometheus(metrics.collect()), mimetype='text/plain; version=0.0.4')
+
+    app.extensions['metrics'] = metrics
+    return metrics
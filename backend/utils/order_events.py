@@ -0,0 +1,157 @@
+# utils/order_events.py
+"""
+Order change feed for the kitchen dashboard.
+
+Every order write adds an OrderEvent row in the same transaction, so the
+event id doubles as a resumable cursor (SSE Last-Event-ID) and works across
+gunicorn workers. A cursor whose following events may have been pruned gets
+a `reset` event instead, telling the client to reload its order list. Streams in this process are woken immediately after a
+commit; events written by other workers are picked up on the next poll.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import OrderEvent
+from utils.orders import serialize_order
+
+POLL_INTERVAL_SECONDS = 2
+HEARTBEAT_SECONDS = 15
+EVENT_BATCH_SIZE = 200
+EVENT_RETENTION = timedelta(days=1)
+PRUNE_EVERY = 500
+
+_condition = threading.Condition()
+_generation = 0
+_published = 0
+
+
+def record_order_event(order, event_type):
+    """
+    Add an event for `order` to the current session. The order must already be
+    flushed so it has an id; the caller commits and then calls notify_order_events().
+    """
+    event = OrderEvent(
+        restaurant_id=order.restaurant_id,
+        order_id=order.id,
+        event_type=event_type,
+        payload=json.dumps(serialize_order(order)),
+        created_at=datetime.utcnow()
+    )
+    db.session.add(event)
+    return event
+
+
+def record_order_events(orders, event_type):
+    """
+    record_order_event for many orders with a single executemany INSERT.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            'restaurant_id': order.restaurant_id,
+            'order_id': order.id,
+            'event_type': event_type,
+            'payload': json.dumps(serialize_order(order)),
+            'created_at': now,
+        }
+        for order in orders
+    ]
+    if rows:
+        db.session.execute(db.insert(OrderEvent), rows)
+
+
+def notify_order_events():
+    """
+    Wake up streams in this process after a commit that recorded events.
+    """
+    global _generation, _published
+    with _condition:
+        _generation += 1
+        _condition.notify_all()
+
+    _published += 1
+    if _published % PRUNE_EVERY == 0:
+        prune_order_events()
+
+
+def prune_order_events():
+    """
+    Drop events older than the retention window. Streams resumed from a
+    pruned cursor send `reset` (see stream_order_events).
+    """
+    cutoff = datetime.utcnow() - EVENT_RETENTION
+    try:
+        OrderEvent.query.filter(OrderEvent.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        print(f"[ERROR] Pruning order events failed: {e}")
+        db.session.rollback()
+
+
+def latest_order_event_id(restaurant_id):
+    return db.session.query(db.func.max(OrderEvent.id)).filter(
+        OrderEvent.restaurant_id == restaurant_id
+    ).scalar() or 0
+
+
+def _cursor_is_stale(last_event_id):
+    """
+    True when events after `last_event_id` may have been pruned: the cursor is
+    below the oldest retained event, or above the newest one (ids can be
+    reused once the table has been emptied).
+    """
+    oldest, newest = db.session.query(db.func.min(OrderEvent.id), db.func.max(OrderEvent.id)).one()
+    if oldest is None:
+        return last_event_id > 0
+    return last_event_id < oldest - 1 or last_event_id > newest
+
+
+def _format_event(event):
+    return f"id: {event.id}\nevent: {event.event_type}\ndata: {event.payload}\n\n"
+
+
+def stream_order_events(restaurant_id, last_event_id=None):
+    """
+    Generator of SSE frames for a restaurant, starting after `last_event_id`
+    (or after the newest event when the client has no cursor yet). A stale
+    cursor gets a `reset` event carrying the new cursor, and the stream
+    continues from the newest event.
+    """
+    reset = last_event_id is not None and _cursor_is_stale(last_event_id)
+    if last_event_id is None or reset:
+        last_event_id = latest_order_event_id(restaurant_id)
+    db.session.close()
+
+    yield f"retry: {POLL_INTERVAL_SECONDS * 1000}\n\n"
+    if reset:
+        yield f"id: {last_event_id}\nevent: reset\ndata: {{}}\n\n"
+
+    last_sent = time.monotonic()
+    while True:
+        with _condition:
+            seen_generation = _generation
+
+        events = OrderEvent.query.filter(
+            OrderEvent.restaurant_id == restaurant_id,
+            OrderEvent.id > last_event_id
+        ).order_by(OrderEvent.id).limit(EVENT_BATCH_SIZE).all()
+        # Don't hold a pooled connection while the stream is idle
+        db.session.close()
+
+        if events:
+            last_sent = time.monotonic()
+            for event in events:
+                last_event_id = event.id
+                yield _format_event(event)
+            continue
+
+        with _condition:
+            if _generation == seen_generation:
+                _condition.wait(POLL_INTERVAL_SECONDS)
+
+        if time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
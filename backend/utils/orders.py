@@ -0,0 +1,140 @@
+# utils/orders.py
+import json
+
+from extensions import db
+from models import Order, OrderItem
+from utils.menu_cache import get_price_map
+from utils.pagination import PaginationError, parse_datetime_arg
+
+ORDER_STATUSES = ['pending', 'preparing', 'ready', 'completed']
+MAX_LINE_QUANTITY = 100
+
+# Legal status moves: each order advances one step at a time
+ORDER_TRANSITIONS = {
+    'pending': ('preparing',),
+    'preparing': ('ready',),
+    'ready': ('completed',),
+    'completed': (),
+}
+
+
+def can_transition(current, new):
+    return new in ORDER_TRANSITIONS.get(current, ())
+
+
+def previous_statuses(new):
+    """
+    Statuses an order may be in to move to `new`.
+    """
+    return [s for s, targets in ORDER_TRANSITIONS.items() if new in targets]
+
+
+def serialize_order(o):
+    """
+    Dashboard representation of an order (same shape as GET /api/orders/).
+    """
+    return {
+        'id': o.id,
+        'table_id': o.table_id,
+        'customer_name': o.customer_name,
+        'customer_phone': o.customer_phone,
+        'items_json': o.items_json,
+        'total': float(o.total) if o.total is not None else 0.0,
+        'status': o.status,
+        'payment_method': o.payment_method,
+        'created_at': o.created_at.isoformat() if o.created_at else None,
+        'version': o.version or 0
+    }
+
+
+def filter_orders(query, args):
+    """
+    Applies the order listing filters from the query string:
+    ?status=pending,preparing&since=<iso>&until=<iso>
+    Raises PaginationError on malformed values.
+    """
+    status = args.get('status')
+    if status:
+        statuses = [s.strip() for s in status.split(',') if s.strip()]
+        if any(s not in ORDER_STATUSES for s in statuses):
+            raise PaginationError('Invalid status')
+        if len(statuses) == 1:
+            query = query.filter(Order.status == statuses[0])
+        elif statuses:
+            query = query.filter(Order.status.in_(statuses))
+
+    since = parse_datetime_arg(args.get('since'), 'since')
+    until = parse_datetime_arg(args.get('until'), 'until')
+    if since:
+        query = query.filter(Order.created_at >= since)
+    if until:
+        query = query.filter(Order.created_at < until)
+    return query
+
+
+def build_order_items(restaurant_id, items, menu_version=None):
+    """
+    Prices the client's cart lines ({id, quantity}) from the restaurant's
+    cached price map; client-sent names and prices are ignored.
+    Returns (order_items, total, rejected): OrderItem rows (dicts) to write
+    with insert_order_items() once the order is flushed, the server-side
+    total, and [{id, name, error}] for lines that can't be ordered.
+    Pass menu_version if the caller already read it to skip that lookup.
+    Raises ValueError on malformed lines.
+    """
+    prices = get_price_map(restaurant_id, menu_version)
+    order_items = []
+    rejected = []
+    for line in items or []:
+        if not isinstance(line, dict):
+            raise ValueError('Invalid order item')
+        quantity = int(line.get('quantity') or 1)
+        if quantity < 1 or quantity > MAX_LINE_QUANTITY:
+            raise ValueError('Invalid order item quantity')
+        try:
+            menu_item_id = int(line.get('id'))
+        except (TypeError, ValueError):
+            menu_item_id = None
+
+        entry = prices.get(menu_item_id)
+        if entry is None:
+            rejected.append({'id': line.get('id'), 'name': line.get('name'), 'error': 'Item not found'})
+            continue
+        name, unit_price, available = entry
+        if not available:
+            rejected.append({'id': menu_item_id, 'name': name, 'error': 'Item is unavailable'})
+            continue
+
+        order_items.append({
+            'restaurant_id': restaurant_id,
+            'menu_item_id': menu_item_id,
+            'name': name[:100],
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'line_total': round(unit_price * quantity, 2)
+        })
+
+    total = round(sum(line['line_total'] for line in order_items), 2)
+    return order_items, total, rejected
+
+
+def order_items_json(order_items):
+    """
+    Order.items_json for server-priced lines, in the shape clients send.
+    """
+    return json.dumps([
+        {'id': line['menu_item_id'], 'name': line['name'], 'price': line['unit_price'], 'quantity': line['quantity']}
+        for line in order_items
+    ])
+
+
+def insert_order_items(order, order_items):
+    """
+    Writes the order's lines with one executemany INSERT in the current
+    transaction (the ORM would issue one INSERT per line to fetch ids).
+    """
+    if order_items:
+        db.session.execute(
+            db.insert(OrderItem),
+            [{'order_id': order.id, **line} for line in order_items]
+        )
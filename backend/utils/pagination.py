@@ -0,0 +1,80 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination on (created_at, id), newest first.
+
+The cursor is an opaque url-safe token encoding the last row's created_at and
+id, so each page is a single index range scan no matter how deep the client
+has paged.
+"""
+import base64
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise PaginationError('Invalid cursor')
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError('Invalid limit')
+    if limit < 1:
+        raise PaginationError('Invalid limit')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_datetime_arg(value, name):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise PaginationError(f'Invalid {name}')
+    # Timestamps are stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def keyset_page(query, created_col, id_col, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Returns (rows, next_cursor) for one page of `query`, newest first.
+    next_cursor is None on the last page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            created_col <= created_at,
+            or_(created_col < created_at, and_(created_col == created_at, id_col < row_id))
+        )
+
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
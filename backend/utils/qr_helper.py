@@ -0,0 +1,132 @@
+# utils/qr_helper.py
+"""
+Local QR code rendering (PNG / SVG) with a content-addressed disk cache.
+
+Images are keyed by a SHA-256 of (format, scale, payload), so the same
+payload is rendered once per host and regenerated URLs that encode the same
+target hit the cache. Only payloads the server generated itself are written
+to disk: callers pass persist=True, and /api/qr URLs carry an HMAC (sig)
+of the payload. Anything else is rendered in memory, so the public
+endpoint can't be used to fill the disk.
+"""
+import base64
+import hashlib
+import hmac
+import io
+import os
+import tempfile
+import urllib.parse
+
+import segno
+from flask import current_app, request
+
+QR_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+QR_SCALE = 8
+QR_BORDER = 2
+MAX_QR_PAYLOAD = 1024
+
+
+def build_public_base():
+    """
+    Build the public base URL from incoming request headers.
+    Works with ngrok, Cloudflare Tunnel, reverse proxies, etc.
+
+    Priority:
+    1) X-Forwarded-Proto + X-Forwarded-Host (if proxy supplies them)
+    2) X-Forwarded-Proto + Host
+    3) request.scheme + Host
+    4) request.host_url as fallback
+    """
+    forwarded_proto = request.headers.get("X-Forwarded-Proto")
+    forwarded_host = request.headers.get("X-Forwarded-Host") or request.headers.get("Host")
+
+    if forwarded_proto and forwarded_host:
+        scheme = forwarded_proto
+        host = forwarded_host
+    elif forwarded_host:
+        scheme = forwarded_proto or request.scheme
+        host = forwarded_host
+    else:
+        # As a final fallback, use Flask's host_url (contains scheme+host)
+        # host_url contains trailing slash, remove it.
+        return request.host_url.rstrip('/')
+
+    base = f"{scheme}://{host}"
+    return base.rstrip('/')
+
+
+def qr_digest(data, fmt='png', scale=QR_SCALE):
+    return hashlib.sha256(f"{fmt}:{scale}:{QR_BORDER}:{data}".encode()).hexdigest()
+
+
+def qr_signature(data):
+    """
+    HMAC of a server-generated payload; qr_image_url() adds it as ?sig=.
+    """
+    key = current_app.config['SECRET_KEY'].encode()
+    return hmac.new(key, f"qr:{data}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def qr_signature_valid(data, signature):
+    return bool(signature) and hmac.compare_digest(qr_signature(data), signature)
+
+
+def _cache_path(digest, fmt):
+    cache_dir = current_app.config['QR_CACHE_DIR']
+    return os.path.join(cache_dir, digest[:2], f"{digest}.{fmt}")
+
+
+def render_qr(data, fmt='png', scale=QR_SCALE, persist=False):
+    """
+    Returns the QR image bytes for `data`, rendering it only on a cache miss.
+    Rendered images are written to the disk cache only with persist=True.
+    """
+    if fmt not in QR_FORMATS:
+        raise ValueError(f"Unsupported QR format: {fmt}")
+    if not data or len(data) > MAX_QR_PAYLOAD:
+        raise ValueError("QR payload is empty or too long")
+
+    path = _cache_path(qr_digest(data, fmt, scale), fmt)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    buf = io.BytesIO()
+    segno.make_qr(data, error='m').save(buf, kind=fmt, scale=scale, border=QR_BORDER)
+    image = buf.getvalue()
+    if not persist:
+        return image
+
+    # Write atomically so concurrent workers never serve a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(image)
+    os.replace(tmp_path, path)
+    return image
+
+
+def qr_svg_inline(data, scale=4):
+    """
+    SVG fragment (no XML declaration) for embedding several codes in one sheet.
+    """
+    return segno.make_qr(data, error='m').svg_inline(scale=scale, border=QR_BORDER)
+
+
+def qr_data_uri(data, fmt='png'):
+    encoded = base64.b64encode(render_qr(data, fmt)).decode()
+    return f"data:{QR_FORMATS[fmt]};base64,{encoded}"
+
+
+def qr_image_url(base_url, data, fmt='png'):
+    """
+    Public URL of the locally rendered QR image for `data`, signed so the
+    endpoint keeps it in the disk cache.
+    """
+    return (f"{base_url}/api/qr/{fmt}?data={urllib.parse.quote(data, safe='')}"
+            f"&sig={qr_signature(data)}")
@@ -0,0 +1,161 @@
+# utils/static_assets.py
+"""
+In-memory, precompressed serving of the built SPA (backend/dist).
+
+The dist directory is scanned once at startup into a manifest of
+path -> (body, gzip/brotli variants, ETag). Variants come from .gz/.br files
+written at build time by `flask compress-assets`, or are compressed at boot
+when those are missing. Requests are then answered from memory, with the
+encoding picked from Accept-Encoding and `immutable` caching for
+content-hashed files under assets/.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+import click
+from flask import Response, current_app, request
+from flask.cli import with_appcontext
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 1024
+BOOT_BROTLI_QUALITY = 9
+BUILD_BROTLI_QUALITY = 11
+HASHED_ASSET = re.compile(r'(^|/)assets/.+[-.][0-9a-f]{8,}\.[A-Za-z0-9]+$')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+INDEX_CACHE = 'no-cache'
+DEFAULT_CACHE = 'public, max-age=3600'
+
+
+class Asset:
+    __slots__ = ('body', 'mimetype', 'etag', 'variants', 'cache_control')
+
+    def __init__(self, body, mimetype, cache_control):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:20]
+        self.variants = {}
+        self.cache_control = cache_control
+
+
+def _is_compressible(mimetype):
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _compress(body, encoding, brotli_quality):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _suffix(encoding):
+    return '.br' if encoding == 'br' else '.gz'
+
+
+def build_manifest(dist_dir):
+    """
+    Loads every file under dist_dir (ignoring .gz/.br siblings) into memory.
+    """
+    manifest = {}
+    if not os.path.isdir(dist_dir):
+        return manifest
+
+    for root, _, files in os.walk(dist_dir):
+        for filename in files:
+            if filename.endswith(('.gz', '.br')):
+                continue
+            full_path = os.path.join(root, filename)
+            rel_path = os.path.relpath(full_path, dist_dir).replace(os.sep, '/')
+            with open(full_path, 'rb') as f:
+                body = f.read()
+
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            if rel_path == 'index.html':
+                cache_control = INDEX_CACHE
+            elif HASHED_ASSET.search(rel_path):
+                cache_control = IMMUTABLE_CACHE
+            else:
+                cache_control = DEFAULT_CACHE
+            asset = Asset(body, mimetype, cache_control)
+
+            if _is_compressible(mimetype) and len(body) >= MIN_COMPRESS_SIZE:
+                for encoding in _encodings():
+                    prebuilt = full_path + _suffix(encoding)
+                    # Ignore build-time variants older than the file they compress
+                    if os.path.exists(prebuilt) and os.path.getmtime(prebuilt) >= os.path.getmtime(full_path):
+                        with open(prebuilt, 'rb') as f:
+                            encoded = f.read()
+                    else:
+                        encoded = _compress(body, encoding, BOOT_BROTLI_QUALITY)
+                    if len(encoded) < len(body):
+                        asset.variants[encoding] = encoded
+
+            manifest[rel_path] = asset
+    return manifest
+
+
+def _pick_encoding(asset):
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in asset.variants and accepted[encoding]:
+            return encoding
+    return None
+
+
+def asset_response(asset):
+    encoding = _pick_encoding(asset)
+    if encoding:
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f"{asset.etag}-{encoding}")
+    else:
+        response = Response(asset.body, mimetype=asset.mimetype)
+        response.set_etag(asset.etag)
+
+    if asset.variants:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = asset.cache_control
+    return response.make_conditional(request)
+
+
+def compress_dist(dist_dir):
+    """
+    Writes maximum-quality .gz/.br siblings for compressible files (build step).
+    Returns the number of files written.
+    """
+    written = 0
+    for root, _, files in os.walk(dist_dir):
+        for filename in files:
+            if filename.endswith(('.gz', '.br')):
+                continue
+            mimetype = mimetypes.guess_type(filename)[0] or ''
+            full_path = os.path.join(root, filename)
+            if not _is_compressible(mimetype) or os.path.getsize(full_path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(full_path, 'rb') as f:
+                body = f.read()
+            for encoding in _encodings():
+                with open(full_path + _suffix(encoding), 'wb') as f:
+                    f.write(_compress(body, encoding, BUILD_BROTLI_QUALITY))
+                written += 1
+    return written
+
+
+@click.command('compress-assets')
+@with_appcontext
+def compress_assets_command():
+    """Precompress the built frontend (dist/) with gzip and brotli."""
+    count = compress_dist(current_app.config['DIST_DIR'])
+    click.echo(f"Wrote {count} compressed files.")
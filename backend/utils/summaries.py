@@ -0,0 +1,222 @@
+# utils/summaries.py
+"""
+Daily per-restaurant rollups of completed orders and reviews (MonthlySummary
+rows), plus running all-time rating totals per restaurant (ReviewSummary).
+
+Rows are maintained incrementally inside the same transaction that marks an
+order completed or adds a review, were backfilled by migration cb8d38a83bb6,
+and can be rebuilt from raw orders and reviews with `flask rebuild-summaries`.
+"""
+from datetime import date, datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import MonthlySummary, Order, Review, ReviewSummary
+
+RATINGS = (1, 2, 3, 4, 5)
+
+
+def _summary_day(row):
+    return (row.created_at or datetime.utcnow()).date()
+
+
+def apply_order_completion(order):
+    """
+    Adds a newly completed order's total to its day's rollup. Call before
+    committing the status change (completed is final, so nothing is ever
+    subtracted).
+    """
+    _increment(order.restaurant_id, _summary_day(order), 1, float(order.total or 0))
+
+
+def apply_orders_completion(orders):
+    """
+    apply_order_completion for a batch of newly completed orders: one rollup
+    write per (restaurant, day) instead of one per order.
+    """
+    deltas = {}
+    for order in orders:
+        key = (order.restaurant_id, _summary_day(order))
+        count, revenue = deltas.get(key, (0, 0.0))
+        deltas[key] = (count + 1, revenue + float(order.total or 0))
+    for (restaurant_id, day), (count, revenue) in deltas.items():
+        _increment(restaurant_id, day, count, revenue)
+
+
+def _increment(restaurant_id, day, delta_orders, delta_revenue):
+    t = MonthlySummary.__table__
+    new_orders = func.coalesce(t.c.total_orders, 0) + delta_orders
+    new_revenue = func.coalesce(t.c.total_revenue, 0) + delta_revenue
+
+    # average_order_value is assigned first so it is computed from the old
+    # totals on every backend (MySQL applies SET clauses left to right).
+    update = t.update().where(
+        t.c.restaurant_id == restaurant_id,
+        t.c.date == day
+    ).ordered_values(
+        (t.c.average_order_value, case((new_orders > 0, new_revenue / new_orders), else_=0.0)),
+        (t.c.total_orders, new_orders),
+        (t.c.total_revenue, new_revenue),
+    )
+
+    _update_or_insert(update, t.insert().values(
+        restaurant_id=restaurant_id,
+        date=day,
+        total_orders=delta_orders,
+        total_revenue=delta_revenue,
+        average_order_value=delta_revenue / delta_orders
+    ))
+
+
+def _update_or_insert(update, insert):
+    """
+    Runs `update`; if it matched no row, inserts one instead.
+    """
+    if db.session.execute(update).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert)
+    except IntegrityError:
+        # Another worker created the row first
+        db.session.execute(update)
+
+
+# -------------------------
+# Reviews
+# -------------------------
+def apply_review(review):
+    """
+    Adds a new review to its restaurant's running rating totals and to its
+    day's rollup. Call before committing the review.
+    """
+    rating = int(review.rating)
+    s = ReviewSummary.__table__
+    _update_or_insert(
+        s.update().where(s.c.restaurant_id == review.restaurant_id).values({
+            s.c.rating_count: s.c.rating_count + 1,
+            s.c.rating_sum: s.c.rating_sum + rating,
+            s.c[f'rating_{rating}']: s.c[f'rating_{rating}'] + 1,
+        }),
+        s.insert().values({'restaurant_id': review.restaurant_id, 'rating_count': 1, 'rating_sum': rating,
+                           f'rating_{rating}': 1})
+    )
+
+    t = MonthlySummary.__table__
+    day = _summary_day(review)
+    _update_or_insert(
+        t.update().where(t.c.restaurant_id == review.restaurant_id, t.c.date == day).values(
+            review_count=t.c.review_count + 1,
+            rating_sum=t.c.rating_sum + rating
+        ),
+        t.insert().values(restaurant_id=review.restaurant_id, date=day, total_orders=0, total_revenue=0.0,
+                          average_order_value=0.0, review_count=1, rating_sum=rating)
+    )
+
+
+def get_review_summary(restaurant_id):
+    """
+    All-time {count, average, histogram} for a restaurant: one indexed row read.
+    """
+    summary = ReviewSummary.query.filter_by(restaurant_id=restaurant_id).first()
+    count = summary.rating_count if summary else 0
+    return {
+        'count': count,
+        'average': round(summary.rating_sum / count, 2) if count else 0.0,
+        'histogram': {str(r): getattr(summary, f'rating_{r}') if summary else 0 for r in RATINGS},
+    }
+
+
+def _as_date(value):
+    # SQLite returns DATE() as a string
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def rebuild_daily_summaries(restaurant_id=None):
+    """
+    Recomputes daily rollups from raw orders and reviews with one grouped
+    query each. Returns the number of rows written.
+    """
+    order_day = func.date(Order.created_at)
+    orders = db.session.query(
+        Order.restaurant_id,
+        order_day.label('day'),
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total), 0.0)
+    ).filter(Order.status == 'completed', Order.created_at.isnot(None))
+
+    review_day = func.date(Review.created_at)
+    reviews = db.session.query(
+        Review.restaurant_id,
+        review_day.label('day'),
+        func.count(Review.id),
+        func.coalesce(func.sum(Review.rating), 0)
+    ).filter(Review.created_at.isnot(None))
+
+    cleanup = MonthlySummary.query
+    if restaurant_id is not None:
+        orders = orders.filter(Order.restaurant_id == restaurant_id)
+        reviews = reviews.filter(Review.restaurant_id == restaurant_id)
+        cleanup = cleanup.filter(MonthlySummary.restaurant_id == restaurant_id)
+
+    rows = {}
+    for rid, d, count, revenue in orders.group_by(Order.restaurant_id, order_day).all():
+        rows[(rid, _as_date(d))] = {
+            'total_orders': count,
+            'total_revenue': float(revenue),
+            'average_order_value': float(revenue) / count if count else 0.0,
+        }
+    for rid, d, count, rating_sum in reviews.group_by(Review.restaurant_id, review_day).all():
+        row = rows.setdefault((rid, _as_date(d)), {
+            'total_orders': 0, 'total_revenue': 0.0, 'average_order_value': 0.0
+        })
+        row.update(review_count=count, rating_sum=int(rating_sum))
+
+    cleanup.delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(MonthlySummary, [
+        {'restaurant_id': rid, 'date': d, 'review_count': 0, 'rating_sum': 0, **values}
+        for (rid, d), values in rows.items()
+    ])
+    db.session.commit()
+    return len(rows)
+
+
+def rebuild_review_summaries(restaurant_id=None):
+    """
+    Recomputes running rating totals from raw reviews with one grouped query.
+    Returns the number of restaurants written.
+    """
+    query = db.session.query(Review.restaurant_id, Review.rating, func.count(Review.id))
+    cleanup = ReviewSummary.query
+    if restaurant_id is not None:
+        query = query.filter(Review.restaurant_id == restaurant_id)
+        cleanup = cleanup.filter(ReviewSummary.restaurant_id == restaurant_id)
+
+    summaries = {}
+    for rid, rating, count in query.group_by(Review.restaurant_id, Review.rating).all():
+        summary = summaries.setdefault(rid, {
+            'restaurant_id': rid, 'rating_count': 0, 'rating_sum': 0, **{f'rating_{r}': 0 for r in RATINGS}
+        })
+        summary['rating_count'] += count
+        summary['rating_sum'] += rating * count
+        if rating in RATINGS:
+            summary[f'rating_{rating}'] = count
+
+    cleanup.delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(ReviewSummary, list(summaries.values()))
+    db.session.commit()
+    return len(summaries)
+
+
+@click.command('rebuild-summaries')
+@click.option('--restaurant-id', type=int, default=None, help='Only rebuild this restaurant.')
+@with_appcontext
+def rebuild_summaries_command(restaurant_id):
+    """Rebuild daily rollups and rating totals from historical orders and reviews."""
+    count = rebuild_daily_summaries(restaurant_id)
+    restaurants = rebuild_review_summaries(restaurant_id)
+    click.echo(f"Rebuilt {count} daily summary rows and rating totals for {restaurants} restaurants.")
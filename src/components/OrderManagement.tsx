@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import { apiService } from '../utils/api'
+import { apiService, ApiError } from '../utils/api'
 import { useAuth } from '../contexts/AuthContext'
 import { Clock, CheckCircle, User, Phone, Utensils, RefreshCw, Filter, Search } from 'lucide-react'
 
@@ -12,6 +12,7 @@ interface Order {
   total: number
   status: 'pending' | 'preparing' | 'ready' | 'completed'
   timestamp: string | Date
+  version?: number
 }
 
 export default function OrderManagement() {
@@ -22,22 +23,89 @@ export default function OrderManagement() {
   const [isRefreshing, setIsRefreshing] = useState(false)
   const [searchTerm, setSearchTerm] = useState('')
   const [statusFilter, setStatusFilter] = useState<'all' | Order['status']>('all')
+  // Completed orders are not fetched, so their count comes from the daily rollup
+  const [completedToday, setCompletedToday] = useState(0)
   
 
   useEffect(() => {
-    if (user) {
-      loadOrders()
-      const interval = setInterval(loadOrders, 30000)
-      return () => clearInterval(interval)
+    if (!user) return
+
+    // Live updates over Server-Sent Events instead of polling
+    let source: EventSource | null = null
+    let retryTimer: ReturnType<typeof setTimeout> | undefined
+    let lastEventId: string | null = null
+    let closed = false
+
+    const onOrderEvent = (event: MessageEvent) => {
+      lastEventId = event.lastEventId || lastEventId
+      const order = JSON.parse(event.data)
+      upsertOrder(order)
+      if (order.status === 'completed') loadCompletedToday()
+    }
+
+    const connect = async () => {
+      try {
+        const url = await apiService.getOrderStreamUrl(lastEventId)
+        if (closed) return
+        source = new EventSource(url)
+        source.addEventListener('order.created', onOrderEvent)
+        source.addEventListener('order.updated', onOrderEvent)
+        // Sent when our cursor fell behind the server's event retention:
+        // updates were missed, so reload the list and carry on from the new cursor
+        source.addEventListener('reset', (event: MessageEvent) => {
+          lastEventId = event.lastEventId || null
+          loadOrders()
+        })
+        source.onerror = () => {
+          // The browser would retry with the same stream token, which expires
+          // after a minute; resume from the last event with a fresh one instead
+          source?.close()
+          if (!closed) retryTimer = setTimeout(connect, 5000)
+        }
+      } catch (error) {
+        console.error('Failed to open the live order stream:', error)
+        if (!closed) retryTimer = setTimeout(connect, 5000)
+      }
+    }
+
+    loadOrders().then(connect)
+    return () => {
+      closed = true
+      source?.close()
+      clearTimeout(retryTimer)
     }
   }, [user])
 
+  const upsertOrder = (order: any) => {
+    const next = { ...order, id: order.id.toString() }
+    setOrders(prev =>
+      prev.some(o => o.id === next.id)
+        ? prev.map(o => (o.id === next.id ? { ...o, ...next } : o))
+        : [...prev, next]
+    )
+  }
+
+  const loadCompletedToday = async () => {
+    try {
+      // Today in UTC, matching the rollup's day buckets
+      const today = new Date().toISOString().slice(0, 10)
+      const { series } = await apiService.getAnalyticsSeries({ bucket: 'day', since: today })
+      setCompletedToday(series.reduce((sum, b) => sum + b.orders, 0))
+    } catch (error) {
+      console.error('Failed to load completed order count:', error)
+    }
+  }
+
   const loadOrders = async () => {
   if (!user?.restaurantId) return
 
   setIsRefreshing(true)
   try {
-    const ordersData = await apiService.getOrders(user.restaurantId)
+    // Completed orders are never shown, so only the active ones are fetched
+    const [ordersData] = await Promise.all([
+      apiService.getOrders({ status: 'pending,preparing,ready' }),
+      loadCompletedToday(),
+    ])
 
     setOrders(
       ordersData.map((order: any) => ({
@@ -60,14 +128,19 @@ export default function OrderManagement() {
 
   const updateOrderStatus = async (orderId: string, newStatus: Order['status']) => {
     setStatusUpdating(s => ({ ...s, [orderId]: true }))
+    const version = orders.find(o => o.id === orderId)?.version
     try {
-      await apiService.updateOrderStatus(parseInt(orderId), newStatus)
-      loadOrders()
+      const res: any = await apiService.updateOrderStatus(parseInt(orderId), newStatus, version)
+      if (res?.order) upsertOrder(res.order)
+      if (newStatus === 'completed') loadCompletedToday()
     } catch (error) {
       console.error('Failed to update order status:', error)
-      setOrders(prev => prev.map(order =>
-        order.id === orderId ? { ...order, status: newStatus } : order
-      ))
+      if (error instanceof ApiError && error.status === 409 && error.data?.order) {
+        // Illegal or stale transition: show the order as the server has it
+        upsertOrder(error.data.order)
+      } else {
+        setError('Unable to update the order status. Please try again.')
+      }
     } finally {
       setStatusUpdating(s => ({ ...s, [orderId]: false }))
     }
@@ -138,7 +211,7 @@ export default function OrderManagement() {
       pending: orders.filter(o => o.status === 'pending').length,
       preparing: orders.filter(o => o.status === 'preparing').length,
       ready: orders.filter(o => o.status === 'ready').length,
-      completed: orders.filter(o => o.status === 'completed').length,
+      completed: completedToday,
     }
   }
 
@@ -207,7 +280,7 @@ export default function OrderManagement() {
             </div>
             <div className="status-info">
               <span className="status-count">{statusCounts.completed}</span>
-              <span className="status-label">Completed</span>
+              <span className="status-label">Completed today</span>
             </div>
           </div>
         </div>
@@ -1,5 +1,5 @@
 import { X, CreditCard, User, Phone, Sparkles, AlertCircle } from "lucide-react";
-import React, { useState } from "react";
+import React, { useRef, useState } from "react";
 import { apiService } from "../utils/api";
 import "./CustomerDetails.css";
 
@@ -31,6 +31,8 @@ export default function CustomerDetailsModal({
 }: CustomerDetailsModalProps) {
   const [isProcessing, setIsProcessing] = useState(false);
   const [errors, setErrors] = useState<{name?: string; phone?: string}>({});
+  // Reused while the order is unchanged, so a retried checkout can't create a second order
+  const idempotency = useRef<{ payload: string; key: string } | null>(null);
 
   const validateForm = () => {
     const newErrors: {name?: string; phone?: string} = {};
@@ -82,7 +84,11 @@ export default function CustomerDetailsModal({
   })),
 };
 
-    const response = await apiService.createOrder(orderData)
+    const payload = JSON.stringify(orderData);
+    if (!idempotency.current || idempotency.current.payload !== payload) {
+      idempotency.current = { payload, key: crypto.randomUUID() };
+    }
+    const response = await apiService.createOrder(orderData, idempotency.current.key)
 
     const paymentData = {
       paymentMode: response.payment_mode as 'upi' | 'razorpay',
@@ -98,11 +98,10 @@ export default function CustomerMenu() {
     phone: "",
   });
 
-  // Get Table Number
+  // Get Table Number (QR links are /menu/<restaurant>/table_<number>; numbers can be names like "Patio-1")
   const getTableNumber = useCallback(() => {
-    if (!tableId) return 0;
-    const match = tableId.match(/\d+/);
-    return match ? parseInt(match[0], 10) : 0;
+    if (!tableId) return "";
+    return decodeURIComponent(tableId).replace(/^table_/, "");
   }, [tableId]);
 
   const tableNumber = getTableNumber();
@@ -123,8 +122,7 @@ export default function CustomerMenu() {
   // Initialize on mount and restaurant change
   useEffect(() => {
     if (restaurantId) {
-      loadMenu();
-      loadRestaurantInfo();
+      loadBootstrap();
       resetState();
     }
   }, [restaurantId, tableId]);
@@ -160,23 +158,16 @@ export default function CustomerMenu() {
   }, [menuItems, profile.preferences]);
 
   // API Calls
-  const loadRestaurantInfo = async () => {
-    try {
-      const info = await apiService.getRestaurantInfo(Number(restaurantId));
-      setRestaurantName(info.name);
-    } catch (err) {
-      console.error("Failed to load restaurant info:", err);
-      setRestaurantName("Restaurant");
-    }
-  };
-
-  const loadMenu = async () => {
+  // One round trip for restaurant, table and menu (grouped by category)
+  const loadBootstrap = async () => {
     try {
       setIsLoading(true);
       setError(null);
-      const data = await apiService.getMenu(Number(restaurantId));
+      // An unknown table still gets the menu (data.table is null)
+      const data = await apiService.getCustomerBootstrap(Number(restaurantId), tableNumber || null);
+      setRestaurantName(data.restaurant?.name || "Restaurant");
       setMenuItems(
-        data.map((it: any) => ({
+        (data.menu || []).flatMap((group: any) => group.items).map((it: any) => ({
           id: String(it.id),
           name: it.name,
           description: it.description || "",
@@ -194,6 +185,7 @@ export default function CustomerMenu() {
       );
     } catch (err) {
       console.error("Failed to load menu:", err);
+      setRestaurantName("Restaurant");
       setError("Failed to load menu. Please refresh the page.");
     } finally {
       setIsLoading(false);
@@ -411,7 +403,7 @@ export default function CustomerMenu() {
               Refresh Page
             </button>
             <button 
-              onClick={loadMenu}
+              onClick={loadBootstrap}
               className="bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700 transition-colors"
             >
               Try Again
@@ -444,7 +436,7 @@ export default function CustomerMenu() {
           <h1 className="text-3xl font-bold text-gray-800 mb-1">
             {restaurantName}
           </h1>
-          <p className="text-gray-600">Table {tableNumber}</p>
+          {tableNumber && <p className="text-gray-600">Table {tableNumber}</p>}
         </div>
         <button
           onClick={() => setShowProfileModal(true)}
@@ -11,6 +11,14 @@ export interface AuthResponse {
   }
 }
 
+// Thrown for non-2xx responses; `data` is the parsed error body
+export class ApiError extends Error {
+  constructor(message: string, public status: number, public data: any) {
+    super(message)
+    this.name = 'ApiError'
+  }
+}
+
 /* ================= BASE URL ================= */
 
 const stripTrailingSlash = (s = '') => s.replace(/\/+$/, '')
@@ -53,6 +61,13 @@ class ApiService {
     endpoint: string,
     options: RequestInit = {}
   ): Promise<T> {
+    return (await this.requestWithHeaders<T>(endpoint, options)).data
+  }
+
+  private async requestWithHeaders<T = any>(
+    endpoint: string,
+    options: RequestInit = {}
+  ): Promise<{ data: T; headers: Headers }> {
     const url = `${API_BASE}${endpoint.startsWith('/') ? endpoint : '/' + endpoint}`
 
     const isFormData = options.body instanceof FormData
@@ -75,10 +90,10 @@ class ApiService {
       if (response.status === 401 || response.status === 403) {
         this.clearToken()
       }
-      throw new Error((data as any)?.error || `HTTP ${response.status}`)
+      throw new ApiError((data as any)?.error || `HTTP ${response.status}`, response.status, data)
     }
 
-    return data as T
+    return { data: data as T, headers: response.headers }
   }
 
   /* ================= AUTH ================= */
@@ -109,6 +124,15 @@ class ApiService {
     return this.request(`/api/restaurants/${restaurantId}`)
   }
 
+  /* ================= CUSTOMER (PUBLIC) ================= */
+  // BACKEND: customer_bootstrap_bp → restaurant, table, grouped menu and payment modes in one call
+
+  // `table` in the response is null when the table number is missing or unknown
+  getCustomerBootstrap(restaurantId: number, tableNumber?: string | null) {
+    const table = tableNumber ? `/${encodeURIComponent(tableNumber)}` : ''
+    return this.request(`/api/customer/bootstrap/${restaurantId}${table}`)
+  }
+
   /* ================= TABLES ================= */
 
   getTablesForRestaurant(restaurantId: number) {
@@ -166,15 +190,39 @@ class ApiService {
 
   /* ================= ORDERS (ADMIN) ================= */
 
-  getOrders(restaurantId: number) {
-  return this.request(`/api/orders?restaurant_id=${restaurantId}/orders`)
-}
+  // The order list is cursor-paginated (newest first); follows X-Next-Cursor
+  // until the last page so callers get every matching order
+  async getOrders(params?: { status?: string }) {
+    const orders: any[] = []
+    let cursor: string | null = null
+    do {
+      const query = new URLSearchParams({ limit: '200' })
+      if (params?.status) query.append('status', params.status)
+      if (cursor) query.append('cursor', cursor)
+
+      const { data, headers } = await this.requestWithHeaders<any[]>(`/api/orders/?${query.toString()}`)
+      orders.push(...data)
+      cursor = headers.get('X-Next-Cursor')
+    } while (cursor)
+    return orders
+  }
 
 
-  updateOrderStatus(orderId: number, status: string) {
+  // EventSource can't send the Authorization header, so the live order
+  // stream is opened with a short-lived stream token in the URL
+  async getOrderStreamUrl(lastEventId?: string | null) {
+    const { token } = await this.request<{ token: string }>('/api/orders/stream-token', { method: 'POST' })
+    const query = new URLSearchParams({ token })
+    if (lastEventId) query.append('last_event_id', lastEventId)
+    return `${API_BASE}/api/orders/stream?${query.toString()}`
+  }
+
+  // Pass the order's last known version so a stale update is rejected with
+  // 409 (the ApiError's data.order is the current order)
+  updateOrderStatus(orderId: number, status: string, version?: number) {
   return this.request(`/api/orders/${orderId}/status`, {
     method: 'PUT',
-    body: JSON.stringify({ status }),
+    body: JSON.stringify(version === undefined ? { status } : { status, version }),
   })
 }
 
@@ -195,10 +243,11 @@ class ApiService {
     price: number
     quantity: number
   }[]
-}) {
+}, idempotencyKey?: string) {
   return this.request('/api/customer-order/create-order', {
     method: 'POST',
     body: JSON.stringify(payload),
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
   })
 }
 
@@ -226,6 +275,43 @@ class ApiService {
     )
   }
 
+  // Completed-order counts and revenue per bucket; day buckets (UTC) are
+  // read from the daily rollups
+  getAnalyticsSeries(params: { bucket?: 'hour' | 'day'; since?: string; until?: string }) {
+    const query = new URLSearchParams()
+
+    if (params.bucket) query.append('bucket', params.bucket)
+    if (params.since) query.append('since', params.since)
+    if (params.until) query.append('until', params.until)
+
+    return this.request<{ series: { bucket: string; orders: number; revenue: number }[] }>(
+      `/api/analytics/series?${query.toString()}`
+    )
+  }
+
+  getAnalyticsDrillDown(
+    kind: 'heatmap' | 'payment-mix' | 'table-turnover',
+    params?: {
+      timeRange?: '7days' | '30days' | '90days' | '365days'
+      since?: string
+      until?: string
+      status?: string
+    }
+  ) {
+    const query = new URLSearchParams()
+
+    if (params?.timeRange) query.append('timeRange', params.timeRange)
+    if (params?.since) query.append('since', params.since)
+    if (params?.until) query.append('until', params.until)
+    if (params?.status) query.append('status', params.status)
+    // Heatmap hours in the browser's local time
+    if (kind === 'heatmap') query.append('utcOffset', String(-new Date().getTimezoneOffset()))
+
+    const qs = query.toString()
+
+    return this.request(`/api/analytics/${kind}${qs ? `?${qs}` : ''}`)
+  }
+
   /* ================= SETTINGS ================= */
 
   getRestaurantSettings(restaurantId: number) {